@@ -0,0 +1,4 @@
+"""
+Benchmark scripts. Run from the repository root, e.g.:
+    python -m benchmarks.bench_light_client --headers 100000
+"""
@@ -0,0 +1,110 @@
+"""
+Payroll-style payments: BatchTransaction outputs vs equivalent single-output transactions.
+
+The same payments (each payer pays --payees receivers) are sent once as
+plain transactions and once as batch transactions, then mined with no
+proof-of-work. Reported per payment: admission cost, bytes, Merkle
+leaves, block apply throughput and block capacity at a byte budget.
+
+Usage:
+    python -m benchmarks.bench_batch_payments --payers 50 --payees 200
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import quiet
+from models.blockchain import Blockchain
+from models.transaction import BatchTransaction, Transaction
+
+
+def build_payroll(rng, keys, payers, payees):
+    """Each payer pays `payees` distinct receivers a small amount."""
+    payroll = []
+    for sender in keys[:payers]:
+        receivers = rng.sample([key for key in keys if key != sender], payees)
+        payroll.append((sender, [(receiver, rng.randint(1, 100)) for receiver in receivers]))
+    return payroll
+
+
+def run(payroll, batched, users, block_txs, block_bytes, seed):
+    """Admit and mine one form of the payroll; returns measurements."""
+    with quiet():
+        chain = Blockchain(difficulty_target="", hash_backend="sha256", num_candidates=1, seed=seed)
+        chain.generate_users(users)
+        # Payers can afford the whole payroll
+        for sender, _ in payroll:
+            chain.users[sender].balance = 10 ** 9
+        chain.state_tree.update({sender: 10 ** 9 for sender, _ in payroll})
+
+    start = time.perf_counter()
+    transactions = []
+    for sender, outputs in payroll:
+        if batched:
+            transactions.append(BatchTransaction(sender, outputs, hash_backend="sha256",
+                                                 tx_id=chain.id_source.next_tx_id()))
+        else:
+            transactions.extend(
+                Transaction(sender, receiver, amount, hash_backend="sha256", tx_id=chain.id_source.next_tx_id())
+                for receiver, amount in outputs
+            )
+    with quiet():
+        for tx in transactions:
+            if not chain.validate_transaction(tx):
+                raise SystemExit(f"Payment {tx.tx_id[:8]} rejected")
+            chain.add_pending_transaction(tx)
+    admit_time = time.perf_counter() - start
+
+    payments = sum(len(tx.outputs) for tx in transactions)
+    size = sum(tx.get_size() for tx in transactions)
+
+    apply_time = 0.0
+    blocks = 0
+    with quiet():
+        while chain.pending_transactions:
+            block = chain.mine_block_competitively(block_txs)
+            start = time.perf_counter()
+            if not chain.submit_block(block):
+                raise SystemExit("Block rejected")
+            apply_time += time.perf_counter() - start
+            blocks += 1
+
+    return {
+        "transactions": len(transactions),
+        "payments": payments,
+        "admit_us": admit_time / payments * 1e6,
+        "bytes": size / payments,
+        "apply_per_s": payments / apply_time,
+        "blocks": blocks,
+        "capacity": block_bytes / (size / payments),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--payers", type=int, default=50)
+    parser.add_argument("--payees", type=int, default=200, help="receivers per payer")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--block-txs", type=int, default=100, help="transactions per block")
+    parser.add_argument("--block-bytes", type=int, default=1_000_000, help="byte budget for capacity")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with quiet():
+        chain = Blockchain(difficulty_target="", hash_backend="sha256", seed=args.seed)
+        chain.generate_users(args.users)
+        keys = list(chain.users)
+    payroll = build_payroll(random.Random(args.seed), keys, args.payers, args.payees)
+
+    print(f"{args.payers} payers x {args.payees} payees, {args.block_txs} transactions per block\n")
+    print(f"{'form':<8} {'txs':>7} {'leaves':>7} {'blocks':>7} {'admit/payment':>14} "
+          f"{'bytes/payment':>14} {'apply':>16} {'payments/MB':>12}")
+    for label, batched in (("single", False), ("batch", True)):
+        result = run(payroll, batched, args.users, args.block_txs, args.block_bytes, args.seed)
+        print(f"{label:<8} {result['transactions']:>7} {result['transactions']:>7} {result['blocks']:>7} "
+              f"{result['admit_us']:>11.1f} us {result['bytes']:>14.1f} "
+              f"{result['apply_per_s']:>9,.0f} pay/s {result['capacity']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Block template rebuild latency: incremental BlockTemplateBuilder updates
+vs rebuilding the template from the whole mempool.
+
+Usage:
+    python -m benchmarks.bench_block_template --mempool 100000 --changes 1000
+"""
+import argparse
+import random
+import time
+
+from models.block_template import BlockTemplateBuilder
+from models.transaction import Transaction
+from models.user import User
+
+
+def random_transaction(rng, keys):
+    sender, receiver = rng.sample(keys, 2)
+    return Transaction(sender, receiver, amount=rng.randint(1, 5000), fee=rng.randint(0, 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mempool", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--senders", type=int, default=10_000)
+    parser.add_argument("--block-txs", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    users = {
+        f"{i:032x}": User(f"User_{i}", f"{i:032x}", rng.randint(100, 1_000_000))
+        for i in range(args.senders)
+    }
+    keys = list(users)
+
+    print(f"Generating {args.mempool} transactions...")
+    mempool = [random_transaction(rng, keys) for _ in range(args.mempool)]
+
+    builder = BlockTemplateBuilder(max_txs=args.block_txs)
+    start = time.perf_counter()
+    for tx in mempool:
+        builder.add(tx)
+    print(f"Initial load: {time.perf_counter() - start:.3f}s\n")
+
+    print(f"{'round':<6} {'apply changes':>14} {'incremental':>12} {'from scratch':>13}")
+    for round_num in range(1, args.rounds + 1):
+        # Half of the changes add new transactions, half remove existing ones
+        added = [random_transaction(rng, keys) for _ in range(args.changes // 2)]
+        removed = set()
+        while len(removed) < args.changes - len(added):
+            removed.add(rng.randrange(len(mempool)))
+
+        start = time.perf_counter()
+        for position in removed:
+            builder.remove(mempool[position].tx_id)
+        for tx in added:
+            builder.add(tx)
+        apply_time = time.perf_counter() - start
+
+        mempool = [tx for i, tx in enumerate(mempool) if i not in removed] + added
+
+        start = time.perf_counter()
+        incremental = builder.build(users)
+        incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fresh = BlockTemplateBuilder(max_txs=args.block_txs)
+        for tx in mempool:
+            fresh.add(tx)
+        scratch = fresh.build(users)
+        scratch_time = time.perf_counter() - start
+
+        assert [tx.tx_id for tx in incremental] == [tx.tx_id for tx in scratch]
+        print(
+            f"{round_num:<6} {apply_time * 1000:>12.2f}ms "
+            f"{incremental_time * 1000:>10.2f}ms {scratch_time * 1000:>11.2f}ms"
+        )
+
+    print(f"\nTemplate fees: {sum(tx.fee for tx in incremental)} ({len(incremental)} txs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Chain export/import throughput (JSONL vs binary columnar) against re-mining.
+
+Usage:
+    python -m benchmarks.bench_chain_io --users 1000 --transactions 50000
+    python -m benchmarks.bench_chain_io --signatures --transactions 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.common import format_bytes, quiet
+from models.blockchain import Blockchain
+from models.chain_io import export_chain, import_chain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--tx-per-block", type=int, default=500)
+    parser.add_argument("--difficulty", default="00")
+    parser.add_argument("--signatures", action="store_true", help="sign and verify every transaction")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with quiet():
+        blockchain = Blockchain(
+            difficulty_target=args.difficulty,
+            hash_backend="sha256",
+            require_signatures=args.signatures,
+            seed=args.seed,
+        )
+        blockchain.generate_users(args.users)
+        blockchain.generate_transactions(args.transactions)
+        blockchain.mine_until_done(args.tx_per_block)
+    mining_time = time.perf_counter() - start
+    confirmed = sum(len(block.transactions) for block in blockchain.chain)
+    print(f"Built {len(blockchain.chain)} blocks, {confirmed} transactions by mining in "
+          f"{mining_time:.2f}s ({confirmed / mining_time:,.0f} tx/s)\n")
+
+    print(f"{'format':<8} {'size':>10} {'export':>14} {'import':>14} {'vs mining':>10} {'same tip':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in ("jsonl", "binary"):
+            path = os.path.join(directory, f"chain.{fmt}")
+            exported = export_chain(blockchain, path, fmt)
+            with quiet():
+                imported, loaded = import_chain(path)
+            same = (
+                imported.chain[-1].get_hash() == blockchain.chain[-1].get_hash()
+                and imported.state_root == blockchain.state_root
+            )
+            print(f"{fmt:<8} {format_bytes(os.path.getsize(path)):>10} "
+                  f"{exported['tx_per_s']:>10,.0f} tx/s {loaded['tx_per_s']:>10,.0f} tx/s "
+                  f"{mining_time / loaded['seconds']:>9.1f}x {str(same):>9}")
+            imported.confirmed_txs.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+End-to-end main.py run time per hash backend at the same difficulty.
+
+Usage:
+    python -m benchmarks.bench_hash_backends --difficulty 000
+    python -m benchmarks.bench_hash_backends --backends sha256 blake2b --users 200 --transactions 2000
+"""
+import argparse
+import time
+
+import main as simulation
+from benchmarks.common import quiet
+from hash_utils import HASH_BACKENDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=list(HASH_BACKENDS))
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=10000)
+    parser.add_argument("--difficulty", default="000")
+    parser.add_argument("--tx-per-block", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"users={args.users} transactions={args.transactions} "
+          f"difficulty='{args.difficulty}' tx/block={args.tx_per_block}\n")
+    print(f"{'backend':<10} {'time':>10} {'blocks':>8} {'valid PoW':>10}")
+
+    for backend in args.backends:
+        start = time.perf_counter()
+        with quiet():
+            blockchain = simulation.main(
+                hash_backend=backend,
+                users=args.users,
+                transactions=args.transactions,
+                difficulty=args.difficulty,
+                tx_per_block=args.tx_per_block,
+            )
+        elapsed = time.perf_counter() - start
+
+        # Blocks accepted through the mining pool fallback do not meet the target
+        valid = sum(block.get_hash().startswith(args.difficulty) for block in blockchain.chain)
+        print(f"{backend:<10} {elapsed:>9.2f}s {len(blockchain.chain):>8} {valid:>10}")
+
+
+if __name__ == "__main__":
+    main()
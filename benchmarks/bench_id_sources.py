@@ -0,0 +1,64 @@
+"""
+Transaction creation cost per ID source and clock, and run reproducibility.
+
+Usage:
+    python -m benchmarks.bench_id_sources --transactions 200000
+"""
+import argparse
+import time
+
+from benchmarks.common import quiet
+from models.blockchain import Blockchain
+from models.environment import CounterIdSource, SeededIdSource, SimulatedClock, SystemClock, UuidSource
+from models.transaction import Transaction
+
+
+def create_transactions(count, id_source, clock):
+    """Create transactions the way Blockchain.generate_transactions does."""
+    start = time.perf_counter()
+    for i in range(count):
+        Transaction(
+            "sender",
+            "receiver",
+            amount=i,
+            hash_backend="sha256",
+            tx_id=id_source.next_tx_id() if id_source else None,
+            timestamp=int(clock.time()) if clock else None,
+        )
+    return time.perf_counter() - start
+
+
+def simulate(seed):
+    """Small seeded run; returns the tip hash."""
+    with quiet():
+        blockchain = Blockchain(difficulty_target="0", hash_backend="sha256", seed=seed)
+        blockchain.generate_users(100)
+        blockchain.generate_transactions(1000)
+        blockchain.mine_until_done(200)
+    return blockchain.chain[-1].get_hash()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Creating {args.transactions} transactions (sha256)")
+    print(f"{'source':<34} {'time':>9} {'per tx':>10}")
+    sources = [
+        ("uuid4 + time.time (built-in)", None, None),
+        ("UuidSource + SystemClock", UuidSource(), SystemClock()),
+        ("SeededIdSource + SimulatedClock", SeededIdSource(args.seed), SimulatedClock()),
+        ("CounterIdSource + SimulatedClock", CounterIdSource(), SimulatedClock()),
+    ]
+    for label, id_source, clock in sources:
+        elapsed = create_transactions(args.transactions, id_source, clock)
+        print(f"{label:<34} {elapsed:>8.2f}s {elapsed / args.transactions * 1e6:>7.2f} us")
+
+    first, second = simulate(args.seed), simulate(args.seed)
+    print(f"\nSeeded runs reproducible: {first == second} (tip {first[:16]}...)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Header sync time and memory: HeaderChain (light client) vs full Blockchain.
+
+Usage:
+    python -m benchmarks.bench_light_client --headers 1000000 --txs-per-block 1
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import quiet, format_bytes
+from models.block import Block
+from models.blockchain import Blockchain
+from models.light_client import HeaderChain
+from models.sparse_merkle_tree import SparseMerkleTree
+from models.transaction import Transaction
+from models.user import User
+
+
+def generate_blocks(genesis_hash, users, count, txs_per_block, seed):
+    """
+    Yield a linked chain of blocks (difficulty "" so no mining is needed).
+    Balances are tracked alongside so each header commits the state root
+    a full node will compute.
+    """
+    rng = random.Random(seed)
+    balances = {key: user.balance for key, user in users.items()}
+    state = SparseMerkleTree()
+    state.update(balances)
+    keys = list(balances)
+    prev_hash = genesis_hash
+    for index in range(1, count + 1):
+        txs = [
+            Transaction(*rng.sample(keys, 2), amount=1)
+            for _ in range(txs_per_block)
+        ]
+        touched = {}
+        for tx in txs:
+            if balances[tx.sender_key] >= tx.get_cost():
+                balances[tx.sender_key] -= tx.get_cost()
+                balances[tx.receiver_key] += tx.amount
+                touched[tx.sender_key] = balances[tx.sender_key]
+                touched[tx.receiver_key] = balances[tx.receiver_key]
+        block = Block.build(
+            index=index,
+            prev_block_hash=prev_hash,
+            version=1,
+            transactions=txs,
+            difficulty_target="",
+            timestamp=index,
+            state_root=state.update(touched),
+        )
+        prev_hash = block.get_hash()
+        yield block
+
+
+def measure(label, sync, track_memory):
+    """
+    Run a sync function and report elapsed time, then (optionally) run it
+    again under tracemalloc to report retained memory. tracemalloc slows
+    the pure-Python hash a lot, so it is kept out of the timed run.
+    """
+    start = time.perf_counter()
+    result = sync()
+    elapsed = time.perf_counter() - start
+
+    retained = "-"
+    if track_memory:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = sync()
+        retained = format_bytes(tracemalloc.get_traced_memory()[0] - before)
+        del kept
+        tracemalloc.stop()
+
+    print(f"{label:<12} {elapsed:>10.2f}s {retained:>14}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--headers", type=int, default=1_000_000)
+    parser.add_argument("--txs-per-block", type=int, default=1)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    with quiet():
+        template = Blockchain(difficulty_target="")
+        template.generate_users(n=args.users)
+    genesis = template.chain[0]
+
+    def blocks():
+        return generate_blocks(genesis.get_hash(), template.users, args.headers, args.txs_per_block, args.seed)
+
+    print(f"Syncing {args.headers} blocks ({args.txs_per_block} tx/block)")
+    print(f"{'mode':<12} {'time':>11} {'memory':>14}")
+
+    def generate_only():
+        for _ in blocks():
+            pass
+
+    def light_sync():
+        header_chain = HeaderChain(genesis.header)
+        header_chain.sync(block.header for block in blocks())
+        return header_chain
+
+    def full_sync():
+        blockchain = Blockchain(difficulty_target="", genesis_block=genesis)
+        blockchain.add_users(
+            User(user.name, user.public_key, user.balance)
+            for user in template.users.values()
+        )
+        with quiet():
+            for block in blocks():
+                blockchain.submit_block(block)
+        return blockchain
+
+    track_memory = not args.no_memory
+    measure("generation", generate_only, False)
+    header_chain = measure("light", light_sync, track_memory)
+    full_node = measure("full", full_sync, track_memory)
+    print(f"\nLight headers: {len(header_chain)}, full chain: {len(full_node.chain)}")
+    print("(light and full times include block generation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+End-to-end load: submission-to-confirmation latency at a fixed offered TPS.
+
+Transactions arrive on a fixed schedule while blocks are produced the
+way mine_until_done does (assemble, mine, apply). The nonce search runs
+in a worker thread so arrivals keep flowing during mining; assembly,
+apply and admission share the main thread, as they would in a node.
+
+For every transaction the harness records when it was due, when it was
+admitted to the mempool, when the block including it was mined and when
+that block was applied. Latencies are measured from the due time, so a
+harness that falls behind counts against the system, not in its favour.
+
+A sweep raises the offered rate for each (tx_per_block, num_candidates,
+difficulty) configuration until the chain stops keeping up: the
+saturation point is the highest rate confirmed within 90% of the offer
+with no backlog left after the drain period.
+
+Usage:
+    python -m benchmarks.bench_load --rate 500 --duration 10
+    python -m benchmarks.bench_load --sweep --tx-per-block 100,500 --candidates 1,5 --difficulty 0,00
+"""
+import argparse
+import concurrent.futures
+import random
+import time
+
+from benchmarks.common import percentile, quiet
+from models.blockchain import Blockchain
+from models.transaction import Transaction
+
+
+def run_load(rate, duration, tx_per_block, num_candidates, difficulty, users, hash_backend, drain, seed):
+    """
+    Offer `rate` transactions per second for `duration` seconds, then keep
+    producing blocks for up to `drain` seconds.
+
+    Returns:
+        Result dict with counts, achieved TPS and sorted latency lists
+    """
+    rng = random.Random(seed)
+    with quiet():
+        chain = Blockchain(difficulty_target=difficulty, hash_backend=hash_backend, num_candidates=num_candidates)
+        chain.generate_users(users)
+    keys = list(chain.users)
+
+    due = {}
+    admitted = {}
+    submit_latency, inclusion_latency, confirmation_latency = [], [], []
+    confirmed_in_window = 0
+    rejected = 0
+    blocks = 0
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    mining = None
+    arrivals = int(rate * duration)
+    sent = 0
+
+    with quiet():
+        start = time.perf_counter()
+        end = start + duration + drain
+        while True:
+            now = time.perf_counter()
+
+            # Admit every transaction that is due by now
+            while sent < arrivals and start + sent / rate <= now:
+                sender, receiver = rng.sample(keys, 2)
+                tx = Transaction(sender, receiver, rng.randint(1, 10), 0, hash_backend,
+                                 tx_id=chain.id_source.next_tx_id())
+                tx_due = start + sent / rate
+                sent += 1
+                if chain.validate_transaction(tx):
+                    chain.add_pending_transaction(tx)
+                    due[tx.tx_id] = tx_due
+                    admitted[tx.tx_id] = time.perf_counter()
+                    submit_latency.append(admitted[tx.tx_id] - tx_due)
+                else:
+                    rejected += 1
+
+            if mining is None:
+                candidates = chain.assemble_candidates(tx_per_block)
+                if candidates:
+                    mining = executor.submit(chain.mine_candidates, candidates)
+                elif sent >= arrivals:
+                    break
+            elif mining.done():
+                block = mining.result()
+                included = time.perf_counter()
+                mining = None
+                if block is not None and chain.submit_block(block):
+                    applied = time.perf_counter()
+                    blocks += 1
+                    for tx in block.transactions:
+                        tx_due = due.pop(tx.tx_id)
+                        inclusion_latency.append(included - tx_due)
+                        confirmation_latency.append(applied - tx_due)
+                    if applied <= start + duration:
+                        confirmed_in_window += len(block.transactions)
+
+            if now >= end:
+                break
+            if sent < arrivals:
+                time.sleep(max(0.0, min(0.001, start + sent / rate - time.perf_counter())))
+            elif mining is not None:
+                time.sleep(0.001)
+
+        if mining is not None:
+            mining.result()
+    executor.shutdown()
+
+    for values in (submit_latency, inclusion_latency, confirmation_latency):
+        values.sort()
+    return {
+        "offered": rate,
+        "sent": sent,
+        "rejected": rejected,
+        "blocks": blocks,
+        "achieved": confirmed_in_window / duration,
+        "backlog": len(due),
+        "submit": submit_latency,
+        "inclusion": inclusion_latency,
+        "confirmation": confirmation_latency,
+    }
+
+
+def is_saturated(result):
+    """The chain did not keep up with the offered load."""
+    return result["achieved"] < 0.9 * result["offered"] or result["backlog"] > 0
+
+
+def print_header():
+    print(f"{'tx/blk':>6} {'cand':>4} {'diff':>4} {'offered':>8} {'achieved':>9} {'blocks':>6} "
+          f"{'backlog':>7} {'submit p99':>10} {'incl. p50':>10} {'conf. p50':>10} "
+          f"{'conf. p95':>10} {'conf. p99':>10}")
+
+
+def print_row(config, result):
+    tx_per_block, num_candidates, difficulty = config
+    submit, confirmation = result["submit"], result["confirmation"]
+    print(f"{tx_per_block:>6} {num_candidates:>4} {difficulty or '-':>4} {result['offered']:>8.0f} "
+          f"{result['achieved']:>9.1f} {result['blocks']:>6} {result['backlog']:>7} "
+          f"{percentile(submit, 0.99) * 1e3:>7.2f} ms "
+          f"{percentile(result['inclusion'], 0.50) * 1e3:>7.1f} ms "
+          f"{percentile(confirmation, 0.50) * 1e3:>7.1f} ms "
+          f"{percentile(confirmation, 0.95) * 1e3:>7.1f} ms "
+          f"{percentile(confirmation, 0.99) * 1e3:>7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=200, help="offered TPS (start rate when sweeping)")
+    parser.add_argument("--duration", type=float, default=5, help="seconds of offered load per run")
+    parser.add_argument("--drain", type=float, default=None,
+                        help="seconds to keep mining after the offer ends (default: duration)")
+    parser.add_argument("--tx-per-block", default="100", help="comma-separated values")
+    parser.add_argument("--candidates", default="5", help="comma-separated values")
+    parser.add_argument("--difficulty", default="00", help="comma-separated values")
+    parser.add_argument("--sweep", action="store_true",
+                        help="double the rate until saturation for every configuration")
+    parser.add_argument("--max-rate", type=float, default=50_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--hash-backend", default="sha256")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    drain = args.duration if args.drain is None else args.drain
+    configs = [
+        (int(tx_per_block), int(num_candidates), difficulty)
+        for tx_per_block in args.tx_per_block.split(",")
+        for num_candidates in args.candidates.split(",")
+        for difficulty in args.difficulty.split(",")
+    ]
+
+    print_header()
+    saturation = []
+    for config in configs:
+        rate = args.rate
+        best = None
+        while rate <= args.max_rate:
+            result = run_load(rate, args.duration, *config, args.users, args.hash_backend, drain, args.seed)
+            print_row(config, result)
+            if not args.sweep:
+                break
+            if is_saturated(result):
+                break
+            best = result
+            rate *= 2
+        if args.sweep:
+            saturation.append((config, best))
+
+    if saturation:
+        print("\nSaturation point (highest rate sustained):")
+        for (tx_per_block, num_candidates, difficulty), best in saturation:
+            label = f"tx_per_block={tx_per_block}, candidates={num_candidates}, difficulty={difficulty!r}"
+            if best is None:
+                print(f"  {label}: below {args.rate:.0f} TPS")
+            else:
+                print(f"  {label}: {best['achieved']:.0f} TPS "
+                      f"(confirmation p99 {percentile(best['confirmation'], 0.99) * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Critical path of block production: usual vs pipelined producer.
+
+Between a winner being found and hashing resuming, the producer applies
+the block ("apply") and assembles the next candidates ("assembly"); the
+hashers sit idle for both. This measures that gap per block for the
+usual producer and for PipelinedProducer, with the Merkle trees built
+in the speculation thread or in a worker process. Mining time is shown
+as well: with a single mining worker the speculation thread shares the
+GIL with the hashing loop; with --workers 2 or more (and as many free
+cores) it runs next to it. "wait" is the part of apply spent waiting
+for a speculation that was not finished yet. The first block is left
+out (nothing can be prepared before it).
+
+Usage:
+    python -m benchmarks.bench_pipeline --transactions 10000 --tx-per-block 500 --workers 2
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.common import quiet
+from models.block_producer import PipelinedProducer
+from models.blockchain import Blockchain
+from profiling import PhaseProfiler
+
+MODES = ("usual", "pipelined (thread)", "pipelined (process)")
+
+
+def run(mode, args):
+    """Produce every block in one mode; returns (phase -> per-block seconds, wall time, producer)."""
+    profiler = PhaseProfiler()
+    with quiet():
+        chain = Blockchain(difficulty_target=args.difficulty, hash_backend=args.hash_backend,
+                           num_candidates=args.candidates, mining_workers=args.workers, seed=args.seed)
+        chain.generate_users(args.users)
+        chain.generate_transactions(args.transactions, max_fee=100)
+        chain.profiler = profiler
+
+        start = time.perf_counter()
+        producer = None
+        if mode == "usual":
+            chain.mine_until_done(args.tx_per_block)
+        else:
+            producer = PipelinedProducer(chain, use_processes=mode.endswith("(process)"))
+            producer.run(args.tx_per_block)
+        elapsed = time.perf_counter() - start
+
+    phases = {}
+    for record in profiler.records:
+        if record.block is not None and record.block > 1:
+            phases.setdefault(record.name, []).append(record.elapsed)
+    return phases, elapsed, producer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=10000)
+    parser.add_argument("--tx-per-block", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--difficulty", default="0000")
+    parser.add_argument("--workers", type=int, default=1, help="mining processes")
+    parser.add_argument("--hash-backend", default="sha256")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.transactions} transactions, {args.tx_per_block} per block, "
+          f"{args.candidates} candidates, difficulty '{args.difficulty}', {args.workers} mining worker(s)\n")
+    print(f"{'producer':<20} {'assembly':>10} {'wait':>10} {'apply':>10} {'idle gap':>10} {'mining':>10} "
+          f"{'total':>8} {'hits':>5} {'recomputed':>11}")
+
+    for mode in MODES:
+        phases, elapsed, producer = run(mode, args)
+        blocks = len(phases.get("apply", [])) or 1
+        assembly = statistics.mean(phases.get("assembly", [0.0]))
+        apply = statistics.mean(phases.get("apply", [0.0]))
+        mining = statistics.mean(phases.get("mining", [0.0]))
+        wait = producer.waited / blocks if producer else 0.0
+        print(f"{mode:<20} {assembly * 1e3:>7.2f} ms {wait * 1e3:>7.2f} ms {(apply - wait) * 1e3:>7.2f} ms "
+              f"{(assembly + apply) * 1e3:>7.2f} ms {mining * 1e3:>7.2f} ms {elapsed:>7.2f}s "
+              f"{producer.hits if producer else '-':>5} {producer.recomputed if producer else '-':>11}")
+
+    print("\nidle gap: assembly + wait + apply per block, the time the hashers wait between blocks")
+
+
+if __name__ == "__main__":
+    main()
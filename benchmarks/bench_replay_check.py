@@ -0,0 +1,87 @@
+"""
+Replay check cost and memory as confirmed history grows (Bloom filter + SQLite index).
+
+"slowest block" is the longest add_block call since the previous row; filter
+rebuilds are spread over many blocks, so it stays flat as history grows.
+
+Usage:
+    python -m benchmarks.bench_replay_check --confirmed 1000000 --checks 20000
+    python -m benchmarks.bench_replay_check --confirmed 100000000 --db /tmp/txindex.sqlite
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+
+from benchmarks.common import format_bytes
+from models.tx_index import ConfirmedTxIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--confirmed", type=int, default=1_000_000, help="confirmed transactions to index")
+    parser.add_argument("--checks", type=int, default=20_000, help="checks per measurement point")
+    parser.add_argument("--block-size", type=int, default=1000)
+    parser.add_argument("--db", default=":memory:", help="SQLite file for the exact index")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.db != ":memory:" and os.path.exists(args.db):
+        os.remove(args.db)
+
+    rng = random.Random(args.seed)
+
+    def new_id():
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    index = ConfirmedTxIndex(args.db)
+    confirmed_sample = []
+    checkpoint = 10_000
+    height = 0
+    slowest_block = 0.0
+
+    print(f"{'confirmed':>12} {'new tx check':>14} {'replay check':>14} "
+          f"{'false pos.':>11} {'filter':>12} {'bytes/tx':>9} {'slowest block':>14}")
+
+    while len(index) < args.confirmed:
+        height += 1
+        block = [new_id() for _ in range(min(args.block_size, args.confirmed - len(index)))]
+        start = time.perf_counter()
+        index.add_block(block, height)
+        slowest_block = max(slowest_block, time.perf_counter() - start)
+        if len(confirmed_sample) < args.checks:
+            confirmed_sample.append(block[0])
+
+        if len(index) >= checkpoint or len(index) == args.confirmed:
+            checkpoint *= 10
+            fresh = [new_id() for _ in range(args.checks)]
+            replays = [rng.choice(confirmed_sample) for _ in range(args.checks)]
+
+            lookups_before, false_before = index.lookups, index.false_positives
+            start = time.perf_counter()
+            for tx_id in fresh:
+                if tx_id in index:
+                    raise SystemExit("New transaction reported as confirmed")
+            fresh_time = (time.perf_counter() - start) / args.checks
+            false_rate = (index.false_positives - false_before) / args.checks
+
+            start = time.perf_counter()
+            for tx_id in replays:
+                if tx_id not in index:
+                    raise SystemExit("Confirmed transaction not found")
+            replay_time = (time.perf_counter() - start) / args.checks
+
+            filter_bytes = index.filter_size_in_bytes
+            print(f"{len(index):>12} {fresh_time * 1e6:>11.2f} us {replay_time * 1e6:>11.2f} us "
+                  f"{false_rate:>11.4%} {format_bytes(filter_bytes):>12} {filter_bytes / len(index):>9.2f} "
+                  f"{slowest_block * 1e3:>11.1f} ms")
+            slowest_block = 0.0
+
+    print(f"\nSQLite lookups: {index.lookups} (only after a Bloom filter hit), "
+          f"filter rebuilds: {index.rebuilds}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Open-loop load generator for the JSON-RPC server: p50/p99 latency at a target request rate.
+
+Requests are scheduled at fixed intervals regardless of how fast earlier
+ones complete, and latency is measured from the scheduled time, so a
+server that falls behind shows it in the percentiles instead of silently
+lowering the offered load.
+
+Usage:
+    python -m benchmarks.bench_rpc_server --rate 2000 --duration 10
+    python -m benchmarks.bench_rpc_server --rate 500 --write-ratio 0.5 --batch 10
+    python -m benchmarks.bench_rpc_server --port 8545 --no-spawn   # existing server
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.common import percentile
+from rpc_server import RpcClient, RpcError
+
+
+async def wait_for_server(host, port, timeout=60.0):
+    """Poll until the server answers get_status."""
+    deadline = time.monotonic() + timeout
+    while True:
+        client = RpcClient(host, port)
+        try:
+            return await client.call("get_status")
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+        finally:
+            await client.close()
+
+
+async def run_load(args, keys):
+    """Offer load at args.rate for args.duration; returns latencies by kind."""
+    rng = random.Random(args.seed)
+    queue = asyncio.Queue()
+    latencies = {"read": [], "write": []}
+    stats = {"errors": 0, "rejected": 0, "late": 0}
+
+    def make_request():
+        """One HTTP request worth of calls (a batch if args.batch > 1)."""
+        if rng.random() < args.write_ratio:
+            calls = []
+            for _ in range(args.batch):
+                sender, receiver = rng.sample(keys, 2)
+                calls.append({"sender": sender, "receiver": receiver, "amount": rng.randint(1, 10)})
+            if args.batch == 1:
+                return "write", [("submit_transaction", [calls[0]])]
+            return "write", [("submit_transactions", [calls])]
+        calls = [
+            ("get_balance", [rng.choice(keys)]) if rng.random() < 0.7 else ("get_status", [])
+            for _ in range(args.batch)
+        ]
+        return "read", calls
+
+    async def connection_worker():
+        client = RpcClient(args.host, args.port)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                scheduled, kind, calls = item
+                try:
+                    responses = await client.batch(calls)
+                except (OSError, RpcError, ValueError):
+                    stats["errors"] += 1
+                    await client.close()
+                    continue
+                latencies[kind].append(time.perf_counter() - scheduled)
+                for response in responses:
+                    if "error" in response:
+                        stats["rejected"] += 1
+                    elif isinstance(response["result"], list):
+                        stats["rejected"] += sum(not item["accepted"] for item in response["result"])
+        finally:
+            await client.close()
+
+    workers = [asyncio.create_task(connection_worker()) for _ in range(args.connections)]
+
+    interval = 1.0 / args.rate
+    start = time.perf_counter()
+    sent = 0
+    while True:
+        scheduled = start + sent * interval
+        if scheduled - start >= args.duration:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif delay < -0.1:
+            stats["late"] += 1
+        kind, calls = make_request()
+        queue.put_nowait((scheduled, kind, calls))
+        sent += 1
+
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+    elapsed = time.perf_counter() - start
+    return latencies, stats, sent, elapsed
+
+
+async def run(args):
+    status = await wait_for_server(args.host, args.port)
+    client = RpcClient(args.host, args.port)
+    keys = [account["key"] for account in await client.call("get_accounts", 0, args.users)]
+    await client.close()
+    print(f"Server at height {status['height']}, {len(keys)} accounts; offering {args.rate} req/s "
+          f"for {args.duration}s over {args.connections} connections "
+          f"(write ratio {args.write_ratio}, {args.batch} call(s) per request)\n")
+
+    latencies, stats, sent, elapsed = await run_load(args, keys)
+
+    client = RpcClient(args.host, args.port)
+    status = await client.call("get_status")
+    await client.close()
+
+    completed = sum(len(values) for values in latencies.values())
+    print(f"{'kind':<6} {'requests':>9} {'p50':>10} {'p99':>10} {'max':>10}")
+    for kind, values in latencies.items():
+        values.sort()
+        if values:
+            print(f"{kind:<6} {len(values):>9} {percentile(values, 0.50) * 1e3:>7.2f} ms "
+                  f"{percentile(values, 0.99) * 1e3:>7.2f} ms {values[-1] * 1e3:>7.2f} ms")
+    print(f"\nOffered {sent / elapsed:,.0f} req/s, completed {completed / elapsed:,.0f} req/s "
+          f"({completed * args.batch / elapsed:,.0f} calls/s); errors {stats['errors']}, "
+          f"rejected calls {stats['rejected']}, generator late {stats['late']}")
+    print(f"Blocks mined during the run: {status['blocks_mined']}, pending {status['pending']}, "
+          f"confirmed {status['confirmed']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18545)
+    parser.add_argument("--no-spawn", action="store_true", help="use an already running server")
+    parser.add_argument("--rate", type=float, default=1000, help="HTTP requests per second")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--connections", type=int, default=16, help="keep-alive connections")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="share of submission requests")
+    parser.add_argument("--batch", type=int, default=1, help="JSON-RPC calls per HTTP request")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--difficulty", default="00")
+    parser.add_argument("--tx-per-block", type=int, default=200)
+    parser.add_argument("--block-interval", type=float, default=0.2,
+                        help="seconds the server collects transactions before each block")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = None
+    if not args.no_spawn:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(root, "rpc_server.py"), "--quiet",
+             "--host", args.host, "--port", str(args.port), "--users", str(args.users),
+             "--difficulty", args.difficulty, "--tx-per-block", str(args.tx_per_block),
+             "--block-interval", str(args.block_interval),
+             "--hash-backend", "sha256", "--seed", str(args.seed)],
+            cwd=root,
+        )
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Aggregate throughput of account-sharded chains as the number of shards grows.
+
+Every run processes the same transfers. Cross-shard transfers cost a
+debit on the source shard and a credit on the destination, so on-chain
+transactions grow with K while completed transfers stay fixed.
+
+Usage:
+    python -m benchmarks.bench_sharding --shards 1,2,4 --transactions 20000
+"""
+import argparse
+import os
+import time
+
+from models.sharding import ShardedBlockchain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shards", default="1,2,4", help="comma-separated shard counts")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=20_000)
+    parser.add_argument("--tx-per-block", type=int, default=100)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--difficulty", default="000")
+    parser.add_argument("--hash-backend", default="sha256")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.transactions} transfers, {args.users} users, difficulty {args.difficulty!r}, "
+          f"{os.cpu_count()} CPUs\n")
+    print(f"{'shards':>6} {'time':>8} {'transfers/s':>12} {'on-chain tx/s':>14} {'speedup':>8} "
+          f"{'receipts':>9} {'rounds':>7} {'conserved':>10}")
+
+    baseline = None
+    for num_shards in (int(value) for value in args.shards.split(",")):
+        with ShardedBlockchain(
+            num_shards,
+            difficulty_target=args.difficulty,
+            hash_backend=args.hash_backend,
+            num_candidates=args.candidates,
+            tx_per_block=args.tx_per_block,
+            seed=args.seed,
+        ) as sharded:
+            sharded.generate_users(args.users)
+            supply_before, _ = sharded.total_supply()
+
+            start = time.perf_counter()
+            accepted = sharded.generate_transactions(args.transactions)
+            sharded.mine_until_done()
+            elapsed = time.perf_counter() - start
+
+            supply_after, in_flight = sharded.total_supply()
+            on_chain = sum(shard["transactions"] for shard in sharded.stats())
+
+        baseline = baseline or elapsed
+        conserved = supply_before == supply_after and in_flight == 0
+        print(f"{num_shards:>6} {elapsed:>7.2f}s {accepted / elapsed:>12,.0f} {on_chain / elapsed:>14,.0f} "
+              f"{baseline / elapsed:>7.2f}x {sharded.receipts_relayed:>9} {sharded.rounds:>7} {str(conserved):>10}")
+
+
+if __name__ == "__main__":
+    main()
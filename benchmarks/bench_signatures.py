@@ -0,0 +1,55 @@
+"""
+Transaction signature verification: one by one vs batch vs cached.
+
+Usage:
+    python -m benchmarks.bench_signatures --txs 1000
+"""
+import argparse
+import time
+
+import ed25519
+from models.signature_verifier import SignatureVerifier
+from models.transaction import Transaction
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--txs", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    keys = [ed25519.generate_keypair() for _ in range(args.users)]
+    txs = []
+    start = time.perf_counter()
+    for i in range(args.txs):
+        private_key, public_key = keys[i % len(keys)]
+        tx = Transaction(public_key, keys[(i + 1) % len(keys)][1], amount=1)
+        tx.sign(private_key)
+        txs.append(tx)
+    sign_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert all(tx.verify_signature() for tx in txs)
+    single_time = time.perf_counter() - start
+
+    verifier = SignatureVerifier()
+    start = time.perf_counter()
+    assert all(verifier.verify_batch(txs))
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert all(verifier.verify_batch(txs))
+    cached_time = time.perf_counter() - start
+
+    print(f"{args.txs} transactions")
+    for label, elapsed in (
+        ("sign", sign_time),
+        ("verify one by one", single_time),
+        ("verify batch", batch_time),
+        ("verify cached", cached_time),
+    ):
+        print(f"{label:<18} {elapsed:>8.3f}s {elapsed / args.txs * 1e6:>10.1f} us/tx")
+
+
+if __name__ == "__main__":
+    main()
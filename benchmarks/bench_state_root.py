@@ -0,0 +1,86 @@
+"""
+Per-block state root update cost: incremental sparse Merkle tree vs rebuild.
+
+Usage:
+    python -m benchmarks.bench_state_root --accounts 1000000 --blocks 50 --txs-per-block 100
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import format_bytes, percentile
+from models.sparse_merkle_tree import SparseMerkleTree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--blocks", type=int, default=50)
+    parser.add_argument("--txs-per-block", type=int, default=100)
+    parser.add_argument("--backend", default="sha256")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--memory", action="store_true", help="trace memory of the initial build (slow)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    balances = {f"{rng.getrandbits(128):032x}": rng.randint(100, 1_000_000) for _ in range(args.accounts)}
+    keys = list(balances)
+
+    print(f"State tree over {args.accounts} accounts ({args.backend})")
+    if args.memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    tree = SparseMerkleTree(args.backend)
+    tree.update(balances)
+    build_time = time.perf_counter() - start
+    memory = ""
+    if args.memory:
+        memory = f", {format_bytes(tracemalloc.get_traced_memory()[0])}"
+        tracemalloc.stop()
+    print(f"Initial build:        {build_time:.2f}s{memory}")
+
+    # Each block moves funds between random accounts; only they are re-hashed
+    update_times = []
+    dry_run_times = []
+    for _ in range(args.blocks):
+        touched = {}
+        for _ in range(args.txs_per_block):
+            sender, receiver = rng.sample(keys, 2)
+            amount = rng.randint(1, max(1, balances[sender] // 10))
+            balances[sender] -= amount
+            balances[receiver] += amount
+            touched[sender] = balances[sender]
+            touched[receiver] = balances[receiver]
+
+        start = time.perf_counter()
+        expected = tree.root_with(touched)
+        dry_run_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        root = tree.update(touched)
+        update_times.append(time.perf_counter() - start)
+        assert root == expected
+
+    for label, times in (("Per-block update", update_times), ("Per-block dry run", dry_run_times)):
+        times.sort()
+        print(f"{label + ':':<21} p50 {percentile(times, 0.5) * 1000:.2f} ms, "
+              f"p99 {percentile(times, 0.99) * 1000:.2f} ms, max {times[-1] * 1000:.2f} ms")
+    print(f"Rebuild / update:     {build_time / percentile(update_times, 0.5):.0f}x")
+
+    sample = rng.sample(keys, min(1000, len(keys)))
+    start = time.perf_counter()
+    proofs = [tree.get_proof(key) for key in sample]
+    proof_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for key, proof in zip(sample, proofs):
+        if not SparseMerkleTree.verify_proof(key, balances[key], proof, root, args.backend):
+            raise SystemExit(f"Balance proof failed for {key}")
+    verify_time = time.perf_counter() - start
+    print(f"Balance proofs:       {proof_time / len(sample) * 1e6:.1f} us to build, "
+          f"{verify_time / len(sample) * 1e6:.1f} us to verify, "
+          f"{sum(map(len, proofs)) / len(proofs):.1f} hashes each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Check that pipelined mining fills blocks from the fee-maximizing template.
+
+The same seeded mempool is mined once with the usual producer and once
+with PipelinedProducer, with a single candidate (the fee-aware one) and
+no proof-of-work. Both runs must confirm the same transactions in the
+same blocks, so the high-fee transactions go first either way.
+
+Exits with status 1 if the runs differ.
+
+Usage:
+    python -m benchmarks.check_pipelined_template --transactions 2000
+"""
+import argparse
+import sys
+
+from benchmarks.common import quiet
+from models.block_producer import PipelinedProducer
+from models.blockchain import Blockchain
+
+
+def mined_blocks(pipelined, users, transactions, tx_per_block, seed):
+    """Transaction IDs of every mined block, in chain order."""
+    with quiet():
+        chain = Blockchain(difficulty_target="", hash_backend="sha256", num_candidates=1, seed=seed)
+        chain.generate_users(users)
+        chain.generate_transactions(transactions, max_fee=100)
+        if pipelined:
+            PipelinedProducer(chain, use_processes=False).run(tx_per_block)
+        else:
+            chain.mine_until_done(tx_per_block)
+    return [[tx.tx_id for tx in block.transactions] for block in chain.chain[1:]], chain
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--tx-per-block", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    sequential, chain = mined_blocks(False, args.users, args.transactions, args.tx_per_block, args.seed)
+    pipelined, _ = mined_blocks(True, args.users, args.transactions, args.tx_per_block, args.seed)
+
+    fees = {tx.tx_id: tx.fee for block in chain.chain[1:] for tx in block.transactions}
+    mismatched = [i for i, (a, b) in enumerate(zip(sequential, pipelined), 1) if a != b]
+    if len(sequential) != len(pipelined):
+        mismatched.append(min(len(sequential), len(pipelined)) + 1)
+
+    print(f"{'block':>5} {'fees (usual)':>13} {'fees (pipelined)':>17}")
+    for i, (a, b) in enumerate(zip(sequential, pipelined), 1):
+        print(f"{i:>5} {sum(fees[t] for t in a):>13} {sum(fees.get(t, 0) for t in b):>17}")
+
+    if mismatched:
+        print(f"\nblocks differ from #{mismatched[0]}")
+        sys.exit(1)
+    print("\npipelined blocks match the fee-maximizing blocks")
+
+
+if __name__ == "__main__":
+    main()
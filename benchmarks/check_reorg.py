@@ -0,0 +1,163 @@
+"""
+Deterministic reorganization check: disconnect, reconnect and restore after a bad block.
+
+Three chains start from the same seed and mempool. X mines branch A,
+Y mines a longer branch B, and Z mines A further. X is then fed
+Y's blocks (switch to B), Z's blocks (switch back to A) and finally a
+B block with a wrong state root (the switch fails and A is restored).
+After every step X must match the chain that mined the winning branch:
+balances, state root, collected fees, confirmed index, mempool, and the
+block template's per-sender order must match arrival order.
+
+Exits with status 1 if any check fails.
+
+Usage:
+    python -m benchmarks.check_reorg
+"""
+import argparse
+import random
+import sys
+
+from benchmarks.common import quiet
+from models.blockchain import Blockchain
+from models.sparse_merkle_tree import SparseMerkleTree
+from models.transaction import Transaction
+
+
+def make_chain(seed, users, transactions):
+    """Chain with the given mempool (same order on every chain)."""
+    with quiet():
+        chain = Blockchain(difficulty_target="", hash_backend="sha256", num_candidates=1, seed=seed)
+        chain.generate_users(users)
+        for tx in transactions:
+            if chain.validate_transaction(tx):
+                chain.add_pending_transaction(tx)
+    return chain
+
+
+def make_transactions(keys, count, seed):
+    """Transfers with a few senders spending repeatedly, so order matters."""
+    rng = random.Random(seed)
+    busy = keys[:5]
+    transactions = []
+    for i in range(count):
+        sender = rng.choice(busy) if rng.random() < 0.4 else rng.choice(keys)
+        receiver = rng.choice([key for key in keys if key != sender])
+        transactions.append(Transaction(sender, receiver, rng.randint(1, 50), fee=rng.randint(0, 20),
+                                        hash_backend="sha256", tx_id=f"tx-{i:05d}", timestamp=0))
+    return transactions
+
+
+def mine(chain, blocks, tx_count):
+    """Mine blocks on the chain's own tip; returns them (exits if one is rejected)."""
+    mined = []
+    with quiet():
+        for _ in range(blocks):
+            block = chain.mine_block_competitively(tx_count)
+            if block is None or not chain.submit_block(block):
+                raise SystemExit(f"Mining block #{len(chain.chain)} failed")
+            mined.append(block)
+    return mined
+
+
+def submit(chain, blocks):
+    with quiet():
+        for block in blocks:
+            chain.submit_block(block)
+
+
+def compare(chain, reference, transactions):
+    """Differences between a reorganized chain and the reference."""
+    problems = []
+    if [b.get_hash() for b in chain.chain] != [b.get_hash() for b in reference.chain]:
+        problems.append("active chain differs")
+    if chain.state_root != reference.state_root:
+        problems.append("state root differs")
+    rebuilt = SparseMerkleTree("sha256")
+    rebuilt.update({key: user.balance for key, user in chain.users.items()})
+    if rebuilt.get_root() != chain.state_root:
+        problems.append("state tree does not match balances")
+    if {k: u.balance for k, u in chain.users.items()} != {k: u.balance for k, u in reference.users.items()}:
+        problems.append("balances differ")
+    if chain.collected_fees != reference.collected_fees:
+        problems.append("collected fees differ")
+    if any(chain.confirmed_txs.get_height(tx.tx_id) != reference.confirmed_txs.get_height(tx.tx_id)
+           for tx in transactions):
+        problems.append("confirmed index differs")
+
+    pending = {tx.tx_id for tx in chain.pending_transactions}
+    if pending != {tx.tx_id for tx in reference.pending_transactions}:
+        problems.append("mempool differs")
+    if len(chain.template_builder) != len(pending) or any(tx_id not in chain.template_builder for tx_id in pending):
+        problems.append("template and mempool differ")
+
+    template = [tx.tx_id for tx in chain.pick_transactions_for_block(len(pending))]
+    if len(set(template)) != len(template) or not set(template) <= pending:
+        problems.append("template repeats or invents transactions")
+
+    # The template must offer each sender's transactions in arrival order
+    for sender in {tx.sender_key for tx in chain.pending_transactions}:
+        expected = [tx.tx_id for tx in transactions if tx.sender_key == sender and tx.tx_id in pending]
+        actual = [tx.tx_id for tx in chain.template_builder.pending_for(sender)]
+        if actual != expected:
+            problems.append(f"template order of sender {sender[:8]} differs from arrival order")
+            break
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--transactions", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    keys = list(make_chain(args.seed, args.users, []).users)
+    transactions = make_transactions(keys, args.transactions, args.seed)
+    x, y, z = (make_chain(args.seed, args.users, transactions) for _ in range(3))
+
+    branch_a = mine(x, 2, 40)
+    branch_b = mine(y, 3, 25)
+    extension = mine(z, 4, 40)
+    if [b.get_hash() for b in extension[:2]] != [b.get_hash() for b in branch_a]:
+        raise SystemExit("Z did not reproduce branch A; the check is not deterministic")
+
+    failures = 0
+
+    def report(step, reference):
+        nonlocal failures
+        problems = compare(x, reference, transactions)
+        failures += bool(problems)
+        print(f"{step:<40} {'ok' if not problems else 'FAIL: ' + '; '.join(problems)}")
+
+    # Longer branch B: disconnect A (2 blocks), connect B (3 blocks)
+    submit(x, branch_b)
+    report("switch to longer branch", y)
+
+    # A grows past B: disconnect B, reconnect A from the tree, connect the rest
+    submit(x, extension[2:])
+    report("switch back to the extended branch", z)
+
+    # B grows with a block committing to a wrong state root
+    mine(y, 1, 25)
+    with quiet():
+        candidates = y.assemble_candidates(25)
+        candidates[0].block.header.state_root = "f" * 64
+        bad_block = y.mine_candidates(candidates)
+    submit(x, y.chain[4:] + [bad_block])
+    report("restore after a bad block", z)
+    if bad_block.get_hash() in x.block_tree:
+        failures += 1
+        print("bad block was kept in the block tree")
+
+    # Blocks built from the reorganized mempool must connect
+    mine(z, 2, 40)
+    mine(x, 2, 40)
+    report("mine on top after the reorganizations", z)
+
+    print("\nall checks passed" if not failures else f"\n{failures} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import contextlib
+import os
+
+from profiling import format_bytes  # noqa: F401 (re-exported for benchmarks)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the simulation's console output while benchmarking."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[rank]
@@ -0,0 +1,159 @@
+"""
+Stress test of ConcurrentBlockchain: many submitter and reader threads, one producer.
+
+Submitters send random transfers (some overspending, some replayed).
+Readers continuously check that every balance snapshot conserves the
+total supply (balances + collected fees) and that chain snapshots are
+linked, never shrink and stay unchanged once taken. At the end the
+chain is checked for transactions confirmed twice and for accepted
+transactions left unconfirmed. With --unsafe, readers sum balances
+without the read lock, which shows the violations the lock prevents.
+
+Exits with status 1 if any invariant is violated.
+
+Usage:
+    python -m benchmarks.stress_concurrency --submitters 8 --readers 8 --duration 5
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from benchmarks.common import quiet
+from models.blockchain import Blockchain
+from models.concurrency import ConcurrentBlockchain
+from models.transaction import Transaction
+
+
+def submitter(concurrent, keys, rng, stop, counts, hash_backend):
+    """Send transfers until stopped; about 5% overspend and 5% are replays."""
+    sent = 0
+    previous = None
+    while not stop.is_set():
+        roll = rng.random()
+        if roll < 0.05 and previous is not None:
+            tx = previous
+        else:
+            sender, receiver = rng.sample(keys, 2)
+            amount = 10 ** 9 if roll < 0.10 else rng.randint(1, 50)
+            tx = Transaction(sender, receiver, amount, fee=rng.randint(0, 3), hash_backend=hash_backend)
+            previous = tx
+        concurrent.submit_transaction(tx)
+        sent += 1
+        if sent % 64 == 0:
+            time.sleep(0)
+    counts.append(sent)
+
+
+def reader(concurrent, expected_supply, stop, results, unsafe):
+    """Check invariants on every read; records reads and violations."""
+    reads = violations = 0
+    last_height = 0
+    previous, previous_tip = None, None
+    users = concurrent.blockchain.users
+    while not stop.is_set():
+        if unsafe:
+            supply = sum(user.balance for user in list(users.values()))
+            supply += concurrent.blockchain.collected_fees
+        else:
+            balances, fees = concurrent.get_balances()
+            supply = sum(balances.values()) + fees
+        if supply != expected_supply:
+            violations += 1
+
+        snapshot = concurrent.snapshot()
+        if snapshot.height < last_height:
+            violations += 1
+        last_height = snapshot.height
+        if len(snapshot) > 1 and snapshot[-1].header.prev_block_hash != snapshot[-2].get_hash():
+            violations += 1
+        # Publishing later blocks must not change an older snapshot
+        if previous is not None and previous.tip_hash != previous_tip:
+            violations += 1
+        previous, previous_tip = snapshot, snapshot.tip_hash
+        reads += 1
+    results.append((reads, violations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submitters", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of submission")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tx-per-block", type=int, default=100)
+    parser.add_argument("--difficulty", default="00")
+    parser.add_argument("--hash-backend", default="sha256")
+    parser.add_argument("--unsafe", action="store_true", help="readers skip the read lock")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with quiet():
+        chain = Blockchain(difficulty_target=args.difficulty, hash_backend=args.hash_backend,
+                           num_candidates=1, seed=args.seed)
+        chain.generate_users(args.users)
+    concurrent = ConcurrentBlockchain(chain)
+    keys = list(chain.users)
+    expected_supply = sum(user.balance for user in chain.users.values()) + chain.collected_fees
+
+    submit_stop = threading.Event()
+    read_stop = threading.Event()
+    produce_stop = threading.Event()
+    sent_counts, read_results = [], []
+    submitters = [
+        threading.Thread(target=submitter, args=(concurrent, keys, random.Random(args.seed + i),
+                                                 submit_stop, sent_counts, args.hash_backend))
+        for i in range(args.submitters)
+    ]
+    readers = [
+        threading.Thread(target=reader, args=(concurrent, expected_supply, read_stop, read_results, args.unsafe))
+        for _ in range(args.readers)
+    ]
+    producer = threading.Thread(target=concurrent.run_producer,
+                                kwargs={"block_tx_count": args.tx_per_block, "stop": produce_stop})
+
+    print(f"{args.submitters} submitters, {args.readers} readers, 1 producer, {args.duration:.1f}s, "
+          f"{'unsafe' if args.unsafe else 'locked'} reads\n")
+    start = time.perf_counter()
+    with quiet():
+        for thread in submitters + readers + [producer]:
+            thread.start()
+        time.sleep(args.duration)
+        submit_stop.set()
+        for thread in submitters:
+            thread.join()
+        produce_stop.set()
+        producer.join()
+        read_stop.set()
+        for thread in readers:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    snapshot = concurrent.snapshot()
+    confirmed = [tx.tx_id for block in snapshot[1:] for tx in block.transactions]
+    balances, fees = concurrent.get_balances()
+    reads = sum(count for count, _ in read_results)
+    violations = sum(count for _, count in read_results)
+    submitted = sum(sent_counts)
+
+    print(f"submitted:        {submitted:,} ({submitted / args.duration:,.0f}/s)")
+    print(f"accepted:         {concurrent.accepted:,}  rejected: {concurrent.rejected:,}")
+    print(f"blocks:           {concurrent.blocks_produced} ({len(confirmed):,} tx, "
+          f"{len(confirmed) / elapsed:,.0f} tx/s)")
+    print(f"reads:            {reads:,} ({reads / elapsed:,.0f}/s)")
+    conserved = sum(balances.values()) + fees == expected_supply
+    double_confirms = len(confirmed) - len(set(confirmed))
+    unconfirmed = concurrent.accepted - len(confirmed)
+    print(f"read violations:  {violations}")
+    print(f"final supply:     {'conserved' if conserved else 'BROKEN'}")
+    print(f"double confirms:  {double_confirms}")
+    print(f"unconfirmed:      {unconfirmed}")
+
+    failed = violations or not conserved or double_confirms or unconfirmed
+    print("\ninvariants violated" if failed else "\nall invariants held")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
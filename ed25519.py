@@ -0,0 +1,339 @@
+"""
+Pure-Python Ed25519 signatures (RFC 8032) with batch verification.
+
+Keys and signatures are hex strings, like the hashes in hash_utils.
+Verification uses the cofactored equation [8][S]B = [8]R + [8][k]A, so a
+signature accepted by verify_batch is always accepted by verify and
+vice versa.
+"""
+import hashlib
+import os
+import secrets
+from typing import List, Optional, Sequence, Tuple
+
+P = 2 ** 255 - 19
+L = 2 ** 252 + 27742317777372353535851937790883648493
+D = -121665 * pow(121666, P - 2, P) % P
+D2 = 2 * D % P
+SQRT_M1 = pow(2, (P - 1) // 4, P)
+
+# Points use extended coordinates (X, Y, Z, T) with x = X/Z, y = Y/Z, xy = T/Z
+Point = Tuple[int, int, int, int]
+IDENTITY: Point = (0, 1, 1, 0)
+
+
+def _add(p: Point, q: Point) -> Point:
+    """Point addition (RFC 8032, section 5.1.4)."""
+    x1, y1, z1, t1 = p
+    x2, y2, z2, t2 = q
+    a = (y1 - x1) * (y2 - x2) % P
+    b = (y1 + x1) * (y2 + x2) % P
+    c = t1 * D2 * t2 % P
+    d = 2 * z1 * z2 % P
+    e, f, g, h = b - a, d - c, d + c, b + a
+    return (e * f % P, g * h % P, f * g % P, e * h % P)
+
+
+def _double(p: Point) -> Point:
+    """Point doubling (RFC 8032, section 5.1.4)."""
+    x1, y1, z1, _ = p
+    a = x1 * x1 % P
+    b = y1 * y1 % P
+    c = 2 * z1 * z1 % P
+    h = a + b
+    e = h - (x1 + y1) * (x1 + y1)
+    g = a - b
+    f = c + g
+    return (e * f % P, g * h % P, f * g % P, e * h % P)
+
+
+def _negate(p: Point) -> Point:
+    x, y, z, t = p
+    return (-x % P, y, z, -t % P)
+
+
+def _equal(p: Point, q: Point) -> bool:
+    x1, y1, z1, _ = p
+    x2, y2, z2, _ = q
+    return (x1 * z2 - x2 * z1) % P == 0 and (y1 * z2 - y2 * z1) % P == 0
+
+
+def _is_identity(p: Point) -> bool:
+    return _equal(p, IDENTITY)
+
+
+def _mul_by_cofactor(p: Point) -> Point:
+    return _double(_double(_double(p)))
+
+
+def _recover_x(y: int, sign: int) -> Optional[int]:
+    """Recover the x coordinate from y and the sign bit."""
+    if y >= P:
+        return None
+    x2 = (y * y - 1) * pow(D * y * y + 1, P - 2, P) % P
+    if x2 == 0:
+        return None if sign else 0
+
+    x = pow(x2, (P + 3) // 8, P)
+    if (x * x - x2) % P != 0:
+        x = x * SQRT_M1 % P
+    if (x * x - x2) % P != 0:
+        return None
+
+    if (x & 1) != sign:
+        x = P - x
+    return x
+
+
+def _encode_point(p: Point) -> bytes:
+    x, y, z, _ = p
+    z_inv = pow(z, P - 2, P)
+    x = x * z_inv % P
+    y = y * z_inv % P
+    return int.to_bytes(y | ((x & 1) << 255), 32, "little")
+
+
+def _decode_point(data: bytes) -> Point:
+    """
+    Decode a 32-byte point encoding.
+    Raises ValueError for invalid encodings.
+    """
+    if len(data) != 32:
+        raise ValueError("Invalid point length")
+    y = int.from_bytes(data, "little")
+    sign = y >> 255
+    y &= (1 << 255) - 1
+
+    x = _recover_x(y, sign)
+    if x is None:
+        raise ValueError("Invalid point encoding")
+    return (x, y, 1, x * y % P)
+
+
+_GY = 4 * pow(5, P - 2, P) % P
+_GX = _recover_x(_GY, 0)
+BASE: Point = (_GX, _GY, 1, _GX * _GY % P)
+
+_base_table: List[List[Point]] = []
+
+
+def _get_base_table() -> List[List[Point]]:
+    """
+    Fixed-base table: entry [i][j] is j * 16^i * B.
+    Built lazily (about 1000 point additions) on first use.
+    """
+    if not _base_table:
+        point = BASE
+        for _ in range(64):
+            row = [IDENTITY, point]
+            for _ in range(14):
+                row.append(_add(row[-1], point))
+            _base_table.append(row)
+            point = _add(row[-1], point)
+    return _base_table
+
+
+def _base_mult(k: int) -> Point:
+    """Compute k * B with the fixed-base table (64 additions)."""
+    table = _get_base_table()
+    result = IDENTITY
+    for i in range(64):
+        nibble = (k >> (4 * i)) & 15
+        if nibble:
+            result = _add(result, table[i][nibble])
+    return result
+
+
+def _scalar_mult(p: Point, k: int) -> Point:
+    """Compute k * P with a 4-bit fixed window."""
+    table = [IDENTITY, p]
+    for _ in range(14):
+        table.append(_add(table[-1], p))
+
+    result = IDENTITY
+    for i in range((k.bit_length() + 3) // 4 - 1, -1, -1):
+        result = _double(_double(_double(_double(result))))
+        nibble = (k >> (4 * i)) & 15
+        if nibble:
+            result = _add(result, table[nibble])
+    return result
+
+
+def _multi_scalar_mult(scalars: Sequence[int], points: Sequence[Point]) -> Point:
+    """
+    Compute sum(k_i * P_i) with Pippenger's bucket method.
+
+    Doublings are shared by all terms and each term costs one addition
+    per window, which is what makes batch verification cheaper than
+    checking signatures one by one.
+    """
+    n = len(points)
+    if n == 0:
+        return IDENTITY
+
+    window = max(2, min(12, n.bit_length() - 2))
+    mask = (1 << window) - 1
+    max_bits = max(k.bit_length() for k in scalars)
+
+    result = IDENTITY
+    for w in range((max_bits + window - 1) // window - 1, -1, -1):
+        for _ in range(window):
+            result = _double(result)
+
+        buckets: List[Optional[Point]] = [None] * (mask + 1)
+        shift = w * window
+        for k, point in zip(scalars, points):
+            index = (k >> shift) & mask
+            if index:
+                bucket = buckets[index]
+                buckets[index] = point if bucket is None else _add(bucket, point)
+
+        running = IDENTITY
+        window_sum = IDENTITY
+        for index in range(mask, 0, -1):
+            bucket = buckets[index]
+            if bucket is not None:
+                running = _add(running, bucket)
+            window_sum = _add(window_sum, running)
+        result = _add(result, window_sum)
+
+    return result
+
+
+def _sha512_int(*parts: bytes) -> int:
+    return int.from_bytes(hashlib.sha512(b"".join(parts)).digest(), "little")
+
+
+def _expand_private_key(private_key: bytes) -> Tuple[int, bytes]:
+    """Derive the secret scalar and the nonce prefix from a 32-byte seed."""
+    if len(private_key) != 32:
+        raise ValueError("Private key must be 32 bytes")
+    digest = hashlib.sha512(private_key).digest()
+    a = int.from_bytes(digest[:32], "little")
+    a &= (1 << 254) - 8
+    a |= 1 << 254
+    return a, digest[32:]
+
+
+def public_key_from_private(private_key: str) -> str:
+    """
+    Derive the public key (hex) for a private key (hex).
+    """
+    a, _ = _expand_private_key(bytes.fromhex(private_key))
+    return _encode_point(_base_mult(a)).hex()
+
+
+def generate_keypair(seed: Optional[bytes] = None) -> Tuple[str, str]:
+    """
+    Generate a key pair.
+
+    Args:
+        seed: Optional 32-byte private key (default: random)
+
+    Returns:
+        (private_key, public_key) as hex strings
+    """
+    if seed is None:
+        seed = secrets.token_bytes(32)
+    private_key = seed.hex()
+    return private_key, public_key_from_private(private_key)
+
+
+def sign(private_key: str, message: bytes) -> str:
+    """
+    Sign a message.
+
+    Args:
+        private_key: 32-byte private key as hex
+        message: Message bytes
+
+    Returns:
+        64-byte signature as hex (R || S)
+    """
+    a, prefix = _expand_private_key(bytes.fromhex(private_key))
+    public_key = _encode_point(_base_mult(a))
+
+    r = _sha512_int(prefix, message) % L
+    encoded_r = _encode_point(_base_mult(r))
+    k = _sha512_int(encoded_r, public_key, message) % L
+    s = (r + k * a) % L
+    return (encoded_r + int.to_bytes(s, 32, "little")).hex()
+
+
+def _parse(public_key: str, message: bytes, signature: str) -> Tuple[Point, Point, int, int]:
+    """
+    Decode the parts of a signature check.
+
+    Returns:
+        (A, R, S, k) where k = H(R || A || M) mod L
+    Raises:
+        ValueError if any part is malformed
+    """
+    pk_bytes = bytes.fromhex(public_key)
+    sig_bytes = bytes.fromhex(signature)
+    if len(sig_bytes) != 64:
+        raise ValueError("Signature must be 64 bytes")
+
+    a_point = _decode_point(pk_bytes)
+    r_point = _decode_point(sig_bytes[:32])
+    s = int.from_bytes(sig_bytes[32:], "little")
+    if s >= L:
+        raise ValueError("Non-canonical S")
+
+    k = _sha512_int(sig_bytes[:32], pk_bytes, message) % L
+    return a_point, r_point, s, k
+
+
+def verify(public_key: str, message: bytes, signature: str) -> bool:
+    """
+    Verify a single signature.
+    """
+    try:
+        a_point, r_point, s, k = _parse(public_key, message, signature)
+    except ValueError:
+        return False
+
+    # [S]B - [k]A - R must be a small-order point
+    check = _add(_base_mult(s), _negate(_add(_scalar_mult(a_point, k), r_point)))
+    return _is_identity(_mul_by_cofactor(check))
+
+
+def verify_batch(items: Sequence[Tuple[str, bytes, str]]) -> bool:
+    """
+    Verify many signatures at once.
+
+    Each signature equation is weighted by a random 128-bit scalar z_i and
+    all of them are checked with a single multi-scalar multiplication:
+        [8](-(sum z_i S_i) B + sum z_i R_i + sum (z_i k_i) A_i) = 0
+
+    Args:
+        items: (public_key, message, signature) tuples
+
+    Returns:
+        True only if every signature is valid. On False, callers that
+        need to know which one failed must check them individually.
+    """
+    if not items:
+        return True
+
+    scalars: List[int] = []
+    points: List[Point] = []
+    base_scalar = 0
+
+    for public_key, message, signature in items:
+        try:
+            a_point, r_point, s, k = _parse(public_key, message, signature)
+        except ValueError:
+            return False
+
+        z = int.from_bytes(os.urandom(16), "little") | 1
+        base_scalar = (base_scalar + z * s) % L
+        scalars.append(z)
+        points.append(r_point)
+        scalars.append(z * k % L)
+        points.append(a_point)
+
+    scalars.append(L - base_scalar if base_scalar else 0)
+    points.append(BASE)
+
+    return _is_identity(_mul_by_cofactor(_multi_scalar_mult(scalars, points)))
@@ -1,6 +1,8 @@
 """
 Custom hash function for blockchain.
 """
+import hashlib
+from typing import Callable, Dict
 
 MASK64 = (1 << 64) - 1
 
@@ -55,4 +57,86 @@ def my_hash(data: str) -> str:
     d = (d + b) & MASK64
 
     # Combine four 64-bit states into 256-bit hash (64 hex characters)
-    return f"{a:016x}{b:016x}{c:016x}{d:016x}"
\ No newline at end of file
+    return f"{a:016x}{b:016x}{c:016x}{d:016x}"
+
+
+# ---------------------------------------------------------------------------
+# Hash backends
+# ---------------------------------------------------------------------------
+# Every chain picks one backend. Its ID is stored in the upper bits of the
+# block header version (version = PROTOCOL_VERSION | backend_id << 8), so a
+# header alone says how it, its Merkle tree and its transactions are hashed.
+# The custom hash has ID 0, which keeps the original version number 1.
+
+PROTOCOL_VERSION = 1
+DEFAULT_HASH_BACKEND = "custom"
+
+HASH_BACKENDS: Dict[str, Callable[[str], str]] = {}
+_BACKEND_IDS: Dict[str, int] = {}
+_BACKEND_NAMES: Dict[int, str] = {}
+
+
+def sha256_hash(data: str) -> str:
+    """SHA-256 as 64 hex characters."""
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def double_sha256_hash(data: str) -> str:
+    """Bitcoin-style double SHA-256 as 64 hex characters."""
+    return hashlib.sha256(hashlib.sha256(data.encode("utf-8")).digest()).hexdigest()
+
+
+def blake2b_256_hash(data: str) -> str:
+    """BLAKE2b with a 32-byte digest as 64 hex characters."""
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=32).hexdigest()
+
+
+def register_hash_backend(name: str, backend_id: int, function: Callable[[str], str]) -> None:
+    """
+    Register a hash backend.
+    Args:
+        name: Backend name (e.g. "sha256")
+        backend_id: Unique ID recorded in header versions (0-255)
+        function: str -> 64-character hex digest
+    """
+    if not 0 <= backend_id <= 255:
+        raise ValueError(f"Backend ID must be in 0..255, got {backend_id}")
+    if _BACKEND_NAMES.get(backend_id, name) != name:
+        raise ValueError(f"Backend ID {backend_id} already used by '{_BACKEND_NAMES[backend_id]}'")
+
+    HASH_BACKENDS[name] = function
+    _BACKEND_IDS[name] = backend_id
+    _BACKEND_NAMES[backend_id] = name
+
+
+def get_hash_backend(name: str) -> Callable[[str], str]:
+    """Get the hash function of a backend by name."""
+    try:
+        return HASH_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown hash backend '{name}' (available: {', '.join(HASH_BACKENDS)})")
+
+
+def make_version(backend: str) -> int:
+    """Header version for a chain using the given backend."""
+    get_hash_backend(backend)
+    return PROTOCOL_VERSION | (_BACKEND_IDS[backend] << 8)
+
+
+def backend_from_version(version: int) -> str:
+    """Name of the backend recorded in a header version."""
+    backend_id = version >> 8
+    if backend_id not in _BACKEND_NAMES:
+        raise ValueError(f"Unknown hash backend ID {backend_id} in version {version}")
+    return _BACKEND_NAMES[backend_id]
+
+
+def hash_function_for_version(version: int) -> Callable[[str], str]:
+    """Hash function used by headers with the given version."""
+    return HASH_BACKENDS[backend_from_version(version)]
+
+
+register_hash_backend("custom", 0, my_hash)
+register_hash_backend("sha256", 1, sha256_hash)
+register_hash_backend("sha256d", 2, double_sha256_hash)
+register_hash_backend("blake2b", 3, blake2b_256_hash)
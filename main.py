@@ -1,28 +1,202 @@
+import argparse
+import contextlib
+import os
+from typing import List, Optional
+
+from hash_utils import DEFAULT_HASH_BACKEND, HASH_BACKENDS
 from models.blockchain import Blockchain
+from models.chain_io import export_chain
+from models.sharding import ShardedBlockchain
+from profiling import PHASES, PhaseProfiler
 
 
-def main():
+def main(
+    hash_backend: str = DEFAULT_HASH_BACKEND,
+    users: int = 1000,
+    transactions: int = 10000,
+    difficulty: str = "000",
+    tx_per_block: int = 100,
+    num_candidates: int = 5,
+    workers: int = 1,
+    pipelined: bool = False,
+    profiler: Optional[PhaseProfiler] = None,
+    seed: Optional[int] = None,
+    shards: int = 1,
+    tx_index_path: str = ":memory:",
+):
     """Run the blockchain simulation."""
+    profiler = profiler or PhaseProfiler()
+    if shards > 1:
+        return main_sharded(hash_backend, users, transactions, difficulty, tx_per_block,
+                            num_candidates, shards, profiler, seed)
+
     print("=" * 60)
     print("BLOCKCHAIN v0.2")
     print("=" * 60)
     print()
-    
-    # Initialize blockchain with difficulty "000" (3 zeros - task requirement)
-    blockchain = Blockchain(difficulty_target="000")
-    
+
+    # Initialize blockchain with the requested difficulty (default "000", 3 zeros - task requirement)
+    with profiler.phase("genesis"):
+        blockchain = Blockchain(
+            difficulty_target=difficulty,
+            hash_backend=hash_backend,
+            num_candidates=num_candidates,
+            mining_workers=workers,
+            profiler=profiler,
+            seed=seed,
+            tx_index_path=tx_index_path,
+        )
+
     # Generate users
-    blockchain.generate_users(n=1000)
-    
+    with profiler.phase("users"):
+        blockchain.generate_users(n=users)
+
     # Generate transactions
-    blockchain.generate_transactions(m=10000)
-    
+    with profiler.phase("transactions"):
+        blockchain.generate_transactions(m=transactions)
+
     # Mine all blocks competitively
-    blockchain.mine_until_done(block_tx_count=100)
-    
+    blockchain.mine_until_done(block_tx_count=tx_per_block, pipelined=pipelined)
+
     # Print summary
     print(blockchain.summary())
+    return blockchain
+
+
+def main_sharded(
+    hash_backend: str,
+    users: int,
+    transactions: int,
+    difficulty: str,
+    tx_per_block: int,
+    num_candidates: int,
+    shards: int,
+    profiler: PhaseProfiler,
+    seed: Optional[int] = None,
+) -> ShardedBlockchain:
+    """Run the simulation on account-sharded chains, one process per shard."""
+    print("=" * 60)
+    print(f"BLOCKCHAIN v0.2 - {shards} SHARDS")
+    print("=" * 60)
+    print()
+
+    with profiler.phase("genesis"):
+        sharded = ShardedBlockchain(
+            shards,
+            difficulty_target=difficulty,
+            hash_backend=hash_backend,
+            num_candidates=num_candidates,
+            tx_per_block=tx_per_block,
+            seed=seed,
+        )
+    with sharded:
+        with profiler.phase("users"):
+            sharded.generate_users(users)
+        supply_before, _ = sharded.total_supply()
+        with profiler.phase("transactions"):
+            accepted = sharded.generate_transactions(transactions)
+        print(f"[INFO] Priimta pervedimų: {accepted} iš {transactions}")
+        with profiler.phase("mining"):
+            sharded.mine_until_done()
+
+        supply_after, in_flight = sharded.total_supply()
+        print(f"\n{'shard':>5} {'blokai':>7} {'transakcijos':>13} {'vartotojai':>11}")
+        for shard, stats in enumerate(sharded.stats()):
+            print(f"{shard:>5} {stats['height'] + 1:>7} {stats['transactions']:>13} {stats['users']:>11}")
+        print(f"\nKvitai tarp shard'ų: {sharded.receipts_relayed}, raundai: {sharded.rounds}")
+        print(f"Bendra suma prieš/po: {supply_before} / {supply_after} (kelyje: {in_flight})")
+    return sharded
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line options of the simulation.
+    """
+    parser = argparse.ArgumentParser(description="Supaprastintos blokų grandinės simuliacija")
+    parser.add_argument("--users", type=int, default=1000, help="number of users (default: 1000)")
+    parser.add_argument("--transactions", type=int, default=10000, help="number of transactions (default: 10000)")
+    parser.add_argument("--difficulty", default="000", help="required hash prefix (default: 000)")
+    parser.add_argument("--candidates", type=int, default=5, help="candidate blocks per height (default: 5)")
+    parser.add_argument("--tx-per-block", type=int, default=100, help="transactions per block (default: 100)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes searching nonces in parallel (default: 1)")
+    parser.add_argument("--hash-backend", choices=sorted(HASH_BACKENDS), default=DEFAULT_HASH_BACKEND,
+                        help=f"hash function (default: {DEFAULT_HASH_BACKEND})")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="prepare the next block's candidates while mining")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="partition users into this many chains, one process each (default: 1)")
+    parser.add_argument("--seed", type=int,
+                        help="seed for a reproducible run (simulated clock, seeded IDs)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="hide the simulation log, print only the phase report")
+    parser.add_argument("--profile", choices=PHASES, metavar="PHASE",
+                        help=f"run one phase under cProfile ({', '.join(PHASES)})")
+    parser.add_argument("--trace-memory", choices=PHASES, metavar="PHASE",
+                        help="run one phase under tracemalloc")
+    parser.add_argument("--profile-dir", default="profiles",
+                        help="directory for profile dumps (default: profiles)")
+    parser.add_argument("--tx-index-path", default=":memory:", metavar="PATH",
+                        help="SQLite file of the confirmed transaction index, "
+                             "keeps long histories out of RAM (default: in memory)")
+    parser.add_argument("--export", metavar="PATH",
+                        help="write the final chain to a file (see models/chain_io.py)")
+    parser.add_argument("--export-format", choices=("jsonl", "binary"), default="jsonl",
+                        help="format of --export (default: jsonl)")
+    args = parser.parse_args(argv)
+
+    for name in ("candidates", "tx_per_block", "workers", "shards"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+    if args.transactions < 0:
+        parser.error("--transactions cannot be negative")
+    if args.shards > 1 and (args.export or args.pipelined or args.tx_index_path != ":memory:"):
+        parser.error("--export, --pipelined and --tx-index-path work on a single chain only (--shards 1)")
+    if args.tx_index_path != ":memory:" and os.path.exists(args.tx_index_path):
+        # A fresh chain would take the stored IDs as already confirmed
+        parser.error(f"--tx-index-path {args.tx_index_path} already exists")
+    return args
+
+
+def cli(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: run the simulation and print the phase report."""
+    args = parse_args(argv)
+    profiler = PhaseProfiler(
+        profile_phase=args.profile,
+        trace_phase=args.trace_memory,
+        output_dir=args.profile_dir,
+    )
+
+    with contextlib.ExitStack() as stack:
+        if args.quiet:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        blockchain = main(
+            hash_backend=args.hash_backend,
+            users=args.users,
+            transactions=args.transactions,
+            difficulty=args.difficulty,
+            tx_per_block=args.tx_per_block,
+            num_candidates=args.candidates,
+            workers=args.workers,
+            pipelined=args.pipelined,
+            profiler=profiler,
+            seed=args.seed,
+            shards=args.shards,
+            tx_index_path=args.tx_index_path,
+        )
+
+    print(profiler.report())
+    for path in profiler.write_dumps():
+        print(f"[PROFILE] Saved {path}")
+
+    if args.export:
+        stats = export_chain(blockchain, args.export, args.export_format)
+        print(f"[EXPORT] {stats['blocks']} blocks, {stats['transactions']} transactions -> "
+              f"{args.export} ({stats['tx_per_s']:,.0f} tx/s)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    cli()
@@ -1,17 +1,53 @@
 from models.user import User
-from models.transaction import Transaction
+from models.transaction import Transaction, BatchTransaction
 from models.block import Block, BlockHeader
-from models.merkle_tree import MerkleTree
+from models.block_template import BlockTemplateBuilder
+from models.block_tree import BlockTree, BlockNode
+from models.bloom_filter import BloomFilter, ScalableBloomFilter
+from models.environment import SystemClock, SimulatedClock, UuidSource, CounterIdSource, SeededIdSource
+from models.merkle_tree import MerkleTree, MerkleRootBuilder
 from models.mining_pool import MiningPool, CandidateBlock
+from models.block_producer import PipelinedProducer
+from models.signature_verifier import SignatureVerifier
 from models.blockchain import Blockchain
+from models.chain_io import export_chain, import_chain
+from models.concurrency import ConcurrentBlockchain, ChainSnapshot, ReadWriteLock
+from models.light_client import HeaderChain
+from models.sharding import ShardedBlockchain, Receipt
+from models.sparse_merkle_tree import SparseMerkleTree
+from models.tx_index import ConfirmedTxIndex
 
 __all__ = [
     'User',
     'Transaction',
+    'BatchTransaction',
     'Block',
     'BlockHeader',
+    'BlockTemplateBuilder',
+    'BlockTree',
+    'BlockNode',
+    'BloomFilter',
+    'ScalableBloomFilter',
+    'SystemClock',
+    'SimulatedClock',
+    'UuidSource',
+    'CounterIdSource',
+    'SeededIdSource',
     'MerkleTree',
+    'MerkleRootBuilder',
     'MiningPool',
     'CandidateBlock',
+    'PipelinedProducer',
+    'SignatureVerifier',
     'Blockchain',
+    'export_chain',
+    'import_chain',
+    'ConcurrentBlockchain',
+    'ChainSnapshot',
+    'ReadWriteLock',
+    'HeaderChain',
+    'ShardedBlockchain',
+    'Receipt',
+    'SparseMerkleTree',
+    'ConfirmedTxIndex',
 ]
\ No newline at end of file
@@ -1,12 +1,20 @@
 import time
 from typing import List, Optional
-from hash_utils import my_hash
+from hash_utils import backend_from_version, hash_function_for_version
 from models.transaction import Transaction
 from models.merkle_tree import MerkleTree
+from models.sparse_merkle_tree import SparseMerkleTree
 
 
 class BlockHeader:
-    """Represents a block header containing metadata."""
+    """
+    Represents a block header containing metadata.
+    
+    While mining, the header is mutable and the serialized fields before
+    the nonce are cached, so trying a new nonce only appends it and hashes.
+    Once mined, seal() freezes every field and caches the serialized header
+    and its hash.
+    """
     
     def __init__(
         self,
@@ -17,6 +25,7 @@ class BlockHeader:
         timestamp: int,
         difficulty_target: str,
         nonce: int = 0,
+        state_root: str = SparseMerkleTree.EMPTY,
     ):
         """
         Initialize block header.
@@ -29,7 +38,14 @@ class BlockHeader:
             timestamp: Block creation timestamp
             difficulty_target: Mining difficulty (e.g., "000")
             nonce: Proof-of-work nonce
+            state_root: Sparse Merkle root of all balances after this block
         """
+        self._sealed = False
+        self._prefix: Optional[str] = None
+        self._hash_function = None
+        self._encoded: Optional[str] = None
+        self._hash: Optional[str] = None
+        
         self.version = version
         self.index = index
         self.prev_block_hash = prev_block_hash
@@ -37,26 +53,76 @@ class BlockHeader:
         self.timestamp = timestamp
         self.difficulty_target = difficulty_target
         self.nonce = nonce
+        self.state_root = state_root
+    
+    def __setattr__(self, name: str, value) -> None:
+        if name[0] != "_":
+            if self._sealed:
+                raise AttributeError(f"Block header #{self.index} is sealed; cannot modify '{name}'")
+            if name != "nonce":
+                # Any field other than the nonce invalidates the cached prefix
+                object.__setattr__(self, "_prefix", None)
+                object.__setattr__(self, "_hash_function", None)
+        object.__setattr__(self, name, value)
+    
+    @property
+    def is_sealed(self) -> bool:
+        """Whether the header is frozen."""
+        return self._sealed
+    
+    def _get_prefix(self) -> str:
+        """Serialized fields before the nonce (cached until a field changes)."""
+        if self._prefix is None:
+            self._prefix = (
+                str(self.version) +
+                str(self.index) +
+                self.prev_block_hash +
+                self.merkle_root +
+                self.state_root +
+                str(self.timestamp) +
+                self.difficulty_target
+            )
+        return self._prefix
     
     def to_string(self) -> str:
         """
         Convert header to string for hashing.
         """
-        return (
-            str(self.version) +
-            str(self.index) +
-            self.prev_block_hash +
-            self.merkle_root +
-            str(self.timestamp) +
-            self.difficulty_target +
-            str(self.nonce)
-        )
+        if self._sealed:
+            return self._encoded
+        return self._get_prefix() + str(self.nonce)
+    
+    def get_hash(self) -> str:
+        """
+        Calculate the header hash (the block hash).
+        The hash backend is the one recorded in the header version.
+        """
+        if self._sealed:
+            return self._hash
+        if self._hash_function is None:
+            self._hash_function = hash_function_for_version(self.version)
+        return self._hash_function(self._get_prefix() + str(self.nonce))
+    
+    def seal(self) -> str:
+        """
+        Freeze the header and cache its serialization and hash.
+        Sealing an already sealed header is a no-op.
+        
+        Returns:
+            The header hash
+        """
+        if not self._sealed:
+            self._encoded = self.to_string()
+            self._hash = hash_function_for_version(self.version)(self._encoded)
+            self._sealed = True
+        return self._hash
     
     def __repr__(self) -> str:
         return (
             f"BlockHeader(index={self.index}, "
             f"prev={self.prev_block_hash[:8]}..., "
             f"merkle={self.merkle_root[:8]}..., "
+            f"state={self.state_root[:8]}..., "
             f"nonce={self.nonce})"
         )
 
@@ -64,27 +130,33 @@ class BlockHeader:
 class Block:
     """Represents a block in the blockchain."""
     
-    def __init__(self, header: BlockHeader, transactions: List[Transaction]):
+    def __init__(
+        self,
+        header: BlockHeader,
+        transactions: List[Transaction],
+        merkle_tree: Optional[MerkleTree] = None,
+    ):
         """
         Initialize a block.
         
         Args:
             header: Block header
             transactions: List of transactions in this block
+            merkle_tree: Already built tree for these transactions (optional)
         """
         self.header = header
         self.transactions = transactions
         self.index = header.index
         
         # Build Merkle Tree
-        self.merkle_tree = self._build_merkle_tree()
+        self.merkle_tree = merkle_tree if merkle_tree is not None else self._build_merkle_tree()
     
     def _build_merkle_tree(self) -> MerkleTree:
         """
         Build Merkle Tree from transactions.
         """
         tx_ids = [tx.tx_id for tx in self.transactions]
-        return MerkleTree(tx_ids)
+        return MerkleTree(tx_ids, hash_backend=backend_from_version(self.header.version))
     
     def get_merkle_root(self) -> str:
         """
@@ -94,10 +166,23 @@ class Block:
     
     def get_hash(self) -> str:
         """
-        Calculate and return the block hash.
+        Calculate and return the block hash (cached once sealed).
+        """
+        return self.header.get_hash()
+    
+    def seal(self) -> str:
+        """
+        Seal a mined block: its header can no longer change and the hash is cached.
+        
+        Returns:
+            The block hash
         """
-        header_string = self.header.to_string()
-        return my_hash(header_string)
+        return self.header.seal()
+    
+    @property
+    def is_sealed(self) -> bool:
+        """Whether the block has been sealed after mining."""
+        return self.header.is_sealed
     
     def mine(self) -> str:
         """
@@ -114,7 +199,7 @@ class Block:
             
             if block_hash.startswith(target):
                 print(f"[MINING] Success! Nonce: {self.header.nonce}, Attempts: {attempts}")
-                return block_hash
+                return self.seal()
             
             self.header.nonce += 1
             attempts += 1
@@ -131,6 +216,7 @@ class Block:
         transactions: List[Transaction],
         difficulty_target: str,
         timestamp: Optional[int] = None,
+        state_root: str = SparseMerkleTree.EMPTY,
     ) -> "Block":
         """
         Build a new block with proper Merkle root.
@@ -142,6 +228,7 @@ class Block:
             transactions: List of transactions
             difficulty_target: Mining difficulty
             timestamp: Block timestamp (default: current time)
+            state_root: State root after the block (default: empty state)
             
         Returns:
             New Block instance
@@ -149,33 +236,24 @@ class Block:
         if timestamp is None:
             timestamp = int(time.time())
         
-        # Build temporary block to get Merkle root
-        temp_header = BlockHeader(
-            version=version,
-            index=index,
-            prev_block_hash=prev_block_hash,
-            merkle_root="0" * 64,  # Temporary
-            timestamp=timestamp,
-            difficulty_target=difficulty_target,
-            nonce=0,
+        # Build the Merkle tree once and commit its root in the header
+        merkle_tree = MerkleTree(
+            [tx.tx_id for tx in transactions],
+            hash_backend=backend_from_version(version),
         )
-        temp_block = Block(temp_header, transactions)
-        
-        # Get real Merkle root
-        merkle_root = temp_block.get_merkle_root()
         
-        # Create final header with real Merkle root
         header = BlockHeader(
             version=version,
             index=index,
             prev_block_hash=prev_block_hash,
-            merkle_root=merkle_root,
+            merkle_root=merkle_tree.get_root(),
             timestamp=timestamp,
             difficulty_target=difficulty_target,
             nonce=0,
+            state_root=state_root,
         )
         
-        return Block(header, transactions)
+        return Block(header, transactions, merkle_tree=merkle_tree)
     
     def __repr__(self) -> str:
         return (
@@ -0,0 +1,231 @@
+import contextlib
+import random
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from models.block import Block
+from models.mining_pool import CandidateBlock, build_candidate_blocks
+from models.transaction import Transaction
+
+
+class Speculation:
+    """Candidate blocks for the next height, prepared ahead of time."""
+
+    def __init__(self, future: Future, index: int, parent: Block):
+        """
+        Args:
+            future: Future resolving to the prepared blocks (None if no
+                transaction was left for them)
+            index: Height the blocks were prepared for
+            parent: Candidate expected to win; the prepared state roots
+                are only right if it does
+        """
+        self.future = future
+        self.index = index
+        self.parent = parent
+
+    def __repr__(self) -> str:
+        return f"Speculation(index={self.index}, done={self.future.done()})"
+
+
+class PipelinedProducer:
+    """
+    Block producer that overlaps candidate assembly with mining.
+
+    Once the current candidates are being mined, a background thread
+    prepares the next height's candidates: transaction selection, the
+    Merkle trees and headers (in a worker process, if enabled) and the
+    state roots, computed against the state expected after the
+    fee-aware candidate (#0). The speculation only uses transactions
+    that none of the current candidates contain, so its blocks stay
+    valid whichever candidate wins.
+
+    After a winner is found, the thread is waited for before the block
+    is applied (it reads the chain state). The prepared blocks are then
+    re-parented on the new tip (the previous hash is not part of the
+    Merkle tree), and mining resumes at once. Only if another candidate
+    won are the state roots recomputed. If the tip or the pending pool
+    moved in an unexpected way, the speculation is dropped and
+    candidates are built the usual way.
+    """
+
+    def __init__(self, blockchain, use_processes: bool = True):
+        """
+        Args:
+            blockchain: Blockchain to produce blocks for
+            use_processes: Build the prepared blocks' Merkle trees in a
+                worker process (True) or in the speculation thread
+                (False). The thread shares the GIL with the hashing loop,
+                so only a process truly overlaps that work.
+        """
+        self.blockchain = blockchain
+        self.use_processes = use_processes
+        self.hits = 0
+        self.misses = 0
+        self.recomputed = 0
+        # Seconds the main thread waited for unfinished speculations
+        self.waited = 0.0
+
+    def _speculate(
+        self,
+        speculator: Executor,
+        builder: Optional[Executor],
+        candidates: List[CandidateBlock],
+        tx_count: int,
+    ) -> Speculation:
+        """
+        Start preparing the next height's candidates in the background.
+        The clock and the random generator are read here, so seeded runs
+        stay reproducible while the thread runs next to the miner.
+        """
+        chain = self.blockchain
+        timestamp = int(chain.clock.time())
+        rng = random.Random(chain.mining_pool.rng.getrandbits(64))
+        future = speculator.submit(self._prepare, builder, candidates, tx_count, timestamp, rng)
+        return Speculation(future, candidates[0].block.index + 1, candidates[0].block)
+
+    def _prepare(
+        self,
+        builder: Optional[Executor],
+        candidates: List[CandidateBlock],
+        tx_count: int,
+        timestamp: int,
+        rng: random.Random,
+    ) -> Optional[List[Block]]:
+        """
+        Build the next height's candidate blocks (runs in the speculation
+        thread while the main thread mines).
+
+        Returns:
+            Blocks with their predicted state roots, or None if every
+            pending transaction is taken by the current candidates
+        """
+        chain = self.blockchain
+        busy = {tx.tx_id for candidate in candidates for tx in candidate.block.transactions}
+        remaining = [tx for tx in chain.pending_transactions if tx.tx_id not in busy]
+        if not remaining:
+            return None
+
+        # The fee-aware candidate (#0) is the expected winner, so the next
+        # template is picked against the balances after it
+        expected: List[Transaction] = candidates[0].block.transactions
+        tx_count = min(tx_count, len(remaining))
+        template = chain.pick_transactions_for_block(tx_count, exclude=busy, ahead=expected)
+        batches = chain.mining_pool.select_transaction_batches(remaining, tx_count, template, rng=rng)
+
+        arguments = dict(
+            prev_block_hash="0" * 64,  # Patched once the parent is known
+            index=candidates[0].block.index + 1,
+            version=chain.version,
+            difficulty_target=chain.difficulty_target,
+            timestamp=timestamp,
+        )
+        pending_blocks = builder.submit(build_candidate_blocks, batches, **arguments) if builder else None
+        state_roots = chain.compute_state_roots_after(expected, batches)
+        blocks = pending_blocks.result() if pending_blocks else build_candidate_blocks(batches, **arguments)
+
+        for block, batch, state_root in zip(blocks, batches, state_roots):
+            # Worker processes return copies; keep the mempool's objects
+            block.transactions = batch
+            block.header.state_root = state_root
+        return blocks
+
+    def _take(self, speculation: Optional[Speculation]) -> Optional[List[CandidateBlock]]:
+        """
+        Turn a finished speculation into candidates, or drop it if stale.
+        """
+        if speculation is None:
+            return None
+        blocks: Optional[List[Block]] = speculation.future.result()
+        if blocks is None:
+            return None
+
+        chain = self.blockchain
+        if speculation.index != len(chain.chain) or any(
+            tx.tx_id not in chain.template_builder for block in blocks for tx in block.transactions
+        ):
+            self.misses += 1
+            print(f"[PIPELINE] Speculation for block #{speculation.index} discarded")
+            return None
+
+        parent = chain.chain[-1]
+        prev_block_hash = parent.get_hash()
+        for block in blocks:
+            block.header.prev_block_hash = prev_block_hash
+        candidates = [CandidateBlock(block, miner_id=i) for i, block in enumerate(blocks)]
+
+        # The state roots assumed candidate #0 would win
+        if parent is not speculation.parent or chain.strict_execution:
+            chain.set_candidate_state_roots(candidates)
+            self.recomputed += 1
+
+        self.hits += 1
+        print(f"[PIPELINE] Using prepared candidates for block #{speculation.index}")
+        return candidates
+
+    def run(self, block_tx_count: int = 100) -> Dict[str, int]:
+        """
+        Mine until the pending pool is empty.
+
+        Args:
+            block_tx_count: Transactions per block
+
+        Returns:
+            Counts of produced blocks, speculation hits/misses and hits
+            whose state roots had to be recomputed
+        """
+        chain = self.blockchain
+        produced = 0
+        speculation: Optional[Speculation] = None
+
+        with contextlib.ExitStack() as stack:
+            speculator = stack.enter_context(ThreadPoolExecutor(max_workers=1))
+            builder = stack.enter_context(ProcessPoolExecutor(max_workers=1)) if self.use_processes else None
+            while chain.pending_transactions:
+                print("=" * 60)
+                print(f"[INFO] Grandinės ilgis: {len(chain.chain)} blokų")
+                print(f"[INFO] Laukiančių transakcijų: {len(chain.pending_transactions)}")
+
+                height = len(chain.chain)
+                tx_count = min(block_tx_count, len(chain.pending_transactions))
+                with chain.phase("assembly", height):
+                    candidates = self._take(speculation)
+                    if candidates is None:
+                        candidates = chain.mining_pool.create_candidates(
+                            all_transactions=chain.pending_transactions,
+                            prev_block_hash=chain.chain[-1].get_hash(),
+                            index=height,
+                            version=chain.version,
+                            difficulty_target=chain.difficulty_target,
+                            tx_per_block=tx_count,
+                            template=chain.pick_transactions_for_block(tx_count),
+                        )
+                        chain.set_candidate_state_roots(candidates)
+
+                speculation = self._speculate(speculator, builder, candidates, tx_count)
+                with chain.phase("mining", height):
+                    new_block = chain.mine_candidates(candidates)
+
+                with chain.phase("apply", height):
+                    # The speculation reads the chain state; it must be done first
+                    wait_start = time.perf_counter()
+                    speculation.future.exception()
+                    self.waited += time.perf_counter() - wait_start
+                    connected = new_block is not None and chain.submit_block(new_block)
+
+                if not new_block:
+                    print("[ERROR] Kasimas nepavyko!")
+                    break
+                if not connected:
+                    print(f"[ERROR] Blokas #{new_block.index} atmestas, kasimas sustabdomas!")
+                    break
+                produced += 1
+                print(f"✅ Liko neapdorotų transakcijų: {len(chain.pending_transactions)}\n")
+
+        print(f"[PIPELINE] Speculation hits: {self.hits} (state roots recomputed: {self.recomputed}), "
+              f"misses: {self.misses}")
+        return {"blocks": produced, "hits": self.hits, "misses": self.misses, "recomputed": self.recomputed}
+
+    def __repr__(self) -> str:
+        return f"PipelinedProducer(hits={self.hits}, misses={self.misses}, recomputed={self.recomputed})"
@@ -0,0 +1,282 @@
+import bisect
+import heapq
+from typing import Dict, List, Optional, Set, Tuple
+from models.transaction import Transaction
+from models.user import User
+
+
+class BlockTemplateBuilder:
+    """
+    Fee-maximizing block template builder kept in sync with the mempool.
+
+    Transactions are grouped per sender in arrival order, and a sender's
+    transactions are only included in that order (a later one never goes
+    in without the earlier ones). Selection is greedy by fee over the
+    senders' next transactions, the same "price and nonce" ordering used
+    by account-based chains.
+
+    The per-sender queues and a heap of their head transactions persist
+    between builds. Adding or removing a mempool transaction costs
+    O(log senders). Building a template costs O(k log senders) for k
+    selected transactions, independent of mempool size.
+    """
+
+    def __init__(self, max_txs: int = 100, max_size: Optional[int] = None):
+        """
+        Initialize an empty builder.
+
+        Args:
+            max_txs: Maximum transactions per template
+            max_size: Optional maximum template size in bytes. When set,
+                transactions are ranked by fee per byte instead of fee.
+        """
+        self.max_txs = max_txs
+        self.max_size = max_size
+
+        self._seq = 0
+        # Counts down: transactions re-added in front get lower sequence numbers
+        self._front_seq = 0
+        # sender -> [(seq, tx)] in arrival order; dead entries are skipped lazily
+        self._queues: Dict[str, List[Tuple[int, Transaction]]] = {}
+        # sender -> index of the first live entry in its queue
+        self._heads: Dict[str, int] = {}
+        # tx_id -> (sender, seq) for every live transaction
+        self._entries: Dict[str, Tuple[str, int]] = {}
+        # (priority, seq, sender); valid only while seq is the sender's head.
+        # After add_front an old entry can become valid again, so the same
+        # entry may appear twice
+        self._heap: List[Tuple[float, int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, tx_id: str) -> bool:
+        return tx_id in self._entries
+
+    def get(self, tx_id: str) -> Optional[Transaction]:
+        """
+        Find a mempool transaction by ID.
+        """
+        entry = self._entries.get(tx_id)
+        if entry is None:
+            return None
+        sender, seq = entry
+        # Queues are in arrival order, so sequence numbers are sorted
+        queue = self._queues[sender]
+        position = bisect.bisect_left(queue, (seq,))
+        return queue[position][1]
+
+    def _is_live(self, entry: Tuple[int, Transaction]) -> bool:
+        """A queue entry is live while its transaction maps to its sequence number."""
+        live = self._entries.get(entry[1].tx_id)
+        return live is not None and live[1] == entry[0]
+
+    def _priority(self, tx: Transaction) -> float:
+        """Heap key (smaller is better)."""
+        if self.max_size is not None:
+            return -tx.fee / tx.get_size()
+        return -tx.fee
+
+    def _push_head(self, sender: str) -> None:
+        """Advance a sender's head past removed entries and publish it."""
+        queue = self._queues[sender]
+        head = self._heads[sender]
+        while head < len(queue) and not self._is_live(queue[head]):
+            head += 1
+
+        if head == len(queue):
+            del self._queues[sender]
+            del self._heads[sender]
+            return
+
+        # Drop the dead prefix once it dominates the queue
+        if head > 32 and head * 2 > len(queue):
+            del queue[:head]
+            head = 0
+
+        self._heads[sender] = head
+        seq, tx = queue[head]
+        heapq.heappush(self._heap, (self._priority(tx), seq, sender))
+
+    def _is_head(self, sender: str, seq: int) -> bool:
+        queue = self._queues.get(sender)
+        return queue is not None and queue[self._heads[sender]][0] == seq
+
+    def add(self, tx: Transaction) -> None:
+        """
+        Add a mempool transaction.
+        """
+        if tx.tx_id in self._entries:
+            return
+
+        self._seq += 1
+        self._entries[tx.tx_id] = (tx.sender_key, self._seq)
+
+        queue = self._queues.get(tx.sender_key)
+        if queue is None:
+            self._queues[tx.sender_key] = [(self._seq, tx)]
+            self._heads[tx.sender_key] = 0
+            heapq.heappush(self._heap, (self._priority(tx), self._seq, tx.sender_key))
+        else:
+            queue.append((self._seq, tx))
+
+    def add_front(self, txs: List[Transaction]) -> None:
+        """
+        Re-add transactions ahead of every queued transaction of their
+        senders, keeping their given order (e.g. a disconnected block).
+        """
+        txs = [tx for tx in txs if tx.tx_id not in self._entries]
+        if not txs:
+            return
+
+        self._front_seq -= len(txs)
+        by_sender: Dict[str, List[Tuple[int, Transaction]]] = {}
+        for offset, tx in enumerate(txs):
+            seq = self._front_seq + offset
+            self._entries[tx.tx_id] = (tx.sender_key, seq)
+            by_sender.setdefault(tx.sender_key, []).append((seq, tx))
+
+        for sender, entries in by_sender.items():
+            queue = self._queues.get(sender)
+            if queue is None:
+                self._queues[sender] = entries
+            else:
+                # The dead prefix goes; the old head entry on the heap turns stale
+                queue[:self._heads[sender]] = entries
+            self._heads[sender] = 0
+            seq, tx = entries[0]
+            heapq.heappush(self._heap, (self._priority(tx), seq, sender))
+
+    def pending_for(self, sender: str) -> List[Transaction]:
+        """
+        Queued transactions of one sender in inclusion order.
+        """
+        queue = self._queues.get(sender, [])
+        head = self._heads.get(sender, 0)
+        return [entry[1] for entry in queue[head:] if self._is_live(entry)]
+
+    def remove(self, tx_id: str) -> None:
+        """
+        Remove a transaction that left the mempool (no-op if unknown).
+        """
+        entry = self._entries.pop(tx_id, None)
+        if entry is None:
+            return
+
+        sender, seq = entry
+        if self._is_head(sender, seq):
+            self._push_head(sender)
+
+    def remove_many(self, tx_ids) -> None:
+        """
+        Remove several transactions (e.g. the ones confirmed by a block).
+        """
+        for tx_id in tx_ids:
+            self.remove(tx_id)
+
+    def _next_live(self, sender: str, position: int, exclude: Optional[Set[str]] = None) -> Optional[int]:
+        """Position of the sender's next live (and not excluded) transaction after a position."""
+        queue = self._queues[sender]
+        position += 1
+        while position < len(queue) and (
+            not self._is_live(queue[position]) or (exclude and queue[position][1].tx_id in exclude)
+        ):
+            position += 1
+        return position if position < len(queue) else None
+
+    def _push_follower(
+        self, followers: list, sender: str, position: int, exclude: Optional[Set[str]] = None
+    ) -> None:
+        """Offer a sender's next live transaction after a selected one."""
+        next_position = self._next_live(sender, position, exclude)
+        if next_position is not None:
+            seq, next_tx = self._queues[sender][next_position]
+            heapq.heappush(followers, (self._priority(next_tx), seq, sender, next_position))
+
+    def build(
+        self,
+        users: Dict[str, User],
+        max_txs: Optional[int] = None,
+        exclude: Optional[Set[str]] = None,
+        balance_changes: Optional[Dict[str, int]] = None,
+    ) -> List[Transaction]:
+        """
+        Build a fee-maximizing template from the current mempool.
+
+        Args:
+            users: Current user state, used to cap each sender's spending
+            max_txs: Override the builder's transaction limit
+            exclude: IDs of transactions that are not selected, but whose
+                senders' later transactions may follow them (e.g. the ones
+                in the block being mined)
+            balance_changes: Balance deltas applied before selection
+                (e.g. the effect of the block being mined)
+
+        Returns:
+            Selected transactions in inclusion order
+        """
+        max_txs = self.max_txs if max_txs is None else max_txs
+        remaining_size = self.max_size
+
+        selected: List[Transaction] = []
+        # Negative spending is an expected credit
+        spent: Dict[str, int] = {key: -delta for key, delta in (balance_changes or {}).items()}
+        # Head entries taken off the persistent heap, restored afterwards
+        taken: List[Tuple[float, int, str]] = []
+        visited = set()
+        # Follow-up transactions of senders already in the template
+        followers: List[Tuple[float, int, str, int]] = []
+
+        # Senders whose head is excluded start from their first eligible
+        # transaction; their stale heap entries are skipped below
+        rerouted = set()
+        for tx_id in exclude or ():
+            entry = self._entries.get(tx_id)
+            if entry is None or entry[0] in rerouted or not self._is_head(*entry):
+                continue
+            rerouted.add(entry[0])
+            self._push_follower(followers, entry[0], self._heads[entry[0]], exclude)
+
+        while len(selected) < max_txs and (self._heap or followers):
+            if followers and (not self._heap or followers[0][:2] < self._heap[0][:2]):
+                _, _, sender, position = heapq.heappop(followers)
+            else:
+                entry = heapq.heappop(self._heap)
+                if not self._is_head(entry[2], entry[1]) or entry[2] in visited:
+                    continue  # Stale or duplicate entry, drop it for good
+                taken.append(entry)
+                sender = entry[2]
+                visited.add(sender)
+                if sender in rerouted:
+                    continue
+                position = self._heads[sender]
+
+            tx = self._queues[sender][position][1]
+            user = users.get(sender)
+            sender_spent = spent.get(sender, 0)
+
+            # Sender is done for this template: ordering forbids skipping ahead
+            if user is None or user.balance - sender_spent < tx.get_cost():
+                continue
+            if remaining_size is not None:
+                size = tx.get_size()
+                if size > remaining_size:
+                    continue
+                remaining_size -= size
+
+            selected.append(tx)
+            spent[sender] = sender_spent + tx.get_cost()
+            self._push_follower(followers, sender, position, exclude)
+
+        for entry in taken:
+            heapq.heappush(self._heap, entry)
+
+        # Keep stale entries from piling up
+        if len(self._heap) > 2 * len(self._queues) + 64:
+            self._heap = list({e for e in self._heap if self._is_head(e[2], e[1])})
+            heapq.heapify(self._heap)
+
+        return selected
+
+    def __repr__(self) -> str:
+        return f"BlockTemplateBuilder(txs={len(self._entries)}, senders={len(self._queues)}, max_txs={self.max_txs})"
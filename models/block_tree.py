@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional
+from models.block import Block
+
+
+def block_work(block: Block) -> int:
+    """
+    Expected number of hashes needed to mine a block.
+
+    The difficulty target is a prefix of hex zeros, so each extra zero
+    multiplies the expected work by 16.
+    """
+    return 16 ** len(block.header.difficulty_target)
+
+
+class BlockNode:
+    """A block stored in the block tree together with its fork-choice data."""
+
+    def __init__(self, block: Block, parent: Optional["BlockNode"]):
+        """
+        Initialize a tree node.
+
+        Args:
+            block: The block stored in this node
+            parent: Node of the previous block (None for genesis)
+        """
+        self.block = block
+        self.hash = block.get_hash()
+        self.parent = parent
+        self.children: List["BlockNode"] = []
+
+        parent_work = parent.chain_work if parent else 0
+        self.height = parent.height + 1 if parent else 0
+        self.chain_work = parent_work + block_work(block)
+
+    def __repr__(self) -> str:
+        return (
+            f"BlockNode(height={self.height}, "
+            f"hash={self.hash[:16]}..., "
+            f"work={self.chain_work})"
+        )
+
+
+class BlockTree:
+    """
+    Tree of all known blocks keyed by hash.
+
+    Every block that connects to a known parent is kept, so competing
+    blocks at the same height can coexist. The active tip is the node
+    with the most cumulative work (first seen wins on ties).
+    """
+
+    def __init__(self, genesis: Block):
+        """
+        Initialize the tree with the genesis block as its root.
+
+        Args:
+            genesis: Genesis block
+        """
+        self.root = BlockNode(genesis, None)
+        self.nodes: Dict[str, BlockNode] = {self.root.hash: self.root}
+        self.tip = self.root
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, block_hash: str) -> Optional[BlockNode]:
+        """
+        Get the node for a block hash.
+        """
+        return self.nodes.get(block_hash)
+
+    def add_block(self, block: Block) -> Optional[BlockNode]:
+        """
+        Insert a block under its parent.
+
+        Args:
+            block: Block to insert
+
+        Returns:
+            The block's node, or None if the parent is unknown or the
+            block index does not follow the parent height
+        """
+        block_hash = block.get_hash()
+        if block_hash in self.nodes:
+            return self.nodes[block_hash]
+
+        parent = self.nodes.get(block.header.prev_block_hash)
+        if parent is None or block.index != parent.height + 1:
+            return None
+
+        node = BlockNode(block, parent)
+        parent.children.append(node)
+        self.nodes[block_hash] = node
+        return node
+
+    def remove(self, node: BlockNode) -> int:
+        """
+        Remove an invalid block and all of its descendants.
+
+        Returns:
+            Number of removed blocks
+        """
+        node.parent.children.remove(node)
+        stack = [node]
+        removed = 0
+        while stack:
+            current = stack.pop()
+            del self.nodes[current.hash]
+            stack.extend(current.children)
+            removed += 1
+        return removed
+
+    def has_more_work(self, node: BlockNode) -> bool:
+        """
+        Check whether a node should replace the current tip.
+        """
+        return node.chain_work > self.tip.chain_work
+
+    @staticmethod
+    def find_fork(a: BlockNode, b: BlockNode) -> BlockNode:
+        """
+        Find the last common ancestor of two nodes.
+        """
+        while a.height > b.height:
+            a = a.parent
+        while b.height > a.height:
+            b = b.parent
+        while a is not b:
+            a = a.parent
+            b = b.parent
+        return a
+
+    @staticmethod
+    def path_from(ancestor: BlockNode, node: BlockNode) -> List[BlockNode]:
+        """
+        Nodes from just after an ancestor down to (and including) a node.
+
+        Args:
+            ancestor: Ancestor node (excluded from the result)
+            node: Descendant node
+
+        Returns:
+            Nodes ordered by increasing height
+        """
+        path = []
+        while node is not ancestor:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+    def __repr__(self) -> str:
+        return f"BlockTree(blocks={len(self.nodes)}, tip={self.tip.hash[:16]}..., height={self.tip.height})"
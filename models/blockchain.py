@@ -1,36 +1,127 @@
+import contextlib
 import random
-import time
-import uuid
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Set, Tuple
 
-from hash_utils import my_hash
+import ed25519
+from hash_utils import DEFAULT_HASH_BACKEND, make_version
 from models.user import User
 from models.transaction import Transaction
 from models.block import Block
-from models.mining_pool import MiningPool
+from models.block_template import BlockTemplateBuilder
+from models.block_tree import BlockTree, BlockNode
+from models.block_producer import PipelinedProducer
+from models.environment import SeededIdSource, SimulatedClock, SystemClock, UuidSource
+from models.mining_pool import MiningPool, CandidateBlock
+from models.signature_verifier import SignatureVerifier
+from models.sparse_merkle_tree import SparseMerkleTree
+from models.tx_index import ConfirmedTxIndex
 
 
 class Blockchain:
     """Main blockchain class managing the entire blockchain system."""
     
-    def __init__(self, difficulty_target: str = "000"):
+    def __init__(
+        self,
+        difficulty_target: str = "000",
+        genesis_block: Optional[Block] = None,
+        require_signatures: bool = False,
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+        num_candidates: int = 5,
+        mining_workers: int = 1,
+        profiler=None,
+        tx_index_path: str = ":memory:",
+        seed: Optional[int] = None,
+        clock=None,
+        id_source=None,
+        strict_execution: bool = False,
+    ):
         """
         Initialize blockchain.
         
         Args:
             difficulty_target: Mining difficulty (e.g., "000" means hash must start with 000)
+            genesis_block: Existing genesis block to start from (default: mine a new one)
+            require_signatures: Give users Ed25519 keys and reject unsigned transactions
+            hash_backend: Hash backend for blocks, Merkle trees and transactions
+                ("custom", "sha256", "sha256d", "blake2b"); recorded in the header version
+            num_candidates: Candidate blocks mined competitively per height
+            mining_workers: Processes searching nonces in parallel
+            profiler: Optional profiling.PhaseProfiler that times each block's
+                assembly, mining and apply phases
+            tx_index_path: SQLite file of the confirmed transaction index
+                (default: in memory)
+            seed: Seed for all randomness. With a seed (and a single mining
+                worker) the whole run, block hashes included, is reproducible
+            clock: Source of timestamps (default: SimulatedClock if seeded,
+                else the wall clock)
+            id_source: Source of user keys and transaction IDs (default:
+                SeededIdSource if seeded, else UUID4)
+            strict_execution: Reject blocks with a transaction that cannot
+                execute, so a transaction in a block is proof that it
+                executed (shard receipts rely on this)
         """
+        self.seed = seed
+        # Unseeded runs keep using the global generator, as they always did
+        self.rng = random.Random(seed) if seed is not None else random
+        if clock is None:
+            clock = SimulatedClock() if seed is not None else SystemClock()
+        if id_source is None:
+            id_source = SeededIdSource(self.rng.getrandbits(64)) if seed is not None else UuidSource()
+        self.clock = clock
+        self.id_source = id_source
+
         self.users: Dict[str, User] = {}
         self.pending_transactions: List[Transaction] = []
+        # Fee-ordered view of the pending pool, updated on every mempool change
+        self.template_builder = BlockTemplateBuilder()
+        # Fees paid by confirmed transactions (removed from user balances)
+        self.collected_fees = 0
+        
+        # Signatures are optional unless required; signed ones are always checked
+        self.require_signatures = require_signatures
+        self.signature_verifier = SignatureVerifier()
         self.chain: List[Block] = []
 
-        self.version = 1
+        # All known blocks (including side branches); self.chain is the
+        # active branch from genesis to the most-work tip
+        self.block_tree: Optional[BlockTree] = None
+        # Undo data: transactions actually applied by each connected block
+        self._applied_txs: Dict[str, List[Transaction]] = {}
+        # IDs of transactions in the active chain, to reject replays
+        self.confirmed_txs = ConfirmedTxIndex(tx_index_path)
+        # Balances given to users outside of blocks: (tip height, [(key, name, balance)])
+        self.allocations: List[Tuple[int, List[Tuple[str, str, int]]]] = []
+
+        self.hash_backend = hash_backend
+        self.version = make_version(hash_backend)
+        # Sparse Merkle commitment to all balances; its root goes into each header
+        self.state_tree = SparseMerkleTree(hash_backend)
         self.difficulty_target = difficulty_target
+        self.strict_execution = strict_execution
         
         # Mining pool for competitive mining
-        self.mining_pool = MiningPool(num_candidates=5)
+        self.mining_pool = MiningPool(
+            num_candidates=num_candidates,
+            workers=mining_workers,
+            rng=self.rng,
+            clock=self.clock,
+        )
+        self.profiler = profiler
 
-        self._create_genesis_block()
+        if genesis_block is None:
+            self._create_genesis_block()
+        else:
+            genesis_block.seal()
+            self.chain.append(genesis_block)
+            self.block_tree = BlockTree(genesis_block)
+
+    def phase(self, name: str, block: Optional[int] = None):
+        """
+        Context manager measuring a phase with the profiler, if one is set.
+        """
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.phase(name, block)
 
     def _create_genesis_block(self) -> None:
         """Create the genesis (first) block."""
@@ -43,7 +134,7 @@ class Blockchain:
             version=self.version,
             transactions=[],
             difficulty_target=self.difficulty_target,
-            timestamp=int(time.time()),
+            timestamp=int(self.clock.time()),
         )
         
         # Try mining with attempt limit, accept any hash if limit reached
@@ -64,7 +155,9 @@ class Blockchain:
             print(f"[FALLBACK] No valid hash found in {max_attempts} attempts")
             print(f"[FALLBACK] Accepting genesis block with hash: {block_hash[:16]}...")
 
+        genesis_block.seal()
         self.chain.append(genesis_block)
+        self.block_tree = BlockTree(genesis_block)
 
         print("[OK] Genesis blokas sukurtas!")
         print(f"     Hash: {block_hash[:32]}...")
@@ -77,34 +170,92 @@ class Blockchain:
         """
         print(f"[INFO] Generuojami {n} vartotojai...")
 
+        users = []
         for _ in range(n):
-            name = f"User_{uuid.uuid4().hex[:6]}"
-            public_key = uuid.uuid4().hex
-            balance = random.randint(100, 1_000_000)
+            private_key = None
+            if self.require_signatures:
+                seed = self.rng.getrandbits(256).to_bytes(32, "little") if self.seed is not None else None
+                private_key, public_key = ed25519.generate_keypair(seed)
+            else:
+                public_key = self.id_source.next_id()
+            # Independent of the key, as user names always were
+            name = f"User_{self.id_source.next_id()[-6:]}"
+            balance = self.rng.randint(100, 1_000_000)
 
-            self.users[public_key] = User(
+            users.append(User(
                 name=name,
                 public_key=public_key,
                 balance=balance,
-            )
+                private_key=private_key,
+            ))
 
+        self.add_users(users)
         print(f"[OK] Sugeneruota {len(self.users)} vartotojų.\n")
 
+    def add_users(self, users: Iterable[User]) -> None:
+        """
+        Register users and commit their balances to the state tree.
+        """
+        users = list(users)
+        for user in users:
+            self.users[user.public_key] = user
+        self.state_tree.update({user.public_key: user.balance for user in users})
+        # Recorded so an exported chain can rebuild the same balances
+        self.allocations.append((
+            len(self.chain) - 1,
+            [(user.public_key, user.name, user.balance) for user in users],
+        ))
+
+    @property
+    def state_root(self) -> str:
+        """Root of the sparse Merkle tree over current balances."""
+        return self.state_tree.get_root()
+
+    def get_balance_proof(self, public_key: str) -> Optional[Tuple[int, List[str]]]:
+        """
+        Build a balance proof against the state committed by the tip header.
+        Light clients verify it with HeaderChain.verify_balance.
+
+        Returns:
+            (block height, proof) or None if the account does not exist
+        """
+        proof = self.state_tree.get_proof(public_key)
+        if proof is None:
+            return None
+        return len(self.chain) - 1, proof
+
     def validate_transaction(self, tx: Transaction) -> bool:
         """
         Validate a transaction before adding to pending pool.
         """
         # Check hash integrity
+        if tx.hash_backend != self.hash_backend:
+            print(f"[VERIFY] Transaction {tx.tx_id[:8]} - wrong hash backend '{tx.hash_backend}'!")
+            return False
         if not tx.verify_hash():
             return False
         
+        # Reject replays of pending and confirmed transactions
+        if tx.tx_id in self.template_builder:
+            print(f"[VERIFY] Transaction {tx.tx_id[:8]} - already pending!")
+            return False
+        if tx.tx_id in self.confirmed_txs:
+            print(f"[VERIFY] Transaction {tx.tx_id[:8]} - already confirmed!")
+            return False
+        
+        # Check signature (cached, so re-validation is free)
+        if tx.signature is not None or self.require_signatures:
+            if not self.signature_verifier.verify(tx):
+                print(f"[VERIFY] Transaction {tx.tx_id[:8]} - invalid or missing signature!")
+                return False
+        
         # Check sender exists
         if tx.sender_key not in self.users:
             print(f"[VERIFY] Transaction {tx.tx_id[:8]} - sender not found!")
             return False
         
-        # Check receiver exists
-        if tx.receiver_key not in self.users:
+        # Check receivers exist (one for plain, many for batch transactions)
+        if any(receiver_key not in self.users for receiver_key, _ in tx.outputs):
             print(f"[VERIFY] Transaction {tx.tx_id[:8]} - receiver not found!")
             return False
         
@@ -115,9 +266,20 @@ class Blockchain:
         
         return True
 
-    def generate_transactions(self, m: int = 10000):
+    def add_pending_transaction(self, tx: Transaction) -> None:
+        """
+        Add an already validated transaction to the pending pool.
+        """
+        self.pending_transactions.append(tx)
+        self.template_builder.add(tx)
+
+    def generate_transactions(self, m: int = 10000, max_fee: int = 0):
         """
         Generate random transactions with validation.
+        
+        Args:
+            m: Number of transactions
+            max_fee: Fees are drawn uniformly from [0, max_fee] (default: no fees)
         """
         print(f"\n{'='*60}")
         print(f"📝 TRANSAKCIJŲ GENERAVIMAS")
@@ -126,28 +288,47 @@ class Blockchain:
         print()
 
         keys = list(self.users.keys())
+        rng = self.rng
         valid_count = 0
         invalid_count = 0
         
         # Show first 5 transactions in detail
         show_details = 5
         
-        for i in range(m):
-            sender_key, receiver_key = random.sample(keys, 2)
+        txs = []
+        for _ in range(m):
+            sender_key, receiver_key = rng.sample(keys, 2)
             sender = self.users[sender_key]
-            receiver = self.users[receiver_key]
+            
+            fee = rng.randint(0, max_fee) if max_fee else 0
             
             # Generate amount (sometimes intentionally too high to test validation)
-            if random.random() < 0.95:  # 95% valid transactions
-                amount = random.randint(1, min(5000, sender.balance))
+            if rng.random() < 0.95:  # 95% valid transactions
+                amount = rng.randint(1, max(1, min(5000, sender.balance - fee)))
             else:  # 5% invalid (insufficient balance)
-                amount = sender.balance + random.randint(1, 1000)
+                amount = sender.balance + rng.randint(1, 1000)
 
             tx = Transaction(
                 sender_key=sender_key,
                 receiver_key=receiver_key,
                 amount=amount,
+                fee=fee,
+                hash_backend=self.hash_backend,
+                tx_id=self.id_source.next_tx_id(),
+                timestamp=int(self.clock.time()),
             )
+            if sender.private_key is not None:
+                tx.sign(sender.private_key)
+            txs.append(tx)
+        
+        # One batch check fills the signature cache, so the per-transaction
+        # validation below does not verify signatures again
+        if self.require_signatures:
+            self.signature_verifier.verify_batch(txs)
+        
+        for i, tx in enumerate(txs):
+            sender = self.users[tx.sender_key]
+            receiver = self.users[tx.receiver_key]
             
             # Validate before adding
             is_valid = self.validate_transaction(tx)
@@ -157,16 +338,17 @@ class Blockchain:
                 status = "VALID" if is_valid else "INVALID"
                 print(f"Transaction #{i+1} {status}")
                 print(f"  ID:       {tx.tx_id[:16]}...")
-                print(f"  From:     {sender.name} ({sender_key[:8]}...)")
-                print(f"  To:       {receiver.name} ({receiver_key[:8]}...)")
-                print(f"  Amount:   {amount}")
+                print(f"  From:     {sender.name} ({tx.sender_key[:8]}...)")
+                print(f"  To:       {receiver.name} ({tx.receiver_key[:8]}...)")
+                print(f"  Amount:   {tx.amount}")
+                print(f"  Fee:      {tx.fee}")
                 print(f"  Balance:  {sender.balance}")
                 print(f"  Hash:     {tx.get_hash()[:32]}...")
                 print(f"  Time:     {tx.timestamp}")
                 print()
             
             if is_valid:
-                self.pending_transactions.append(tx)
+                self.add_pending_transaction(tx)
                 valid_count += 1
             else:
                 invalid_count += 1
@@ -179,42 +361,143 @@ class Blockchain:
         print(f"📦 Transakcijų fonde:       {len(self.pending_transactions)}")
         print(f"{'='*60}\n")
 
-    def pick_transactions_for_block(self, k: int = 100) -> List[Transaction]:
+    def pick_transactions_for_block(
+        self,
+        k: int = 100,
+        exclude: Optional[Set[str]] = None,
+        ahead: Optional[List[Transaction]] = None,
+    ) -> List[Transaction]:
         """
-        Pick transactions for a block.
+        Pick transactions for a block, maximizing total fees while keeping
+        each sender's transactions in order and within their balance.
         
         Args:
             k: Number of transactions to pick
+            exclude: IDs of transactions that must not be picked (e.g.
+                the ones in candidates still being mined)
+            ahead: Transactions expected to be confirmed first; the pick
+                is made against the balances after them
             
         Returns:
             List of transactions
         """
-        return self.pending_transactions[:k]
+        balance_changes: Dict[str, int] = {}
+        for tx in ahead or []:
+            balance_changes[tx.sender_key] = balance_changes.get(tx.sender_key, 0) - tx.get_cost()
+            for receiver_key, amount in tx.outputs:
+                balance_changes[receiver_key] = balance_changes.get(receiver_key, 0) + amount
+        return self.template_builder.build(
+            self.users, max_txs=k, exclude=exclude, balance_changes=balance_changes
+        )
+
+    def get_merkle_proof(self, tx_id: str) -> Optional[Tuple[int, List[tuple]]]:
+        """
+        Find a confirmed transaction and build its Merkle proof.
+        Light clients verify the proof against the header at the returned height.
+        
+        Returns:
+            (block height, proof) or None if the transaction is not in the chain
+        """
+        height = self.confirmed_txs.get_height(tx_id)
+        if height is None:
+            return None
+        return height, self.chain[height].merkle_tree.get_proof(tx_id)
 
     def mine_block_competitively(self, tx_count: int = 100) -> Optional[Block]:
         """
         Mine a block using competitive mining with multiple candidates.
         """
-        if len(self.pending_transactions) < tx_count:
-            tx_count = len(self.pending_transactions)
-        
-        if tx_count == 0:
+        candidates = self.assemble_candidates(tx_count)
+        if not candidates:
             return None
+        return self.mine_candidates(candidates)
+
+    def assemble_candidates(self, tx_count: int = 100) -> List[CandidateBlock]:
+        """
+        Build the candidate blocks for the next height, each committing to
+        the state root its transactions produce.
         
+        Returns:
+            Candidates ready for mining (empty if nothing is pending)
+        """
         prev_block_hash = self.chain[-1].get_hash()
         
-        print(f"\n[POOL] Kuriami kandidatiniai blokai ({self.mining_pool.num_candidates} vnt)...")
-        
-        # Create candidate blocks
-        candidates = self.mining_pool.create_candidates(
-            all_transactions=self.pending_transactions,
-            prev_block_hash=prev_block_hash,
-            index=len(self.chain),
-            version=self.version,
-            difficulty_target=self.difficulty_target,
-            tx_per_block=tx_count,
-        )
-        
+        # Strict execution can drop every candidate's transactions from the
+        # pending pool; each such round drops at least one, so this ends
+        while tx_count > 0 and self.pending_transactions:
+            block_tx_count = min(tx_count, len(self.pending_transactions))
+            
+            print(f"\n[POOL] Kuriami kandidatiniai blokai ({self.mining_pool.num_candidates} vnt)...")
+            
+            # Create candidate blocks
+            candidates = self.mining_pool.create_candidates(
+                all_transactions=self.pending_transactions,
+                prev_block_hash=prev_block_hash,
+                index=len(self.chain),
+                version=self.version,
+                difficulty_target=self.difficulty_target,
+                tx_per_block=block_tx_count,
+                template=self.pick_transactions_for_block(block_tx_count),
+            )
+            self.set_candidate_state_roots(candidates)
+            if candidates[0].block.transactions:
+                return candidates
+        return []
+
+    def set_candidate_state_roots(self, candidates: List[CandidateBlock]) -> None:
+        """
+        Commit each unmined candidate to the state its transactions produce.
+
+        With strict execution, transactions that would be skipped are left
+        out of the candidate first. The ones no candidate executes and
+        whose sender cannot pay for them at all are dropped from the
+        pending pool, so they are not offered again.
+        """
+        if not self.strict_execution:
+            for candidate in candidates:
+                candidate.block.header.state_root = self.compute_state_root(candidate.block.transactions)
+            return
+
+        executed: Set[str] = set()
+        unpayable: Set[str] = set()
+        for candidate in candidates:
+            block = candidate.block
+            applied, skipped, state_root = self._dry_run(block.transactions)
+            executed.update(tx.tx_id for tx in applied)
+            unpayable.update(
+                tx.tx_id for tx, reason in skipped
+                if reason != "insufficient balance at execution"
+                or self.users[tx.sender_key].balance < tx.get_cost()
+            )
+            if skipped:
+                candidate.block = Block.build(
+                    index=block.index,
+                    prev_block_hash=block.header.prev_block_hash,
+                    version=block.header.version,
+                    transactions=applied,
+                    difficulty_target=block.header.difficulty_target,
+                    timestamp=block.header.timestamp,
+                )
+            candidate.block.header.state_root = state_root
+
+        # An empty candidate only wins if nothing else can be mined
+        candidates[:] = [c for c in candidates if c.block.transactions] or candidates[:1]
+        self.drop_pending_transactions(unpayable - executed)
+
+    def drop_pending_transactions(self, tx_ids: Set[str]) -> None:
+        """
+        Remove transactions from the pending pool without confirming them.
+        """
+        if not tx_ids:
+            return
+        print(f"[DROP] {len(tx_ids)} transakcijos negali būti įvykdytos, pašalinamos iš fondo")
+        self.pending_transactions = [t for t in self.pending_transactions if t.tx_id not in tx_ids]
+        self.template_builder.remove_many(tx_ids)
+
+    def mine_candidates(self, candidates: List[CandidateBlock]) -> Optional[Block]:
+        """
+        Run competitive mining over prepared candidate blocks.
+        """
         print(f"[MINING] Pradedamas konkurencinis kasimas...\n")
         
         # Mine competitively with faster fallback parameters
@@ -229,44 +512,308 @@ class Blockchain:
         else:
             return None
 
-    def apply_block_state_changes(self, block: Block) -> None:
+    def _apply_transaction(self, tx: Transaction) -> bool:
         """
-        Apply state changes from a mined block.
-        Only applies valid transactions (balance check at execution time).
+        Apply a single transaction to user balances.
+
+        Returns:
+            True if applied, False if skipped (insufficient balance)
+        """
+        sender = self.users[tx.sender_key]
+
+        # Re-check balance at execution time (may have changed since validation)
+        if sender.balance < tx.get_cost():
+            return False
+
+        # Batch transactions debit the total once, then credit every output
+        sender.debit(tx.get_cost())
+        for receiver_key, amount in tx.outputs:
+            self.users[receiver_key].credit(amount)
+        self.collected_fees += tx.fee
+        return True
+
+    def _undo_transaction(self, tx: Transaction) -> None:
         """
-        applied_count = 0
-        skipped_count = 0
+        Revert a previously applied transaction.
+        """
+        for receiver_key, amount in tx.outputs:
+            self.users[receiver_key].debit(amount)
+        self.users[tx.sender_key].credit(tx.get_cost())
+        self.collected_fees -= tx.fee
+
+    def _execute_transactions(
+        self,
+        transactions: List[Transaction],
+    ) -> Tuple[List[Transaction], List[Tuple[Transaction, str]]]:
+        """
+        Apply transactions in order, skipping the ones that cannot execute.
+
+        Returns:
+            (applied transactions, (skipped transaction, reason) pairs)
+        """
+        applied: List[Transaction] = []
+        skipped: List[Tuple[Transaction, str]] = []
         
-        for tx in block.transactions:
-            sender = self.users[tx.sender_key]
-            receiver = self.users[tx.receiver_key]
-            
-            # Re-check balance at execution time (may have changed since validation)
-            if sender.balance >= tx.amount:
-                sender.debit(tx.amount)
-                receiver.credit(tx.amount)
-                applied_count += 1
+        # Signatures verified at admission are cache hits; unknown ones are batch-checked
+        if self.require_signatures or any(tx.signature is not None for tx in transactions):
+            signature_ok = self.signature_verifier.verify_batch(transactions)
+        else:
+            signature_ok = [True] * len(transactions)
+        
+        for tx, has_valid_signature in zip(transactions, signature_ok):
+            if not has_valid_signature:
+                skipped.append((tx, "invalid signature"))
+            elif self._apply_transaction(tx):
+                applied.append(tx)
             else:
                 # Skip transaction if insufficient balance at execution time
-                skipped_count += 1
-                print(f"[SKIP] Transaction {tx.tx_id[:8]}... skipped (insufficient balance at execution)")
+                skipped.append((tx, "insufficient balance at execution"))
+        
+        return applied, skipped
+
+    def _touched_balances(self, transactions: List[Transaction]) -> Dict[str, int]:
+        """Current balances of every account the transactions touch."""
+        users = self.users
+        balances: Dict[str, int] = {}
+        for tx in transactions:
+            balances[tx.sender_key] = users[tx.sender_key].balance
+            for receiver_key, _ in tx.outputs:
+                balances[receiver_key] = users[receiver_key].balance
+        return balances
 
-        if skipped_count > 0:
-            print(f"[INFO] Applied {applied_count} transactions, skipped {skipped_count} (insufficient balance)")
+    def _dry_run(
+        self,
+        transactions: List[Transaction],
+    ) -> Tuple[List[Transaction], List[Tuple[Transaction, str]], str]:
+        """
+        Execute transactions on top of the current state and undo them.
 
-        used_ids = {t.tx_id for t in block.transactions}
+        Returns:
+            (applied transactions, (skipped transaction, reason) pairs,
+            state root after the applied ones)
+        """
+        applied, skipped = self._execute_transactions(transactions)
+        state_root = self.state_tree.root_with(self._touched_balances(applied))
+        for tx in reversed(applied):
+            self._undo_transaction(tx)
+        return applied, skipped, state_root
+
+    def compute_state_root(self, transactions: List[Transaction]) -> str:
+        """
+        State root after executing transactions on top of the current state.
+        The state is left unchanged (dry run).
+        """
+        return self._dry_run(transactions)[2]
+
+    def compute_state_roots_after(
+        self,
+        ahead: List[Transaction],
+        batches: List[List[Transaction]],
+    ) -> List[str]:
+        """
+        State root of each transaction batch executed on top of the state
+        after `ahead` (e.g. the block being mined). The state is left
+        unchanged (dry run).
+
+        Returns:
+            One state root per batch
+        """
+        # The tree takes the effect of `ahead` once, not once per batch
+        applied_ahead, _ = self._execute_transactions(ahead)
+        self.state_tree.update(self._touched_balances(applied_ahead))
+        state_roots = []
+        for transactions in batches:
+            applied, _ = self._execute_transactions(transactions)
+            state_roots.append(self.state_tree.root_with(self._touched_balances(applied)))
+            for tx in reversed(applied):
+                self._undo_transaction(tx)
+        for tx in reversed(applied_ahead):
+            self._undo_transaction(tx)
+        self.state_tree.update(self._touched_balances(applied_ahead))
+        return state_roots
+
+    def apply_block_state_changes(self, block: Block) -> bool:
+        """
+        Apply state changes from a mined block.
+        Only applies valid transactions (balance check at execution time),
+        then re-hashes the touched accounts in the state tree.
+
+        Returns:
+            True if applied, False if the block repeats a transaction, has
+            one that cannot execute (strict execution only) or the
+            resulting state does not match the block's state root (the
+            block is then fully undone)
+        """
+        tx_ids = [tx.tx_id for tx in block.transactions]
+        if len(set(tx_ids)) != len(tx_ids):
+            print(f"[REJECT] Block #{block.index} includes a transaction twice")
+            return False
+        replayed = next((tx_id for tx_id in tx_ids if tx_id in self.confirmed_txs), None)
+        if replayed is not None:
+            print(f"[REJECT] Block #{block.index} includes already confirmed transaction {replayed[:8]}...")
+            return False
+        
+        applied, skipped = self._execute_transactions(block.transactions)
+        if skipped and self.strict_execution:
+            print(f"[REJECT] Block #{block.index} includes transaction {skipped[0][0].tx_id[:8]}... "
+                  f"that cannot execute ({skipped[0][1]})")
+            for tx in reversed(applied):
+                self._undo_transaction(tx)
+            return False
+        
+        for tx, reason in skipped:
+            print(f"[SKIP] Transaction {tx.tx_id[:8]}... skipped ({reason})")
+        if skipped:
+            print(f"[INFO] Applied {len(applied)} transactions, skipped {len(skipped)}")
+
+        state_root = self.state_tree.update(self._touched_balances(applied))
+        if state_root != block.header.state_root:
+            print(f"[REJECT] Block #{block.index} state root mismatch: "
+                  f"expected {block.header.state_root[:16]}..., got {state_root[:16]}...")
+            for tx in reversed(applied):
+                self._undo_transaction(tx)
+            self.state_tree.update(self._touched_balances(applied))
+            return False
+
+        # Remember what was applied so a reorg can undo exactly this block
+        self._applied_txs[block.get_hash()] = applied
+        self.confirmed_txs.add_block(tx_ids, block.index)
+
+        used_ids = set(tx_ids)
         self.pending_transactions = [
             t for t in self.pending_transactions if t.tx_id not in used_ids
         ]
+        self.template_builder.remove_many(used_ids)
+        return True
+
+    def get_applied_transactions(self, block: Block) -> List[Transaction]:
+        """
+        Transactions of a connected block that actually executed
+        (the ones skipped at execution time are left out).
+        """
+        return self._applied_txs.get(block.get_hash(), [])
+
+    def revert_block_state_changes(self, block: Block) -> None:
+        """
+        Undo the state changes of a connected block.
+        Block transactions are returned to the front of the pending pool.
+        """
+        applied = self._applied_txs.pop(block.get_hash(), [])
+        self.confirmed_txs.remove(tx.tx_id for tx in block.transactions)
+        for tx in reversed(applied):
+            self._undo_transaction(tx)
+        self.state_tree.update(self._touched_balances(applied))
 
-    def add_block_to_chain(self, block: Block) -> None:
+        self.pending_transactions = list(block.transactions) + self.pending_transactions
+        self.template_builder.add_front(block.transactions)
+
+    def add_block_to_chain(self, block: Block) -> bool:
         """
-        Add a mined block to the chain.
+        Add a mined block whose state changes were already applied.
+        The block must extend the current tip.
         """
+        block.seal()
+        node = self.block_tree.add_block(block)
+        if node is None or node.parent is not self.block_tree.tip:
+            print(f"[ERROR] Block #{block.index} does not extend the current tip!")
+            return False
+
         self.chain.append(block)
+        self.block_tree.tip = node
         
         # Display block like Bitcoin Block Explorer
         self._display_block_info(block)
+        return True
+
+    def import_block(self, block: Block) -> bool:
+        """
+        Connect a block on top of the tip without mining or display
+        (bulk import). Replays, signatures and the state root are checked
+        while connecting.
+
+        Returns:
+            True if the block was connected
+        """
+        block.seal()
+        node = self.block_tree.add_block(block)
+        if node is None or node.parent is not self.block_tree.tip:
+            print(f"[ERROR] Block #{block.index} does not extend the current tip!")
+            return False
+
+        if not self.apply_block_state_changes(block):
+            self.block_tree.remove(node)
+            return False
+
+        self.chain.append(block)
+        self.block_tree.tip = node
+        return True
+
+    def submit_block(self, block: Block) -> bool:
+        """
+        Insert a block into the block tree and switch to the most-work tip.
+
+        Blocks extending the tip are connected directly. Blocks on a side
+        branch are kept, and a branch with more cumulative work than the
+        active one triggers a reorganization.
+
+        Returns:
+            True if the block was accepted into the tree, False if its
+            parent is unknown or connecting it produced a wrong state root
+        """
+        block_hash = block.seal()
+        if block_hash in self.block_tree:
+            return True
+
+        node = self.block_tree.add_block(block)
+        if node is None:
+            print(f"[REJECT] Block #{block.index} has unknown parent {block.header.prev_block_hash[:16]}...")
+            return False
+
+        if not self.block_tree.has_more_work(node):
+            print(f"[FORK] Block #{block.index} stored on side branch ({block_hash[:16]}...)")
+            return True
+
+        return self._reorganize(node)
+
+    def _reorganize(self, new_tip: BlockNode) -> bool:
+        """
+        Switch the active chain to a new tip.
+        Only blocks between the fork point and the tips are touched.
+        If a block on the new branch turns out invalid, it is removed
+        from the tree (with its descendants) and the old branch is restored.
+
+        Returns:
+            True if the new tip became active
+        """
+        old_tip = self.block_tree.tip
+        fork = BlockTree.find_fork(old_tip, new_tip)
+
+        disconnect = BlockTree.path_from(fork, old_tip)
+        connect = BlockTree.path_from(fork, new_tip)
+
+        if disconnect:
+            print(f"[REORG] Fork at #{fork.height}: disconnecting {len(disconnect)}, connecting {len(connect)} blocks")
+
+        for node in reversed(disconnect):
+            self.revert_block_state_changes(node.block)
+        del self.chain[fork.height + 1:]
+
+        for i, node in enumerate(connect):
+            if not self.apply_block_state_changes(node.block):
+                removed = self.block_tree.remove(node)
+                print(f"[REJECT] Block #{node.height} and {removed - 1} descendants removed")
+                for connected in reversed(connect[:i]):
+                    self.revert_block_state_changes(connected.block)
+                del self.chain[fork.height + 1:]
+                for old in disconnect:
+                    self.apply_block_state_changes(old.block)
+                    self.chain.append(old.block)
+                return False
+            self.chain.append(node.block)
+            self._display_block_info(node.block)
+
+        self.block_tree.tip = new_tip
+        return True
     
     def _display_block_info(self, block: Block) -> None:
         """Display block information in Bitcoin Block Explorer style."""
@@ -276,6 +823,7 @@ class Blockchain:
         print(f"Hash:              {block.get_hash()}")
         print(f"Previous Hash:     {block.header.prev_block_hash[:32]}...")
         print(f"Merkle Root:       {block.get_merkle_root()}")
+        print(f"State Root:        {block.header.state_root}")
         print(f"Timestamp:         {block.header.timestamp}")
         print(f"Difficulty Target: {block.header.difficulty_target}")
         print(f"Nonce:             {block.header.nonce}")
@@ -291,33 +839,57 @@ class Blockchain:
                 receiver = self.users.get(tx.receiver_key)
                 print(f"\nTx #{i+1}: {tx.tx_id[:16]}...")
                 print(f"  From:   {sender.name if sender else 'Unknown'} → {tx.amount}")
-                print(f"  To:     {receiver.name if receiver else 'Unknown'}")
+                if len(tx.outputs) > 1:
+                    print(f"  To:     {len(tx.outputs)} gavėjai (paketinis mokėjimas)")
+                else:
+                    print(f"  To:     {receiver.name if receiver else 'Unknown'}")
                 print(f"  Hash:   {tx.get_hash()[:32]}...")
             print(f"\n{'-'*60}")
         
         print()
 
-    def mine_until_done(self, block_tx_count: int = 100):
+    def mine_until_done(self, block_tx_count: int = 100, pipelined: bool = False):
         """
         Mine all pending transactions using competitive mining.
+        
+        Args:
+            block_tx_count: Transactions per block
+            pipelined: Prepare the next block's candidates in the
+                background while the current block is being mined
         """
+        if pipelined:
+            PipelinedProducer(self).run(block_tx_count)
+            self._print_final_summary()
+            return
+
         while len(self.pending_transactions) > 0:
             print("=" * 60)
             print(f"[INFO] Grandinės ilgis: {len(self.chain)} blokų")
             print(f"[INFO] Laukiančių transakcijų: {len(self.pending_transactions)}")
 
-            new_block = self.mine_block_competitively(block_tx_count)
+            height = len(self.chain)
+            with self.phase("assembly", height):
+                candidates = self.assemble_candidates(block_tx_count)
+            with self.phase("mining", height):
+                new_block = self.mine_candidates(candidates) if candidates else None
             
             if not new_block:
                 print("[ERROR] Kasimas nepavyko!")
                 break
 
-            self.apply_block_state_changes(new_block)
-            self.add_block_to_chain(new_block)
+            with self.phase("apply", height):
+                connected = self.submit_block(new_block)
+            if not connected:
+                # Same pending pool, same template: retrying would loop forever
+                print(f"[ERROR] Blokas #{new_block.index} atmestas, kasimas sustabdomas!")
+                break
             
             print(f"✅ Liko neapdorotų transakcijų: {len(self.pending_transactions)}\n")
 
-        # Final summary
+        self._print_final_summary()
+
+    def _print_final_summary(self) -> None:
+        """Print the summary shown after mining finishes."""
         print("\n" + "=" * 60)
         print("🎉 BLOCKCHAIN SUMMARY")
         print("=" * 60)
@@ -329,6 +901,7 @@ class Blockchain:
         print(f"🔗 Genesis hash:            {self.chain[0].get_hash()[:32]}...")
         print(f"🔗 Last block hash:         {self.chain[-1].get_hash()[:32]}...")
         print(f"🌳 Last Merkle root:        {self.chain[-1].get_merkle_root()[:32]}...")
+        print(f"🌳 Last state root:         {self.chain[-1].header.state_root[:32]}...")
         print("=" * 60 + "\n")
 
     def summary(self) -> str:
@@ -341,4 +914,5 @@ class Blockchain:
             f"Laukiančių transakcijų: {len(self.pending_transactions)}\n"
             f"Paskutinio bloko hash: {self.chain[-1].get_hash()}\n"
             f"Paskutinio bloko Merkle root: {self.chain[-1].get_merkle_root()}\n"
+            f"Paskutinio bloko state root: {self.chain[-1].header.state_root}\n"
         )
\ No newline at end of file
@@ -0,0 +1,133 @@
+import hashlib
+import math
+from typing import List, Tuple
+
+
+def hash_pair(item: str) -> Tuple[int, int]:
+    """
+    Two 64-bit hashes of an item for double hashing (h1 + i*h2).
+    One blake2b call serves every stage of a scalable filter.
+    """
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter stored in a bytearray (one bit per slot).
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Number of items the filter is sized for
+            error_rate: False positive probability at full capacity
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def add_hashes(self, h1: int, h2: int) -> None:
+        """
+        Add an item given its hash pair.
+        """
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def contains_hashes(self, h1: int, h2: int) -> bool:
+        """
+        Check an item given its hash pair (stops at the first unset bit).
+        """
+        bits = self.bits
+        num_bits = self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, item: str) -> None:
+        self.add_hashes(*hash_pair(item))
+
+    def __contains__(self, item: str) -> bool:
+        return self.contains_hashes(*hash_pair(item))
+
+    def is_full(self) -> bool:
+        """Whether the filter reached the capacity it was sized for."""
+        return self.count >= self.capacity
+
+    def __repr__(self) -> str:
+        return f"BloomFilter(count={self.count}, capacity={self.capacity}, bits={self.num_bits}, hashes={self.num_hashes})"
+
+
+class ScalableBloomFilter:
+    """
+    Bloom filter that grows without a preset size (Almeida et al., 2007).
+
+    When the current stage is full, a new stage is added with `growth`
+    times the capacity and a false positive rate multiplied by
+    `tightening`, so the overall false positive rate stays below
+    error_rate however many items are added, and memory stays
+    proportional to the item count (about 2 bytes per item at 0.1%).
+    Stages grow geometrically, so a check touches only O(log n) small
+    stages, each usually rejected after one or two bit probes.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 1 << 16,
+        error_rate: float = 0.001,
+        growth: int = 2,
+        tightening: float = 0.5,
+    ):
+        """
+        Args:
+            initial_capacity: Capacity of the first stage
+            error_rate: Bound on the overall false positive rate
+            growth: Capacity multiplier for each new stage
+            tightening: Error rate multiplier for each new stage
+        """
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        # Stage error rates form a geometric series summing to error_rate
+        self.filters: List[BloomFilter] = [
+            BloomFilter(initial_capacity, error_rate * (1 - tightening))
+        ]
+
+    def add(self, item: str) -> None:
+        """
+        Add an item.
+        """
+        last = self.filters[-1]
+        if last.is_full():
+            last = BloomFilter(last.capacity * self.growth, last.error_rate * self.tightening)
+            self.filters.append(last)
+        last.add_hashes(*hash_pair(item))
+
+    def __contains__(self, item: str) -> bool:
+        h1, h2 = hash_pair(item)
+        # Newest stages are the largest and most likely to hold recent items
+        for bloom in reversed(self.filters):
+            if bloom.contains_hashes(h1, h2):
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def size_in_bytes(self) -> int:
+        """Memory used by the bit arrays."""
+        return sum(len(bloom.bits) for bloom in self.filters)
+
+    def __repr__(self) -> str:
+        return f"ScalableBloomFilter(items={len(self)}, stages={len(self.filters)}, bytes={self.size_in_bytes})"
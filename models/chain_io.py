@@ -0,0 +1,524 @@
+"""
+Streaming export and import of whole chains.
+
+Two formats carry the same records:
+
+* JSONL: one JSON object per line. A "chain" record, then for every
+  block a "header" record followed by its transactions in "txs" records
+  of at most chunk_size entries. User balances created outside of blocks
+  are written as "accounts" records right after the block they followed.
+  A batch transaction's receiver is its list of [receiver, amount] outputs.
+* Binary columnar: a magic string, then tagged sections. Blocks are
+  grouped into chunks of chunk_size blocks; each chunk stores every
+  header field and every transaction field as its own column (fixed
+  width arrays, raw 32-byte hashes, length-prefixed strings). Account
+  keys are stored once and transactions refer to them by index.
+
+Both writers and readers work one record or chunk at a time, so the
+file is never built or loaded whole. Importing rebuilds the chain and
+balances without mining: each block is checked while it streams in
+(header hash, Merkle root, optional proof-of-work, then replays,
+signatures and the state root when it is connected).
+"""
+import json
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.block import Block, BlockHeader
+from models.blockchain import Blockchain
+from models.transaction import BatchTransaction, Transaction
+from models.user import User
+
+FORMAT_VERSION = 2
+# Version 2 added batch transaction outputs; version 1 files still load
+READABLE_VERSIONS = (1, 2)
+BINARY_MAGIC = b"SBCHAIN\x01"
+
+_SECTION = struct.Struct("<cQ")
+_META, _ACCOUNTS, _BLOCKS = b"C", b"A", b"B"
+
+
+def _chain_record(blockchain: Blockchain) -> Dict:
+    """Chain-wide parameters needed to rebuild the chain."""
+    return {
+        "type": "chain",
+        "format": FORMAT_VERSION,
+        "hash_backend": blockchain.hash_backend,
+        "difficulty_target": blockchain.difficulty_target,
+        "require_signatures": blockchain.require_signatures,
+        "height": len(blockchain.chain) - 1,
+    }
+
+
+def _iter_events(blockchain: Blockchain) -> Iterator[Tuple]:
+    """
+    Yield ("block", block) and ("accounts", height, accounts) in the
+    order an importer must replay them.
+    """
+    allocations = sorted(blockchain.allocations, key=lambda allocation: allocation[0])
+    position = 0
+    for block in blockchain.chain:
+        yield ("block", block)
+        while position < len(allocations) and allocations[position][0] <= block.index:
+            yield ("accounts",) + allocations[position]
+            position += 1
+    # Allocations above the tip (e.g. after a reorg) go at the end
+    for allocation in allocations[position:]:
+        yield ("accounts",) + allocation
+
+
+def _receiver_field(tx: Transaction):
+    """Receiver key, or [[receiver, amount], ...] for a batch transaction."""
+    if isinstance(tx, BatchTransaction):
+        return [list(output) for output in tx.outputs]
+    return tx.receiver_key
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# ---------------------------------------------------------------- JSONL
+
+def _export_jsonl(blockchain: Blockchain, stream, chunk_size: int) -> None:
+    write = stream.write
+    write(json.dumps(_chain_record(blockchain)) + "\n")
+
+    for event in _iter_events(blockchain):
+        if event[0] == "accounts":
+            _, height, accounts = event
+            for chunk in _chunks(accounts, chunk_size):
+                write(json.dumps({"type": "accounts", "height": height, "accounts": chunk}) + "\n")
+            continue
+
+        block = event[1]
+        header = block.header
+        write(json.dumps({
+            "type": "header",
+            "version": header.version,
+            "index": header.index,
+            "prev_block_hash": header.prev_block_hash,
+            "merkle_root": header.merkle_root,
+            "state_root": header.state_root,
+            "timestamp": header.timestamp,
+            "difficulty_target": header.difficulty_target,
+            "nonce": header.nonce,
+            "hash": block.get_hash(),
+            "tx_count": len(block.transactions),
+        }) + "\n")
+        for chunk in _chunks(block.transactions, chunk_size):
+            write(json.dumps({
+                "type": "txs",
+                "block": header.index,
+                "txs": [
+                    [tx.tx_id, tx.sender_key, _receiver_field(tx), tx.amount, tx.fee, tx.timestamp, tx.signature]
+                    for tx in chunk
+                ],
+            }) + "\n")
+
+
+def _read_jsonl(stream) -> Iterator[Tuple]:
+    """Yield ("chain", record), ("accounts", accounts) and ("block", header, txs)."""
+    header = None
+    txs: List[List] = []
+    for line_number, line in enumerate(stream, 1):
+        record = json.loads(line)
+        kind = record.get("type")
+        if header is not None and kind != "txs":
+            raise ValueError(f"Line {line_number}: block #{header['index']} has "
+                             f"{len(txs)} of {header['tx_count']} transactions")
+
+        if kind == "chain":
+            yield ("chain", record)
+        elif kind == "accounts":
+            yield ("accounts", record["accounts"])
+        elif kind == "header":
+            header, txs = record, []
+        elif kind == "txs":
+            if header is None or record["block"] != header["index"]:
+                raise ValueError(f"Line {line_number}: transactions without their block header")
+            txs.extend(record["txs"])
+        else:
+            raise ValueError(f"Line {line_number}: unknown record type {kind!r}")
+
+        if header is not None and len(txs) >= header["tx_count"]:
+            if len(txs) > header["tx_count"]:
+                raise ValueError(f"Block #{header['index']} has more transactions than announced")
+            yield ("block", header, txs)
+            header = None
+
+    if header is not None:
+        raise ValueError(f"Truncated file: block #{header['index']} is incomplete")
+
+
+# --------------------------------------------------------------- binary
+
+def _pack_strings(values: List[str]) -> bytes:
+    """Length-prefixed column of strings: count, end offsets, UTF-8 data."""
+    encoded = [value.encode() for value in values]
+    offsets = array("I")
+    end = 0
+    for value in encoded:
+        end += len(value)
+        offsets.append(end)
+    return struct.pack("<I", len(values)) + offsets.tobytes() + b"".join(encoded)
+
+
+def _unpack_strings(data: memoryview, position: int) -> Tuple[List[str], int]:
+    count = struct.unpack_from("<I", data, position)[0]
+    position += 4
+    offsets = array("I")
+    offsets.frombytes(data[position:position + 4 * count])
+    position += 4 * count
+    values = []
+    start = 0
+    for end in offsets:
+        values.append(bytes(data[position + start:position + end]).decode())
+        start = end
+    return values, position + start
+
+
+def _pack_array(typecode: str, values: Iterable[int]) -> bytes:
+    column = array(typecode, values)
+    return struct.pack("<I", len(column)) + column.tobytes()
+
+
+def _unpack_array(typecode: str, data: memoryview, position: int) -> Tuple[array, int]:
+    count = struct.unpack_from("<I", data, position)[0]
+    position += 4
+    column = array(typecode)
+    size = column.itemsize * count
+    column.frombytes(data[position:position + size])
+    return column, position + size
+
+
+def _pack_hashes(values: List[str]) -> bytes:
+    return struct.pack("<I", len(values)) + b"".join(bytes.fromhex(value) for value in values)
+
+
+def _unpack_hashes(data: memoryview, position: int) -> Tuple[List[str], int]:
+    count = struct.unpack_from("<I", data, position)[0]
+    position += 4
+    values = [bytes(data[position + 32 * i:position + 32 * (i + 1)]).hex() for i in range(count)]
+    return values, position + 32 * count
+
+
+def _write_section(stream, tag: bytes, payload: bytes) -> None:
+    stream.write(_SECTION.pack(tag, len(payload)))
+    stream.write(payload)
+
+
+def _export_binary(blockchain: Blockchain, stream, chunk_size: int) -> None:
+    stream.write(BINARY_MAGIC)
+    _write_section(stream, _META, json.dumps(_chain_record(blockchain)).encode())
+
+    account_ids: Dict[str, int] = {}
+
+    def flush(blocks: List[Block]) -> None:
+        if not blocks:
+            return
+        headers = [block.header for block in blocks]
+        txs = [tx for block in blocks for tx in block.transactions]
+        try:
+            senders = [account_ids[tx.sender_key] for tx in txs]
+            receivers = [account_ids[tx.receiver_key] for tx in txs]
+            batches = [tx for tx in txs if isinstance(tx, BatchTransaction)]
+            output_receivers = [account_ids[key] for tx in batches for key, _ in tx.outputs]
+        except KeyError as error:
+            raise ValueError(f"Transaction refers to unknown account {error}") from None
+
+        _write_section(stream, _BLOCKS, b"".join([
+            _pack_array("q", (header.version for header in headers)),
+            _pack_array("q", (header.index for header in headers)),
+            _pack_array("q", (header.timestamp for header in headers)),
+            _pack_array("q", (header.nonce for header in headers)),
+            _pack_array("I", (len(block.transactions) for block in blocks)),
+            _pack_hashes([header.prev_block_hash for header in headers]),
+            _pack_hashes([header.merkle_root for header in headers]),
+            _pack_hashes([header.state_root for header in headers]),
+            _pack_hashes([block.get_hash() for block in blocks]),
+            _pack_strings([header.difficulty_target for header in headers]),
+            _pack_strings([tx.tx_id for tx in txs]),
+            _pack_array("I", senders),
+            _pack_array("I", receivers),
+            _pack_array("q", (tx.amount for tx in txs)),
+            _pack_array("q", (tx.fee for tx in txs)),
+            _pack_array("q", (tx.timestamp for tx in txs)),
+            _pack_strings([tx.signature or "" for tx in txs]),
+            # Batch outputs: count per transaction (0 = plain), then flattened
+            _pack_array("I", (len(tx.outputs) if isinstance(tx, BatchTransaction) else 0 for tx in txs)),
+            _pack_array("I", output_receivers),
+            _pack_array("q", (amount for tx in batches for _, amount in tx.outputs)),
+        ]))
+        blocks.clear()
+
+    pending: List[Block] = []
+    for event in _iter_events(blockchain):
+        if event[0] == "block":
+            pending.append(event[1])
+            if len(pending) >= chunk_size:
+                flush(pending)
+            continue
+
+        # Accounts must precede the blocks that use them
+        flush(pending)
+        _, height, accounts = event
+        for chunk in _chunks(accounts, chunk_size):
+            for key, _, _ in chunk:
+                account_ids.setdefault(key, len(account_ids))
+            _write_section(stream, _ACCOUNTS, b"".join([
+                struct.pack("<q", height),
+                _pack_strings([key for key, _, _ in chunk]),
+                _pack_strings([name for _, name, _ in chunk]),
+                _pack_array("q", (balance for _, _, balance in chunk)),
+            ]))
+    flush(pending)
+
+
+def _read_binary(stream) -> Iterator[Tuple]:
+    """Yield the same events as _read_jsonl from a binary columnar file."""
+    if stream.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ValueError("Not a binary chain export")
+
+    account_keys: List[str] = []
+    version = FORMAT_VERSION
+    while True:
+        section = stream.read(_SECTION.size)
+        if not section:
+            return
+        if len(section) < _SECTION.size:
+            raise ValueError("Truncated section header")
+        tag, length = _SECTION.unpack(section)
+        payload = stream.read(length)
+        if len(payload) < length:
+            raise ValueError("Truncated section")
+        data = memoryview(payload)
+
+        if tag == _META:
+            meta = json.loads(payload)
+            version = meta.get("format")
+            yield ("chain", meta)
+        elif tag == _ACCOUNTS:
+            position = 8
+            keys, position = _unpack_strings(data, position)
+            names, position = _unpack_strings(data, position)
+            balances, position = _unpack_array("q", data, position)
+            account_keys.extend(keys)
+            yield ("accounts", list(zip(keys, names, balances)))
+        elif tag == _BLOCKS:
+            position = 0
+            versions, position = _unpack_array("q", data, position)
+            indexes, position = _unpack_array("q", data, position)
+            timestamps, position = _unpack_array("q", data, position)
+            nonces, position = _unpack_array("q", data, position)
+            tx_counts, position = _unpack_array("I", data, position)
+            prev_hashes, position = _unpack_hashes(data, position)
+            merkle_roots, position = _unpack_hashes(data, position)
+            state_roots, position = _unpack_hashes(data, position)
+            block_hashes, position = _unpack_hashes(data, position)
+            targets, position = _unpack_strings(data, position)
+            tx_ids, position = _unpack_strings(data, position)
+            senders, position = _unpack_array("I", data, position)
+            receivers, position = _unpack_array("I", data, position)
+            amounts, position = _unpack_array("q", data, position)
+            fees, position = _unpack_array("q", data, position)
+            tx_timestamps, position = _unpack_array("q", data, position)
+            signatures, position = _unpack_strings(data, position)
+            if version >= 2:
+                output_counts, position = _unpack_array("I", data, position)
+                output_receivers, position = _unpack_array("I", data, position)
+                output_amounts, position = _unpack_array("q", data, position)
+            else:
+                output_counts = [0] * len(tx_ids)
+
+            def receiver_field(j: int, output_start: int):
+                if not output_counts[j]:
+                    return account_keys[receivers[j]]
+                return [
+                    [account_keys[output_receivers[k]], output_amounts[k]]
+                    for k in range(output_start, output_start + output_counts[j])
+                ]
+
+            output_start = 0
+            start = 0
+            for i in range(len(indexes)):
+                end = start + tx_counts[i]
+                header = {
+                    "version": versions[i],
+                    "index": indexes[i],
+                    "prev_block_hash": prev_hashes[i],
+                    "merkle_root": merkle_roots[i],
+                    "state_root": state_roots[i],
+                    "timestamp": timestamps[i],
+                    "difficulty_target": targets[i],
+                    "nonce": nonces[i],
+                    "hash": block_hashes[i],
+                    "tx_count": tx_counts[i],
+                }
+                txs = []
+                for j in range(start, end):
+                    txs.append([tx_ids[j], account_keys[senders[j]], receiver_field(j, output_start),
+                                amounts[j], fees[j], tx_timestamps[j], signatures[j] or None])
+                    output_start += output_counts[j]
+                start = end
+                yield ("block", header, txs)
+        else:
+            raise ValueError(f"Unknown section {tag!r}")
+
+
+# --------------------------------------------------------------- public
+
+def export_chain(blockchain: Blockchain, path: str, fmt: str = "jsonl", chunk_size: int = 1000) -> Dict[str, float]:
+    """
+    Write the active chain and the account allocations to a file.
+
+    Args:
+        blockchain: Chain to export
+        path: Output file
+        fmt: "jsonl" or "binary"
+        chunk_size: Transactions per JSONL record / blocks per binary chunk
+
+    Returns:
+        Statistics: blocks, transactions, seconds, tx_per_s
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in ("jsonl", "binary"):
+        raise ValueError(f"Unknown export format '{fmt}'. Available: jsonl, binary")
+
+    start = time.perf_counter()
+    if fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as stream:
+            _export_jsonl(blockchain, stream, chunk_size)
+    else:
+        with open(path, "wb") as stream:
+            _export_binary(blockchain, stream, chunk_size)
+
+    transactions = sum(len(block.transactions) for block in blockchain.chain)
+    return _stats(len(blockchain.chain), transactions, time.perf_counter() - start)
+
+
+def import_chain(
+    path: str,
+    strict_pow: bool = False,
+    tx_index_path: str = ":memory:",
+) -> Tuple[Blockchain, Dict[str, float]]:
+    """
+    Rebuild a chain and its balances from an export (format is detected).
+
+    Args:
+        path: File written by export_chain
+        strict_pow: Reject blocks whose hash does not meet their target
+            (fallback blocks accepted by the mining pool do not)
+        tx_index_path: SQLite file for the new chain's transaction index
+
+    Returns:
+        (blockchain, statistics: blocks, transactions, seconds, tx_per_s)
+
+    Raises:
+        ValueError: On malformed input or a block that fails verification
+    """
+    start = time.perf_counter()
+    with open(path, "rb") as probe:
+        binary = probe.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+    if binary:
+        with open(path, "rb") as stream:
+            blockchain, transactions = _load(_read_binary(stream), strict_pow, tx_index_path)
+    else:
+        with open(path, "r", encoding="utf-8") as stream:
+            blockchain, transactions = _load(_read_jsonl(stream), strict_pow, tx_index_path)
+
+    return blockchain, _stats(len(blockchain.chain), transactions, time.perf_counter() - start)
+
+
+def _stats(blocks: int, transactions: int, seconds: float) -> Dict[str, float]:
+    return {
+        "blocks": blocks,
+        "transactions": transactions,
+        "seconds": seconds,
+        "tx_per_s": transactions / seconds if seconds > 0 else 0.0,
+    }
+
+
+def _build_block(header_record: Dict, tx_records: List[List], hash_backend: str, strict_pow: bool) -> Block:
+    """Rebuild one block and check its header hash, Merkle root and PoW."""
+    transactions = []
+    for tx_id, sender, receiver, amount, fee, timestamp, signature in tx_records:
+        if isinstance(receiver, list):
+            tx = BatchTransaction(sender, receiver, fee, hash_backend, tx_id=tx_id, timestamp=timestamp)
+            if tx.amount != amount:
+                raise ValueError(f"Transaction {tx_id[:8]}: outputs do not add up to its amount")
+        else:
+            tx = Transaction(sender, receiver, amount, fee, hash_backend, tx_id=tx_id, timestamp=timestamp)
+        tx.signature = signature
+        transactions.append(tx)
+
+    header = BlockHeader(
+        version=header_record["version"],
+        index=header_record["index"],
+        prev_block_hash=header_record["prev_block_hash"],
+        merkle_root=header_record["merkle_root"],
+        timestamp=header_record["timestamp"],
+        difficulty_target=header_record["difficulty_target"],
+        nonce=header_record["nonce"],
+        state_root=header_record["state_root"],
+    )
+    block = Block(header, transactions)
+    index = header.index
+
+    if block.get_merkle_root() != header.merkle_root:
+        raise ValueError(f"Block #{index}: Merkle root does not match its transactions")
+    block_hash = block.seal()
+    if block_hash != header_record["hash"]:
+        raise ValueError(f"Block #{index}: header hash mismatch")
+    if strict_pow and not block_hash.startswith(header.difficulty_target):
+        raise ValueError(f"Block #{index}: insufficient proof-of-work")
+    return block
+
+
+def _load(events: Iterator[Tuple], strict_pow: bool, tx_index_path: str) -> Tuple[Blockchain, int]:
+    """Replay reader events into a new Blockchain."""
+    meta: Optional[Dict] = None
+    blockchain: Optional[Blockchain] = None
+    transactions = 0
+
+    for event in events:
+        kind = event[0]
+        if kind == "chain":
+            meta = event[1]
+            if meta.get("format") not in READABLE_VERSIONS:
+                raise ValueError(f"Unsupported export format version {meta.get('format')}")
+            continue
+
+        if meta is None:
+            raise ValueError("Export does not start with chain parameters")
+
+        if kind == "accounts":
+            if blockchain is None:
+                raise ValueError("Accounts before the genesis block")
+            blockchain.add_users(User(name, key, balance) for key, name, balance in event[1])
+            continue
+
+        block = _build_block(event[1], event[2], meta["hash_backend"], strict_pow)
+        if blockchain is None:
+            if block.index != 0:
+                raise ValueError("Export does not start with the genesis block")
+            blockchain = Blockchain(
+                difficulty_target=meta["difficulty_target"],
+                genesis_block=block,
+                require_signatures=meta["require_signatures"],
+                hash_backend=meta["hash_backend"],
+                tx_index_path=tx_index_path,
+            )
+        elif not blockchain.import_block(block):
+            raise ValueError(f"Block #{block.index} failed verification")
+        transactions += len(block.transactions)
+
+    if blockchain is None:
+        raise ValueError("Export contains no blocks")
+    return blockchain, transactions
@@ -0,0 +1,299 @@
+"""
+Thread-safe access to a Blockchain.
+
+ConcurrentBlockchain lets many threads submit transactions and read
+balances and blocks while one producer thread mines:
+
+* Submissions are appended to an inbox deque (append is atomic), so
+  submitters never wait for a lock. The producer drains the inbox,
+  batch-verifies signatures and validates against the current state.
+* Balance reads take the read side of a ReadWriteLock. Block apply,
+  candidate assembly (whose state root dry run touches balances) and
+  mempool changes take the write side, so readers never see a half
+  applied block.
+* Chain reads use an immutable ChainSnapshot, republished after every
+  block (read-copy-update): readers take no lock at all. Snapshots share
+  one append-only list of blocks and differ only in their length, so
+  publishing costs O(1) per block; only a reorganization starts a new
+  list (O(height)), leaving older snapshots untouched.
+* The nonce search runs outside every lock; it only touches candidates.
+"""
+import collections
+import contextlib
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from models.block import Block
+from models.blockchain import Blockchain
+from models.transaction import Transaction
+
+
+class ReadWriteLock:
+    """
+    Many readers or one writer. Waiting writers block new readers, so a
+    steady stream of readers cannot starve the block producer.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self) -> None:
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def read(self) -> Iterator[None]:
+        """Hold the lock shared."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write(self) -> Iterator[None]:
+        """Hold the lock exclusively."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ChainSnapshot:
+    """
+    Immutable view of the active chain at one point in time: the first
+    `length` blocks of a list that is only ever appended to.
+    """
+
+    __slots__ = ("_blocks", "length", "state_root")
+
+    def __init__(self, blocks: List[Block], length: int, state_root: str):
+        """
+        Args:
+            blocks: Append-only list starting with the active chain
+            length: Number of blocks (genesis to tip) in this snapshot
+            state_root: Balance state root after the tip
+        """
+        self._blocks = blocks
+        self.length = length
+        self.state_root = state_root
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: Union[int, slice]):
+        """Block by height (negative counts from the tip), or a list of blocks."""
+        if isinstance(index, slice):
+            return [self._blocks[i] for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("block height out of range")
+        return self._blocks[index]
+
+    def __iter__(self) -> Iterator[Block]:
+        for i in range(self.length):
+            yield self._blocks[i]
+
+    @property
+    def height(self) -> int:
+        return self.length - 1
+
+    @property
+    def tip(self) -> Block:
+        return self._blocks[self.length - 1]
+
+    @property
+    def tip_hash(self) -> str:
+        return self.tip.get_hash()
+
+    def __repr__(self) -> str:
+        return f"ChainSnapshot(height={self.height}, tip={self.tip_hash[:16]}...)"
+
+
+class ConcurrentBlockchain:
+    """
+    Concurrency-safe front end of a Blockchain.
+
+    Any number of threads may call submit_transaction, get_balance,
+    get_balances and snapshot. Exactly one thread produces blocks with
+    run_producer. The wrapped Blockchain must not be used directly while
+    the producer runs.
+    """
+
+    def __init__(self, blockchain: Blockchain):
+        """
+        Args:
+            blockchain: Chain to protect (its users should already exist)
+        """
+        self.blockchain = blockchain
+        self.lock = ReadWriteLock()
+        self._inbox: collections.deque = collections.deque()
+        self._snapshot = ChainSnapshot(list(blockchain.chain), len(blockchain.chain), blockchain.state_root)
+
+        # Updated by the producer thread only
+        self.accepted = 0
+        self.rejected = 0
+        self.blocks_produced = 0
+
+    # ------------------------------------------------------------ writers
+
+    def submit_transaction(self, tx: Transaction) -> None:
+        """
+        Queue a transaction for validation (never blocks). The producer
+        validates it against the state at drain time; see accepted and
+        rejected.
+        """
+        self._inbox.append(tx)
+
+    def _drain_inbox(self) -> None:
+        """Validate queued transactions into the mempool (write lock held)."""
+        chain = self.blockchain
+        txs: List[Transaction] = []
+        while True:
+            try:
+                txs.append(self._inbox.popleft())
+            except IndexError:
+                break
+        if not txs:
+            return
+
+        # One batch check fills the signature cache for validate_transaction
+        signed = [tx for tx in txs if tx.signature is not None]
+        if signed:
+            chain.signature_verifier.verify_batch(signed)
+        for tx in txs:
+            if chain.validate_transaction(tx):
+                chain.add_pending_transaction(tx)
+                self.accepted += 1
+            else:
+                self.rejected += 1
+
+    def produce_block(self, block_tx_count: int = 100) -> Optional[Block]:
+        """
+        Drain the inbox, then assemble, mine and apply one block.
+
+        Returns:
+            The connected block, or None if nothing was pending
+        """
+        chain = self.blockchain
+        height = len(chain.chain)
+        with self.lock.write():
+            self._drain_inbox()
+            with chain.phase("assembly", height):
+                candidates = chain.assemble_candidates(block_tx_count)
+        if not candidates:
+            return None
+
+        # Only this thread mutates the chain, so the candidates' parent
+        # and state roots stay valid while mining without the lock
+        with chain.phase("mining", height):
+            block = chain.mine_candidates(candidates)
+        if block is None:
+            return None
+
+        with self.lock.write():
+            with chain.phase("apply", height):
+                connected = chain.submit_block(block)
+            self._publish()
+        if not connected:
+            return None
+        self.blocks_produced += 1
+        return block
+
+    def _publish(self) -> None:
+        """Publish the active chain as a new snapshot (write lock held)."""
+        chain = self.blockchain.chain
+        old = self._snapshot
+        blocks = old._blocks
+        # Blocks are linked, so an unchanged old tip means an unchanged prefix
+        if len(chain) >= old.length and chain[old.length - 1] is blocks[old.length - 1]:
+            # Nothing past old.length is visible to any snapshot yet
+            del blocks[old.length:]
+            blocks.extend(chain[old.length:])
+        else:
+            blocks = list(chain)
+        self._snapshot = ChainSnapshot(blocks, len(chain), self.blockchain.state_root)
+
+    def run_producer(
+        self,
+        block_tx_count: int = 100,
+        stop: Optional[threading.Event] = None,
+        idle_wait: float = 0.001,
+    ) -> None:
+        """
+        Produce blocks until there is no work left and stop is set
+        (without a stop event: until there is no work left).
+
+        Args:
+            block_tx_count: Transactions per block
+            stop: Set by the caller once submitters are done
+            idle_wait: Seconds to sleep when nothing is pending
+        """
+        while True:
+            if self.produce_block(block_tx_count) is not None:
+                continue
+            if not self._inbox and not self.blockchain.pending_transactions:
+                if stop is None or stop.is_set():
+                    # Submissions racing with the stop signal are picked up here
+                    if not self._inbox:
+                        return
+            time.sleep(idle_wait)
+
+    # ------------------------------------------------------------ readers
+
+    def get_balance(self, public_key: str) -> Optional[int]:
+        """Balance of one account, or None if it does not exist."""
+        with self.lock.read():
+            user = self.blockchain.users.get(public_key)
+            return None if user is None else user.balance
+
+    def get_balances(self) -> Tuple[Dict[str, int], int]:
+        """
+        Consistent copy of every balance and the fees collected so far
+        (both as of the same block).
+        """
+        with self.lock.read():
+            balances = {key: user.balance for key, user in self.blockchain.users.items()}
+            return balances, self.blockchain.collected_fees
+
+    def snapshot(self) -> ChainSnapshot:
+        """Latest published chain snapshot (lock-free)."""
+        return self._snapshot
+
+    @property
+    def pending(self) -> int:
+        """Transactions queued or in the mempool (approximate while running)."""
+        return len(self._inbox) + len(self.blockchain.pending_transactions)
+
+    def __repr__(self) -> str:
+        return (
+            f"ConcurrentBlockchain(height={self._snapshot.height}, accepted={self.accepted}, "
+            f"rejected={self.rejected}, queued={len(self._inbox)})"
+        )
@@ -0,0 +1,113 @@
+import random
+import time
+import uuid
+from typing import Optional
+
+
+class SystemClock:
+    """Wall-clock time (the default)."""
+
+    def time(self) -> float:
+        """Current time in seconds since the epoch."""
+        return time.time()
+
+    def __repr__(self) -> str:
+        return "SystemClock()"
+
+
+class SimulatedClock:
+    """
+    Deterministic clock for reproducible runs.
+
+    Every reading advances the time by `step`, so timestamps are
+    monotonic and identical between runs. With the default 1 ms step the
+    mining pool's round time limits are effectively never reached, so
+    rounds end on their attempt limits instead of on machine speed.
+    """
+
+    def __init__(self, start: float = 1_700_000_000.0, step: float = 0.001):
+        """
+        Args:
+            start: Initial time in seconds since the epoch
+            step: Seconds added after every reading
+        """
+        self.now = start
+        self.step = step
+
+    def time(self) -> float:
+        """Current simulated time (then advance by one step)."""
+        now = self.now
+        self.now += self.step
+        return now
+
+    def advance(self, seconds: float) -> None:
+        """
+        Move the clock forward.
+        """
+        self.now += seconds
+
+    def __repr__(self) -> str:
+        return f"SimulatedClock(now={self.now:.3f}, step={self.step})"
+
+
+class UuidSource:
+    """Random UUID4-based IDs (the default, not reproducible)."""
+
+    def next_id(self) -> str:
+        """New 32-character hex ID."""
+        return uuid.uuid4().hex
+
+    def next_tx_id(self) -> str:
+        """New transaction ID in the usual dashed 36-character UUID form."""
+        return str(uuid.uuid4())
+
+    def __repr__(self) -> str:
+        return "UuidSource()"
+
+
+class CounterIdSource:
+    """Sequential IDs: cheapest, and reproducible."""
+
+    def __init__(self, start: int = 0):
+        """
+        Args:
+            start: First counter value
+        """
+        self.counter = start
+
+    def next_id(self) -> str:
+        """Next counter value as a 32-character hex ID."""
+        self.counter += 1
+        return f"{self.counter:032x}"
+
+    def next_tx_id(self) -> str:
+        """Next transaction ID (same form as next_id)."""
+        return self.next_id()
+
+    def __repr__(self) -> str:
+        return f"CounterIdSource(counter={self.counter})"
+
+
+class SeededIdSource:
+    """
+    Pseudo-random 128-bit IDs from a seeded PRNG: reproducible, but spread
+    uniformly like UUIDs, and cheaper than uuid4 (no OS randomness).
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: PRNG seed
+        """
+        self._rng = random.Random(seed)
+
+    def next_id(self) -> str:
+        """New 32-character hex ID."""
+        return f"{self._rng.getrandbits(128):032x}"
+
+    def next_tx_id(self) -> str:
+        """New transaction ID (same form as next_id)."""
+        return self.next_id()
+
+    def __repr__(self) -> str:
+        return "SeededIdSource()"
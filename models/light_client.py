@@ -0,0 +1,204 @@
+from array import array
+from typing import Dict, Iterable, List, Optional
+from hash_utils import backend_from_version
+from models.block import BlockHeader
+from models.merkle_tree import MerkleTree
+from models.sparse_merkle_tree import SparseMerkleTree
+
+
+class HeaderChain:
+    """
+    Headers-only (SPV) view of the blockchain.
+
+    Only block headers are synced; linkage and proof-of-work are checked
+    on arrival. Headers are stored column-wise in flat arrays (hashes as
+    raw 32-byte strings) instead of one Python object per header, and
+    payments and balances are verified with Merkle proofs against the
+    stored transaction and state roots.
+    """
+
+    HASH_SIZE = 32
+
+    def __init__(self, genesis_header: BlockHeader, strict_pow: bool = True):
+        """
+        Initialize the header chain from a trusted genesis header.
+
+        Args:
+            genesis_header: Genesis block header (trusted checkpoint)
+            strict_pow: Reject headers whose hash does not meet the target.
+                Set to False to accept fallback blocks mined by MiningPool
+                after its attempt limit.
+        """
+        self.strict_pow = strict_pow
+
+        self._hashes = bytearray()
+        self._merkle_roots = bytearray()
+        self._state_roots = bytearray()
+        self._versions = array("q")
+        self._timestamps = array("q")
+        self._nonces = array("q")
+        self._target_ids = array("H")
+        self._targets: List[str] = []
+        self._target_lookup: Dict[str, int] = {}
+
+        self._append(genesis_header, genesis_header.get_hash())
+
+    @classmethod
+    def from_blockchain(cls, blockchain, strict_pow: bool = True) -> "HeaderChain":
+        """
+        Build a header chain by syncing the active chain of a full node.
+        """
+        headers = (block.header for block in blockchain.chain)
+        header_chain = cls(next(headers), strict_pow=strict_pow)
+        header_chain.sync(headers)
+        return header_chain
+
+    def _append(self, header: BlockHeader, block_hash: str) -> None:
+        """Store a header in the column arrays."""
+        target_id = self._target_lookup.get(header.difficulty_target)
+        if target_id is None:
+            target_id = len(self._targets)
+            self._targets.append(header.difficulty_target)
+            self._target_lookup[header.difficulty_target] = target_id
+
+        self._hashes += bytes.fromhex(block_hash)
+        self._merkle_roots += bytes.fromhex(header.merkle_root)
+        self._state_roots += bytes.fromhex(header.state_root)
+        self._versions.append(header.version)
+        self._timestamps.append(header.timestamp)
+        self._nonces.append(header.nonce)
+        self._target_ids.append(target_id)
+
+    def add_header(self, header: BlockHeader) -> bool:
+        """
+        Validate and append the next header.
+
+        Args:
+            header: Header of the block following the current tip
+
+        Returns:
+            True if the header was accepted, False otherwise
+        """
+        if header.index != len(self):
+            print(f"[SPV] Header #{header.index} rejected - expected height {len(self)}")
+            return False
+
+        if header.prev_block_hash != self.tip_hash:
+            print(f"[SPV] Header #{header.index} rejected - does not link to tip")
+            return False
+
+        block_hash = header.get_hash()
+        if self.strict_pow and not block_hash.startswith(header.difficulty_target):
+            print(f"[SPV] Header #{header.index} rejected - insufficient proof-of-work")
+            return False
+
+        self._append(header, block_hash)
+        return True
+
+    def sync(self, headers: Iterable[BlockHeader]) -> int:
+        """
+        Append headers in order, stopping at the first invalid one.
+
+        Returns:
+            Number of headers accepted
+        """
+        accepted = 0
+        for header in headers:
+            if not self.add_header(header):
+                break
+            accepted += 1
+        return accepted
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    @property
+    def tip_hash(self) -> str:
+        """Hash of the last synced header."""
+        return self.get_hash(len(self) - 1)
+
+    def get_hash(self, height: int) -> str:
+        """
+        Get the block hash at a height.
+        """
+        start = height * self.HASH_SIZE
+        return self._hashes[start:start + self.HASH_SIZE].hex()
+
+    def get_merkle_root(self, height: int) -> str:
+        """
+        Get the Merkle root committed by the header at a height.
+        """
+        start = height * self.HASH_SIZE
+        return self._merkle_roots[start:start + self.HASH_SIZE].hex()
+
+    def get_state_root(self, height: int) -> str:
+        """
+        Get the state root committed by the header at a height.
+        """
+        start = height * self.HASH_SIZE
+        return self._state_roots[start:start + self.HASH_SIZE].hex()
+
+    def get_header(self, height: int) -> Optional[BlockHeader]:
+        """
+        Rebuild the full header object at a height.
+        """
+        if not 0 <= height < len(self):
+            return None
+
+        return BlockHeader(
+            version=self._versions[height],
+            index=height,
+            prev_block_hash=self.get_hash(height - 1) if height > 0 else "0" * 64,
+            merkle_root=self.get_merkle_root(height),
+            timestamp=self._timestamps[height],
+            difficulty_target=self._targets[self._target_ids[height]],
+            nonce=self._nonces[height],
+            state_root=self.get_state_root(height),
+        )
+
+    def verify_payment(self, tx_id: str, proof: List[tuple], height: int) -> bool:
+        """
+        Verify that a transaction is included in the block at a height.
+
+        Args:
+            tx_id: Transaction ID
+            proof: Merkle proof as returned by MerkleTree.get_proof
+            height: Height of the block claimed to include the transaction
+
+        Returns:
+            True if the proof matches the header's Merkle root
+        """
+        if not 0 <= height < len(self):
+            return False
+        return MerkleTree.verify_proof(
+            tx_id,
+            proof,
+            self.get_merkle_root(height),
+            backend_from_version(self._versions[height]),
+        )
+
+    def verify_balance(self, key: str, balance: int, proof: List[str], height: int) -> bool:
+        """
+        Verify an account balance as of the block at a height.
+
+        Args:
+            key: Account public key
+            balance: Claimed balance after that block
+            proof: Proof as returned by SparseMerkleTree.get_proof
+            height: Height of the block whose state is claimed
+
+        Returns:
+            True if the proof matches the header's state root
+        """
+        if not 0 <= height < len(self):
+            return False
+        return SparseMerkleTree.verify_proof(
+            key,
+            balance,
+            proof,
+            self.get_state_root(height),
+            backend_from_version(self._versions[height]),
+        )
+
+    def __repr__(self) -> str:
+        return f"HeaderChain(headers={len(self)}, tip={self.tip_hash[:16]}...)"
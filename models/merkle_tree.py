@@ -1,5 +1,90 @@
-from typing import List, Optional
-from hash_utils import my_hash
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Iterable, List, Optional, Tuple
+from hash_utils import DEFAULT_HASH_BACKEND, get_hash_backend
+
+
+class MerkleRootBuilder:
+    """
+    Streaming Merkle root computation with O(log n) memory.
+    
+    Keeps a stack of pending subtree roots (like a binary counter): two
+    subtrees of the same height are merged as soon as both exist. The
+    final root pads the trailing subtrees by duplicating them, which gives
+    exactly the same root as MerkleTree's level-by-level odd duplication.
+    """
+    
+    def __init__(self, hash_backend: str = DEFAULT_HASH_BACKEND):
+        """
+        Args:
+            hash_backend: Name of the hash backend to use
+        """
+        self._hash = get_hash_backend(hash_backend)
+        # (level, hash) pairs; levels strictly decrease towards the top
+        self._stack: List[Tuple[int, str]] = []
+        self.count = 0
+    
+    def add(self, tx_id: str) -> None:
+        """
+        Add the next transaction ID (leaf).
+        """
+        self.add_subtree(self._hash(tx_id), 0)
+        self.count += 1
+    
+    def add_all(self, tx_ids: Iterable[str]) -> "MerkleRootBuilder":
+        """
+        Add transaction IDs from any iterable.
+        """
+        for tx_id in tx_ids:
+            self.add(tx_id)
+        return self
+    
+    def add_subtree(self, node_hash: str, level: int) -> None:
+        """
+        Add the root of a complete subtree of the given height.
+        Used to combine subtree roots computed elsewhere (e.g. in parallel).
+        """
+        stack = self._stack
+        while stack and stack[-1][0] == level:
+            node_hash = self._hash(stack.pop()[1] + node_hash)
+            level += 1
+        stack.append((level, node_hash))
+    
+    def get_root(self, min_level: int = 0) -> str:
+        """
+        Compute the root of everything added so far.
+        
+        Args:
+            min_level: Keep duplicating the root until it reaches this
+                height (used for the last, partial chunk of a parallel build)
+        
+        Returns:
+            Merkle root hash or "0"*64 if nothing was added
+        """
+        if not self._stack:
+            return "0" * 64
+        
+        level, node_hash = self._stack[-1]
+        for left_level, left_hash in reversed(self._stack[:-1]):
+            # A trailing subtree is paired with itself until heights match
+            while level < left_level:
+                node_hash = self._hash(node_hash + node_hash)
+                level += 1
+            node_hash = self._hash(left_hash + node_hash)
+            level += 1
+        
+        while level < min_level:
+            node_hash = self._hash(node_hash + node_hash)
+            level += 1
+        
+        return node_hash
+
+
+def _subtree_root(tx_ids: List[str], hash_backend: str, level: int) -> str:
+    """Root of one chunk padded to a fixed height (runs in a worker process)."""
+    return MerkleRootBuilder(hash_backend).add_all(tx_ids).get_root(min_level=level)
 
 
 class MerkleTree:
@@ -8,14 +93,16 @@ class MerkleTree:
     Builds a binary tree of hashes from transaction IDs.
     """
     
-    def __init__(self, transaction_ids: List[str]):
+    def __init__(self, transaction_ids: List[str], hash_backend: str = DEFAULT_HASH_BACKEND):
         """
         Initialize Merkle Tree with transaction IDs.
         
         Args:
             transaction_ids: List of transaction ID strings
+            hash_backend: Name of the hash backend to use
         """
         self.transaction_ids = transaction_ids
+        self.hash_backend = hash_backend
         self.root: Optional[str] = None
         self.tree_levels: List[List[str]] = []
         
@@ -28,6 +115,8 @@ class MerkleTree:
             self.root = "0" * 64
             return
         
+        my_hash = get_hash_backend(self.hash_backend)
+        
         # Level 0: Hash each transaction ID
         current_level = [my_hash(tx_id) for tx_id in self.transaction_ids]
         self.tree_levels.append(current_level.copy())
@@ -76,6 +165,28 @@ class MerkleTree:
         Returns:
             True if transaction is verified, False otherwise
         """
+        return MerkleTree.verify_proof(tx_id, proof, self.get_root(), self.hash_backend)
+    
+    @staticmethod
+    def verify_proof(
+        tx_id: str,
+        proof: List[tuple],
+        merkle_root: str,
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+    ) -> bool:
+        """
+        Verify a Merkle proof against a known root (e.g. a block header).
+        
+        Args:
+            tx_id: Transaction ID to verify
+            proof: List of (hash, is_left) tuples forming the proof path
+            merkle_root: Expected Merkle root
+            hash_backend: Name of the hash backend the tree was built with
+            
+        Returns:
+            True if the proof leads to the root, False otherwise
+        """
+        my_hash = get_hash_backend(hash_backend)
         current_hash = my_hash(tx_id)
         
         for sibling_hash, is_left in proof:
@@ -86,7 +197,7 @@ class MerkleTree:
             
             current_hash = my_hash(combined)
         
-        return current_hash == self.root
+        return current_hash == merkle_root
     
     def get_proof(self, tx_id: str) -> Optional[List[tuple]]:
         """
@@ -114,12 +225,73 @@ class MerkleTree:
                 sibling_index = index - 1
                 is_left = True
             
-            if sibling_index < len(level):
-                proof.append((level[sibling_index], is_left))
+            # The last node of an odd level is paired with itself
+            if sibling_index >= len(level):
+                sibling_index = index
+            
+            proof.append((level[sibling_index], is_left))
             
             index //= 2
         
         return proof
     
+    @staticmethod
+    def compute_root(tx_ids: Iterable[str], hash_backend: str = DEFAULT_HASH_BACKEND) -> str:
+        """
+        Compute only the Merkle root, streaming over the IDs.
+        Same result as MerkleTree(list(tx_ids)).get_root() without keeping the levels.
+        """
+        return MerkleRootBuilder(hash_backend).add_all(tx_ids).get_root()
+    
+    @staticmethod
+    def compute_root_parallel(
+        tx_ids: Iterable[str],
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+        workers: Optional[int] = None,
+        chunk_size: int = 1 << 14,
+    ) -> str:
+        """
+        Compute the Merkle root with subtrees hashed in a process pool.
+        
+        IDs are cut into chunks of chunk_size (a power of two), so every
+        chunk is a complete subtree whose root sits at a fixed height; the
+        chunk roots are then combined with the streaming builder. Only a
+        bounded number of chunks is in flight at a time.
+        
+        Args:
+            tx_ids: Transaction IDs in block order
+            hash_backend: Name of the hash backend to use
+            workers: Worker processes (default: CPU count)
+            chunk_size: Leaves per subtree, must be a power of two
+            
+        Returns:
+            Merkle root hash
+        """
+        if chunk_size < 1 or chunk_size & (chunk_size - 1):
+            raise ValueError(f"chunk_size must be a power of two, got {chunk_size}")
+        
+        level = chunk_size.bit_length() - 1
+        ids = iter(tx_ids)
+        first = list(islice(ids, chunk_size))
+        second = list(islice(ids, chunk_size))
+        if not second:
+            # Fits in one subtree: its root is the block's root, no padding
+            return MerkleTree.compute_root(first, hash_backend)
+        
+        workers = workers or os.cpu_count() or 1
+        chunks = chain([first, second], iter(lambda: list(islice(ids, chunk_size)), []))
+        
+        builder = MerkleRootBuilder(hash_backend)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(executor.submit(_subtree_root, chunk, hash_backend, level))
+                if len(in_flight) >= 2 * workers:
+                    builder.add_subtree(in_flight.popleft().result(), level)
+            for future in in_flight:
+                builder.add_subtree(future.result(), level)
+        
+        return builder.get_root()
+    
     def __repr__(self) -> str:
         return f"MerkleTree(transactions={len(self.transaction_ids)}, root={self.root[:16] if self.root else 'None'}...)"
\ No newline at end of file
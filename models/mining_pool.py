@@ -1,9 +1,106 @@
+import contextlib
+import functools
+import multiprocessing
 import time
 import random
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from hash_utils import hash_function_for_version
 from models.block import Block
+from models.environment import SystemClock
 from models.transaction import Transaction
 
+# Set in each mining worker process; signals that some candidate has won
+_stop_event = None
+
+
+def build_candidate_blocks(
+    batches: List[List[Transaction]],
+    prev_block_hash: str,
+    index: int,
+    version: int,
+    difficulty_target: str,
+    timestamp: Optional[int] = None,
+) -> List[Block]:
+    """
+    Build one block (including its Merkle tree) per transaction batch.
+    Module-level so it can also run in a worker process.
+    
+    Args:
+        batches: Transactions for each candidate
+        prev_block_hash: Hash of previous block
+        index: Block index
+        version: Blockchain version
+        difficulty_target: Mining difficulty
+        timestamp: Base timestamp (default: current time)
+        
+    Returns:
+        List of unmined blocks
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    
+    return [
+        Block.build(
+            index=index,
+            prev_block_hash=prev_block_hash,
+            version=version,
+            transactions=tx_batch,
+            difficulty_target=difficulty_target,
+            timestamp=timestamp + i,  # Slight timestamp variation
+        )
+        for i, tx_batch in enumerate(batches)
+    ]
+
+
+def _init_mining_worker(stop_event) -> None:
+    """Give a mining worker process the shared stop flag."""
+    global _stop_event
+    _stop_event = stop_event
+
+
+def _search_nonces(
+    miner_id: int,
+    prefix: str,
+    version: int,
+    target: str,
+    nonce: int,
+    attempts: int,
+    deadline: float,
+) -> Dict:
+    """
+    Try the nonces after `nonce` for one candidate (runs in a worker process).
+    Stops early when another worker found a block or the deadline passed.
+    
+    Returns:
+        Result dict: miner_id, found, nonce (winning or last tried),
+        hash, attempts, best_nonce and best_hash
+    """
+    hash_function = hash_function_for_version(version)
+    best_hash = None
+    best_nonce = nonce
+    
+    tried = 0
+    while tried < attempts:
+        tried += 1
+        nonce += 1
+        block_hash = hash_function(prefix + str(nonce))
+        
+        if best_hash is None or block_hash < best_hash:
+            best_hash = block_hash
+            best_nonce = nonce
+        
+        if block_hash.startswith(target):
+            _stop_event.set()
+            return {"miner_id": miner_id, "found": True, "nonce": nonce, "hash": block_hash,
+                    "attempts": tried, "best_nonce": nonce, "best_hash": block_hash}
+        
+        if tried % 1000 == 0 and (_stop_event.is_set() or time.time() > deadline):
+            break
+    
+    return {"miner_id": miner_id, "found": False, "nonce": nonce, "hash": None,
+            "attempts": tried, "best_nonce": best_nonce, "best_hash": best_hash}
+
 
 class CandidateBlock:
     """Represents a candidate block for competitive mining."""
@@ -30,11 +127,25 @@ class MiningPool:
     Simulates competitive/decentralized mining with multiple candidate blocks.
     """
     
-    def __init__(self, num_candidates: int = 5):
+    def __init__(
+        self,
+        num_candidates: int = 5,
+        workers: int = 1,
+        rng: Optional[random.Random] = None,
+        clock=None,
+    ):
         """
             num_candidates: Number of candidate blocks to create
+            workers: Processes searching nonces in parallel (1 = mine
+                candidates one after another in this process; parallel
+                mining is not reproducible)
+            rng: Random generator for transaction selection (default: the global one)
+            clock: Clock for timestamps and round time limits (default: wall clock)
         """
         self.num_candidates = num_candidates
+        self.workers = workers
+        self.rng = rng if rng is not None else random
+        self.clock = clock or SystemClock()
     
     def create_candidates(
         self,
@@ -44,6 +155,7 @@ class MiningPool:
         version: int,
         difficulty_target: str,
         tx_per_block: int = 100,
+        template: Optional[List[Transaction]] = None,
     ) -> List[CandidateBlock]:
         """
         Create multiple candidate blocks with different transaction sets.
@@ -55,20 +167,57 @@ class MiningPool:
             version: Blockchain version
             difficulty_target: Mining difficulty
             tx_per_block: Transactions per candidate block
+            template: Optional fee-maximizing selection used by candidate #0
             
         Returns:
             List of CandidateBlock objects
         """
-        candidates = []
-        
         print(f"\n[POOL] Creating {self.num_candidates} candidate blocks...")
         print(f"[POOL] Available transactions: {len(all_transactions)}")
         print(f"[POOL] Transactions per block: {tx_per_block}\n")
         
+        batches = self.select_transaction_batches(all_transactions, tx_per_block, template)
+        blocks = build_candidate_blocks(
+            batches,
+            prev_block_hash=prev_block_hash,
+            index=index,
+            version=version,
+            difficulty_target=difficulty_target,
+            timestamp=int(self.clock.time()),
+        )
+        candidates = [CandidateBlock(block, miner_id=i) for i, block in enumerate(blocks)]
+        
+        for candidate in candidates:
+            print(f"[CANDIDATE #{candidate.miner_id}] Created with {len(candidate.block.transactions)} transactions")
+            print(f"               Merkle root: {candidate.block.get_merkle_root()[:32]}...")
+        
+        print()
+        return candidates
+    
+    def select_transaction_batches(
+        self,
+        all_transactions: List[Transaction],
+        tx_per_block: int = 100,
+        template: Optional[List[Transaction]] = None,
+        rng: Optional[random.Random] = None,
+    ) -> List[List[Transaction]]:
+        """
+        Pick a different transaction set for each candidate.
+        
+        Args:
+            all_transactions: Pool of available transactions
+            tx_per_block: Transactions per candidate block
+            template: Optional fee-maximizing selection used by candidate #0
+            rng: Random generator for the shuffle (default: the pool's own)
+            
+        Returns:
+            One transaction list per candidate
+        """
         # Shuffle to simulate different miners picking different tx
         shuffled_txs = all_transactions.copy()
-        random.shuffle(shuffled_txs)
+        (rng or self.rng).shuffle(shuffled_txs)
         
+        batches = []
         for i in range(self.num_candidates):
             # Each candidate gets a different slice of transactions
             start_idx = (i * tx_per_block) % len(shuffled_txs)
@@ -81,23 +230,13 @@ class MiningPool:
                 needed = tx_per_block - len(tx_batch)
                 tx_batch.extend(shuffled_txs[:needed])
             
-            block = Block.build(
-                index=index,
-                prev_block_hash=prev_block_hash,
-                version=version,
-                transactions=tx_batch,
-                difficulty_target=difficulty_target,
-                timestamp=int(time.time()) + i,  # Slight timestamp variation
-            )
-            
-            candidate = CandidateBlock(block, miner_id=i)
-            candidates.append(candidate)
-            
-            print(f"[CANDIDATE #{i}] Created with {len(tx_batch)} transactions")
-            print(f"               Merkle root: {block.get_merkle_root()[:32]}...")
+            batches.append(tx_batch)
         
-        print()
-        return candidates
+        # The fee-aware miner takes the block template instead of a random slice
+        if template:
+            batches[0] = list(template)
+        
+        return batches
     
     def mine_competitively(
         self,
@@ -111,49 +250,63 @@ class MiningPool:
         print(f"[MINING] Starting competitive mining...")
         print(f"[MINING] Time limit: {time_limit}s per round")
         print(f"[MINING] Max attempts per round: {max_attempts_per_round}")
+        if self.workers > 1:
+            print(f"[MINING] Worker processes: {min(self.workers, len(candidates))}")
         print(f"[MINING] Target: hash starts with '{candidates[0].block.header.difficulty_target}'\n")
         
-        round_num = 1
-        
-        while True:
-            print(f"=== MINING ROUND {round_num} ===")
-            start_time = time.time()
-            
-            winner = self._mine_round(
-                candidates,
-                time_limit,
-                max_attempts_per_round,
-                start_time
-            )
-            
-            if winner:
-                print(f"\n[WINNER] Candidate #{winner.miner_id} found valid block!")
-                print(f"[WINNER] Hash: {winner.found_hash}")
-                print(f"[WINNER] Nonce: {winner.block.header.nonce}")
-                print(f"[WINNER] Total attempts: {winner.attempts}")
-                print(f"[WINNER] Mining time: {winner.mining_time:.4f}s\n")
-                return winner
-            
-            elapsed = time.time() - start_time
-            print(f"\n[ROUND {round_num}] No winner after {elapsed:.2f}s")
-            print(f"[ROUND {round_num}] Increasing time limit and retrying...\n")
+        with contextlib.ExitStack() as stack:
+            mine_round = self._mine_round
+            if self.workers > 1:
+                stop_event = multiprocessing.Event()
+                executor = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(candidates)),
+                    initializer=_init_mining_worker,
+                    initargs=(stop_event,),
+                ))
+                mine_round = functools.partial(self._mine_round_parallel, executor, stop_event)
             
-            # Increase limits for next round
-            time_limit *= 1.5
-            max_attempts_per_round = int(max_attempts_per_round * 1.5)
-            round_num += 1
+            round_num = 1
             
-            if round_num > 3:  # Quick fallback - accept best after 3 rounds
-                print("[INFO] Reached 3 rounds without success - triggering fallback")
-                # Force acceptance of best candidate
-                if candidates:
-                    best = min(candidates, key=lambda c: c.block.get_hash())
-                    best.found = True
-                    best.found_hash = best.block.get_hash()
-                    best.mining_time = time.time() - start_time
-                    print(f"[FALLBACK] Accepting best candidate #{best.miner_id}")
-                    return best
-                return None
+            while True:
+                print(f"=== MINING ROUND {round_num} ===")
+                start_time = self.clock.time()
+                
+                winner = mine_round(
+                    candidates,
+                    time_limit,
+                    max_attempts_per_round,
+                    start_time
+                )
+                
+                if winner:
+                    winner.block.seal()
+                    print(f"\n[WINNER] Candidate #{winner.miner_id} found valid block!")
+                    print(f"[WINNER] Hash: {winner.found_hash}")
+                    print(f"[WINNER] Nonce: {winner.block.header.nonce}")
+                    print(f"[WINNER] Total attempts: {winner.attempts}")
+                    print(f"[WINNER] Mining time: {winner.mining_time:.4f}s\n")
+                    return winner
+                
+                elapsed = self.clock.time() - start_time
+                print(f"\n[ROUND {round_num}] No winner after {elapsed:.2f}s")
+                print(f"[ROUND {round_num}] Increasing time limit and retrying...\n")
+                
+                # Increase limits for next round
+                time_limit *= 1.5
+                max_attempts_per_round = int(max_attempts_per_round * 1.5)
+                round_num += 1
+                
+                if round_num > 3:  # Quick fallback - accept best after 3 rounds
+                    print("[INFO] Reached 3 rounds without success - triggering fallback")
+                    # Force acceptance of best candidate
+                    if candidates:
+                        best = min(candidates, key=lambda c: c.block.get_hash())
+                        best.found = True
+                        best.found_hash = best.block.seal()
+                        best.mining_time = self.clock.time() - start_time
+                        print(f"[FALLBACK] Accepting best candidate #{best.miner_id}")
+                        return best
+                    return None
     
     def _mine_round(
         self,
@@ -179,14 +332,15 @@ class MiningPool:
         # Track best candidate (lowest lexicographic hash) in case we need to accept a best-effort result
         best_candidate: Optional[CandidateBlock] = None
         best_hash: Optional[str] = None
+        best_nonce = 0
 
         for candidate in candidates:
             # Check overall timeout before starting this candidate
-            if time.time() - start_time > time_limit:
+            if self.clock.time() - start_time > time_limit:
                 print(f"[TIMEOUT] Time limit reached while scanning candidates")
                 break
 
-            round_start = time.time()
+            round_start = self.clock.time()
 
             # Try to mine this candidate
             for _ in range(attempts_per_candidate):
@@ -199,28 +353,109 @@ class MiningPool:
                 if best_hash is None or block_hash < best_hash:
                     best_hash = block_hash
                     best_candidate = candidate
+                    best_nonce = candidate.block.header.nonce
 
                 if block_hash.startswith(candidate.block.header.difficulty_target):
                     candidate.found = True
                     candidate.found_hash = block_hash
-                    candidate.mining_time = time.time() - start_time
+                    candidate.mining_time = self.clock.time() - start_time
                     return candidate
 
                 # Check timeout mid-mining
                 if candidate.attempts % 10000 == 0:
-                    if time.time() - start_time > time_limit:
+                    if self.clock.time() - start_time > time_limit:
                         print(f"[TIMEOUT] Time limit reached during candidate #{candidate.miner_id} mining")
                         break
 
-            round_time = time.time() - round_start
+            round_time = self.clock.time() - round_start
             print(f"[CANDIDATE #{candidate.miner_id}] {attempts_per_candidate} attempts in {round_time:.2f}s - no luck")
 
         # If we exit without finding a valid block, but we did find candidate hashes, accept the best one as a fallback
         if best_candidate is not None:
             print("[FALLBACK] No valid block met difficulty within limits — accepting best-found candidate to ensure progress")
+            # Rewind to the nonce that produced the best hash
+            best_candidate.block.header.nonce = best_nonce
             best_candidate.found = True
             best_candidate.found_hash = best_hash
-            best_candidate.mining_time = time.time() - start_time
+            best_candidate.mining_time = self.clock.time() - start_time
             return best_candidate
 
-        return None
\ No newline at end of file
+        return None
+    
+    def _mine_round_parallel(
+        self,
+        executor: ProcessPoolExecutor,
+        stop_event,
+        candidates: List[CandidateBlock],
+        time_limit: float,
+        max_attempts: int,
+        start_time: float,
+    ) -> Optional[CandidateBlock]:
+        """
+        Execute one round with every candidate mined in its own worker.
+        The first candidate to find a valid hash stops the others.
+        
+        Args:
+            executor: Pool of mining worker processes
+            stop_event: Shared flag set by the winning worker
+            candidates: List of candidate blocks
+            time_limit: Time limit for this round
+            max_attempts: Max attempts for this round
+            start_time: Start time of the round
+            
+        Returns:
+            Winning candidate or None
+        """
+        stop_event.clear()
+        attempts_per_candidate = max_attempts // len(candidates)
+        by_id = {candidate.miner_id: candidate for candidate in candidates}
+        # Workers run on the wall clock whatever clock the pool uses
+        deadline = time.time() + max(0.0, time_limit - (self.clock.time() - start_time))
+        
+        futures = [
+            executor.submit(
+                _search_nonces,
+                candidate.miner_id,
+                candidate.block.header._get_prefix(),
+                candidate.block.header.version,
+                candidate.block.header.difficulty_target,
+                candidate.block.header.nonce,
+                attempts_per_candidate,
+                deadline,
+            )
+            for candidate in candidates
+        ]
+        
+        winner: Optional[CandidateBlock] = None
+        results = []
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            candidate = by_id[result["miner_id"]]
+            candidate.attempts += result["attempts"]
+            candidate.block.header.nonce = result["nonce"]
+            
+            if result["found"] and winner is None:
+                winner = candidate
+                candidate.found = True
+                candidate.found_hash = result["hash"]
+                candidate.mining_time = self.clock.time() - start_time
+            elif not result["found"]:
+                print(f"[CANDIDATE #{candidate.miner_id}] {result['attempts']} attempts - no luck")
+        
+        if winner:
+            return winner
+        
+        # Same fallback as the sequential round: accept the best hash seen
+        tried = [result for result in results if result["best_hash"] is not None]
+        if tried:
+            best = min(tried, key=lambda result: result["best_hash"])
+            print("[FALLBACK] No valid block met difficulty within limits — accepting best-found candidate to ensure progress")
+            best_candidate = by_id[best["miner_id"]]
+            best_candidate.block.header.nonce = best["best_nonce"]
+            best_candidate.found = True
+            best_candidate.found_hash = best["best_hash"]
+            best_candidate.mining_time = self.clock.time() - start_time
+            return best_candidate
+        
+        return None
@@ -0,0 +1,485 @@
+"""
+Account-sharded parallel chains.
+
+Users are partitioned by key into K shards. Each shard is a full
+Blockchain (mempool, chain, MiningPool) running in its own process, so
+shards validate, mine and apply in parallel.
+
+A transfer between shards happens in two steps:
+
+1. On the source shard the sender pays the destination shard's bridge
+   account. The transaction ID is the receipt ID, a hash of the whole
+   transfer (shards, sender, receiver, amount, nonce), so the Merkle
+   leaf commits to the receiver and amount.
+2. Once that block is connected, the source shard issues a receipt with
+   the block height and a Merkle proof. The destination shard checks
+   the proof against the source shard's header, which it follows with a
+   headers-only HeaderChain, and adds a credit transaction from the
+   source shard's bridge account to the receiver. The credit's ID is
+   derived from the receipt ID, so replayed receipts are rejected like
+   any other replayed transaction.
+
+Bridge accounts start with BRIDGE_RESERVE. Money in flight (debited,
+not yet credited) shows up as bridge balances above the reserve; once
+all receipts are credited the bridges net back to the reserve and the
+total user balance plus fees equals the initial supply.
+
+Shards run with strict execution: a block holding a transaction that
+cannot execute is invalid, and candidates leave such transactions out.
+A debit included in a valid source block has therefore executed, so the
+Merkle proof checked by the destination is also proof that the money
+left the sender.
+"""
+import contextlib
+import multiprocessing
+import os
+import random
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from hash_utils import DEFAULT_HASH_BACKEND, get_hash_backend
+from models.block import BlockHeader
+from models.blockchain import Blockchain
+from models.environment import SeededIdSource, UuidSource
+from models.light_client import HeaderChain
+from models.transaction import Transaction
+from models.user import User
+
+BRIDGE_RESERVE = 10 ** 15
+
+
+def shard_of(key: str, num_shards: int) -> int:
+    """Shard that owns an account."""
+    return zlib.crc32(key.encode("utf-8")) % num_shards
+
+
+def bridge_key(shard: int) -> str:
+    """Account of a shard's bridge, present on every other shard."""
+    return f"bridge-{shard}"
+
+
+class Receipt:
+    """Proof that a cross-shard debit was committed on the source shard."""
+
+    __slots__ = ("source_shard", "dest_shard", "sender", "receiver", "amount", "nonce", "height", "proof")
+
+    def __init__(
+        self,
+        source_shard: int,
+        dest_shard: int,
+        sender: str,
+        receiver: str,
+        amount: int,
+        nonce: int,
+        height: int = -1,
+        proof: Optional[List[tuple]] = None,
+    ):
+        """
+        Args:
+            source_shard: Shard of the sender (debited)
+            dest_shard: Shard of the receiver (credited)
+            sender: Sender public key
+            receiver: Receiver public key
+            amount: Amount transferred
+            nonce: Makes repeated identical transfers distinct
+            height: Source block that committed the debit
+            proof: Merkle proof of the debit in that block
+        """
+        self.source_shard = source_shard
+        self.dest_shard = dest_shard
+        self.sender = sender
+        self.receiver = receiver
+        self.amount = amount
+        self.nonce = nonce
+        self.height = height
+        self.proof = proof
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def receipt_id(self, hash_backend: str) -> str:
+        """ID of the debit transaction, committing to the whole transfer."""
+        return get_hash_backend(hash_backend)(
+            f"receipt:{self.source_shard}:{self.dest_shard}:{self.sender}:"
+            f"{self.receiver}:{self.amount}:{self.nonce}"
+        )
+
+    def credit_id(self, hash_backend: str) -> str:
+        """ID of the credit transaction on the destination shard."""
+        return get_hash_backend(hash_backend)("credit:" + self.receipt_id(hash_backend))
+
+    def __repr__(self) -> str:
+        return (
+            f"Receipt({self.source_shard}->{self.dest_shard}, "
+            f"amount={self.amount}, height={self.height})"
+        )
+
+
+class ShardNode:
+    """One shard: a Blockchain plus header chains of the other shards."""
+
+    def __init__(
+        self,
+        shard_id: int,
+        num_shards: int,
+        difficulty_target: str,
+        hash_backend: str,
+        num_candidates: int,
+        tx_per_block: int,
+        seed: Optional[int],
+    ):
+        self.shard_id = shard_id
+        self.num_shards = num_shards
+        self.hash_backend = hash_backend
+        self.tx_per_block = tx_per_block
+        self.blockchain = Blockchain(
+            difficulty_target=difficulty_target,
+            hash_backend=hash_backend,
+            num_candidates=num_candidates,
+            seed=None if seed is None else seed * num_shards + shard_id,
+            # Receipts prove inclusion; this makes inclusion mean execution
+            strict_execution=True,
+        )
+        self.blockchain.add_users(
+            User(f"Bridge_{shard}", bridge_key(shard), BRIDGE_RESERVE)
+            for shard in range(num_shards) if shard != shard_id
+        )
+        self.headers: Dict[int, HeaderChain] = {}
+        # Receipt ID -> receipt of outbound transfers not yet committed
+        self.outgoing: Dict[str, Receipt] = {}
+        self.rejected = 0
+        self.receipts_rejected = 0
+
+    def genesis_header(self) -> BlockHeader:
+        return self.blockchain.chain[0].header
+
+    def follow(self, shard: int, genesis_header: BlockHeader) -> None:
+        """Start following another shard's headers."""
+        self.headers[shard] = HeaderChain(genesis_header, strict_pow=False)
+
+    def relay(self, headers: Dict[int, List[BlockHeader]], receipts: List[Receipt]) -> int:
+        """
+        Take new headers of the other shards, then the receipts they prove.
+
+        Returns:
+            Number of receipts accepted
+        """
+        for shard, shard_headers in headers.items():
+            if shard != self.shard_id:
+                self.headers[shard].sync(shard_headers)
+        return self.accept_receipts(receipts) if receipts else 0
+
+    def add_users(self, users: List[Tuple[str, str, int]]) -> None:
+        self.blockchain.add_users(User(name, key, balance) for key, name, balance in users)
+
+    def submit(self, transfers: List[Tuple[str, str, int, int, int]]) -> int:
+        """
+        Admit transfers sent by this shard's users.
+
+        Args:
+            transfers: (sender, receiver, amount, fee, nonce) tuples
+
+        Returns:
+            Number of transfers accepted
+        """
+        chain = self.blockchain
+        accepted = 0
+        for sender, receiver, amount, fee, nonce in transfers:
+            dest = shard_of(receiver, self.num_shards)
+            if dest == self.shard_id:
+                tx = Transaction(sender, receiver, amount, fee, self.hash_backend,
+                                 tx_id=chain.id_source.next_tx_id(), timestamp=int(chain.clock.time()))
+                receipt = None
+            else:
+                receipt = Receipt(self.shard_id, dest, sender, receiver, amount, nonce)
+                tx = Transaction(sender, bridge_key(dest), amount, fee, self.hash_backend,
+                                 tx_id=receipt.receipt_id(self.hash_backend),
+                                 timestamp=int(chain.clock.time()))
+
+            if not chain.validate_transaction(tx):
+                self.rejected += 1
+                continue
+            chain.add_pending_transaction(tx)
+            if receipt is not None:
+                self.outgoing[tx.tx_id] = receipt
+            accepted += 1
+        return accepted
+
+    def accept_receipts(self, receipts: List[Receipt]) -> int:
+        """
+        Verify receipts from other shards and queue their credits.
+        The debit must be in a block of the source shard; with strict
+        execution that block could only include it if it executed.
+
+        Returns:
+            Number of receipts accepted
+        """
+        chain = self.blockchain
+        accepted = 0
+        for receipt in receipts:
+            headers = self.headers.get(receipt.source_shard)
+            valid = (
+                headers is not None
+                and receipt.dest_shard == self.shard_id
+                and shard_of(receipt.receiver, self.num_shards) == self.shard_id
+                and headers.verify_payment(receipt.receipt_id(self.hash_backend), receipt.proof, receipt.height)
+            )
+            if valid:
+                tx = Transaction(bridge_key(receipt.source_shard), receipt.receiver, receipt.amount, 0,
+                                 self.hash_backend, tx_id=receipt.credit_id(self.hash_backend),
+                                 timestamp=int(chain.clock.time()))
+                valid = chain.validate_transaction(tx)
+            if not valid:
+                print(f"[SHARD {self.shard_id}] Receipt rejected: {receipt}")
+                self.receipts_rejected += 1
+                continue
+            chain.add_pending_transaction(tx)
+            accepted += 1
+        return accepted
+
+    def produce_block(self) -> Optional[Tuple[BlockHeader, List[Receipt]]]:
+        """
+        Mine and connect one block.
+
+        Returns:
+            (header, receipts for the outbound transfers it committed),
+            or None if nothing is pending
+        """
+        chain = self.blockchain
+        if not chain.pending_transactions:
+            return None
+        block = chain.mine_block_competitively(self.tx_per_block)
+        connected = block is not None and chain.submit_block(block)
+
+        # Strict execution: every transaction in the block executed
+        receipts = []
+        for tx in block.transactions if connected else []:
+            receipt = self.outgoing.pop(tx.tx_id, None)
+            if receipt is not None:
+                receipt.height = block.index
+                receipt.proof = block.merkle_tree.get_proof(tx.tx_id)
+                receipts.append(receipt)
+        # Debits dropped from the pending pool moved no money: no receipt
+        for tx_id in [tx_id for tx_id in self.outgoing if tx_id not in chain.template_builder]:
+            del self.outgoing[tx_id]
+        return (block.header, receipts) if connected else None
+
+    def stats(self) -> Dict[str, int]:
+        """Counters and balance totals for the coordinator's report."""
+        chain = self.blockchain
+        bridges = {bridge_key(shard) for shard in range(self.num_shards)}
+        return {
+            "height": len(chain.chain) - 1,
+            "transactions": sum(len(block.transactions) for block in chain.chain),
+            "pending": len(chain.pending_transactions),
+            "users": len(chain.users) - len(bridges & chain.users.keys()),
+            "user_balance": sum(user.balance for key, user in chain.users.items() if key not in bridges),
+            "bridge_excess": sum(chain.users[key].balance - BRIDGE_RESERVE for key in bridges & chain.users.keys()),
+            "fees": chain.collected_fees,
+            "rejected": self.rejected,
+            "receipts_rejected": self.receipts_rejected,
+        }
+
+
+def _shard_worker(connection, config: dict, quiet: bool) -> None:
+    """Process main loop: run ShardNode methods sent by the coordinator."""
+    with contextlib.ExitStack() as stack:
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        node = ShardNode(**config)
+        connection.send(None)
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            method, args = message
+            try:
+                connection.send((True, getattr(node, method)(*args)))
+            except Exception as error:  # Reported to the coordinator
+                connection.send((False, f"{type(error).__name__}: {error}"))
+    connection.close()
+
+
+class ShardedBlockchain:
+    """
+    Coordinator of K shard processes.
+
+    Blocks are produced in rounds: every shard mines one block in
+    parallel, then new headers are relayed to every shard and receipts
+    to their destination shards.
+    """
+
+    def __init__(
+        self,
+        num_shards: int,
+        difficulty_target: str = "000",
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+        num_candidates: int = 5,
+        tx_per_block: int = 100,
+        seed: Optional[int] = None,
+        quiet: bool = True,
+    ):
+        """
+        Args:
+            num_shards: Number of shards (processes)
+            difficulty_target: Mining difficulty of every shard
+            hash_backend: Hash backend of every shard
+            num_candidates: Candidate blocks per height on each shard
+            tx_per_block: Transactions per block on each shard
+            seed: Seed for users, transfers and the shards' own randomness
+            quiet: Silence the shards' console output
+        """
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self.num_shards = num_shards
+        self.hash_backend = hash_backend
+        self.rng = random.Random(seed)
+        self.id_source = SeededIdSource(self.rng.getrandbits(64)) if seed is not None else UuidSource()
+        self.keys: List[str] = []
+        self.rounds = 0
+        self.receipts_relayed = 0
+        self._nonce = 0
+
+        self._connections = []
+        self._processes = []
+        for shard in range(num_shards):
+            parent, child = multiprocessing.Pipe()
+            config = {
+                "shard_id": shard,
+                "num_shards": num_shards,
+                "difficulty_target": difficulty_target,
+                "hash_backend": hash_backend,
+                "num_candidates": num_candidates,
+                "tx_per_block": tx_per_block,
+                "seed": seed,
+            }
+            process = multiprocessing.Process(target=_shard_worker, args=(child, config, quiet), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        for connection in self._connections:
+            connection.recv()
+
+        genesis = self._call_all("genesis_header")
+        for shard in range(num_shards):
+            for other in range(num_shards):
+                if other != shard:
+                    self._send(shard, "follow", other, genesis[other])
+        for shard in range(num_shards):
+            for _ in range(num_shards - 1):
+                self._receive(shard)
+
+    def _send(self, shard: int, method: str, *args) -> None:
+        self._connections[shard].send((method, args))
+
+    def _receive(self, shard: int):
+        ok, result = self._connections[shard].recv()
+        if not ok:
+            raise RuntimeError(f"Shard {shard}: {result}")
+        return result
+
+    def _call_all(self, method: str, *args) -> list:
+        """Run a method on every shard in parallel."""
+        for shard in range(self.num_shards):
+            self._send(shard, method, *args)
+        return [self._receive(shard) for shard in range(self.num_shards)]
+
+    def _call_each(self, method: str, per_shard: list) -> list:
+        """Run a method on every shard in parallel, with one argument per shard."""
+        for shard, argument in enumerate(per_shard):
+            self._send(shard, method, argument)
+        return [self._receive(shard) for shard in range(self.num_shards)]
+
+    def generate_users(self, n: int = 1000) -> None:
+        """Create users and register each on its shard."""
+        per_shard: List[List[Tuple[str, str, int]]] = [[] for _ in range(self.num_shards)]
+        for _ in range(n):
+            key = self.id_source.next_id()
+            self.keys.append(key)
+            per_shard[shard_of(key, self.num_shards)].append((key, f"User_{key[:6]}", self.rng.randint(100, 1_000_000)))
+        self._call_each("add_users", per_shard)
+
+    def generate_transactions(self, m: int = 10000, max_amount: int = 1000) -> int:
+        """
+        Create random transfers and route them to the senders' shards.
+
+        Returns:
+            Number of transfers accepted
+        """
+        per_shard: List[List[Tuple[str, str, int, int, int]]] = [[] for _ in range(self.num_shards)]
+        for _ in range(m):
+            sender, receiver = self.rng.sample(self.keys, 2)
+            self._nonce += 1
+            per_shard[shard_of(sender, self.num_shards)].append(
+                (sender, receiver, self.rng.randint(1, max_amount), 0, self._nonce)
+            )
+        return sum(self._call_each("submit", per_shard))
+
+    def run_round(self) -> int:
+        """
+        Let every shard mine one block, then relay headers and receipts.
+
+        Returns:
+            Number of blocks produced plus receipts relayed (0 when idle)
+        """
+        results = self._call_all("produce_block")
+        self.rounds += 1
+
+        headers: Dict[int, List[BlockHeader]] = {}
+        inbound: List[List[Receipt]] = [[] for _ in range(self.num_shards)]
+        for source, result in enumerate(results):
+            if result is None:
+                continue
+            header, receipts = result
+            headers[source] = [header]
+            for receipt in receipts:
+                inbound[receipt.dest_shard].append(receipt)
+
+        relayed = sum(len(receipts) for receipts in inbound)
+        if headers and self.num_shards > 1:
+            for shard, receipts in enumerate(inbound):
+                self._send(shard, "relay", headers, receipts)
+            for shard in range(self.num_shards):
+                self._receive(shard)
+        self.receipts_relayed += relayed
+        return len(headers) + relayed
+
+    def mine_until_done(self) -> None:
+        """Run rounds until every transfer is mined and credited."""
+        while self.run_round():
+            pass
+
+    def stats(self) -> List[Dict[str, int]]:
+        """Per-shard counters and balance totals."""
+        return self._call_all("stats")
+
+    def total_supply(self) -> Tuple[int, int]:
+        """
+        (user balances + fees, money in flight between shards)
+        """
+        stats = self.stats()
+        users = sum(shard["user_balance"] + shard["fees"] for shard in stats)
+        return users, sum(shard["bridge_excess"] for shard in stats)
+
+    def close(self) -> None:
+        """Stop the shard processes."""
+        for connection in self._connections:
+            with contextlib.suppress(OSError):
+                connection.send(None)
+        for process in self._processes:
+            process.join()
+
+    def __enter__(self) -> "ShardedBlockchain":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ShardedBlockchain(shards={self.num_shards}, users={len(self.keys)}, rounds={self.rounds})"
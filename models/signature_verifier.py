@@ -0,0 +1,97 @@
+from typing import Dict, List
+import ed25519
+from models.transaction import Transaction
+
+
+class SignatureVerifier:
+    """
+    Verifies transaction signatures and remembers the ones that passed.
+
+    Transactions are verified when they enter the mempool, so checking
+    them again when a block is applied is a cache lookup. Signatures not
+    seen before (e.g. in blocks from other miners) go through a single
+    Ed25519 batch check.
+    """
+
+    def __init__(self, max_cache_size: int = 1_000_000):
+        """
+        Args:
+            max_cache_size: Maximum remembered signatures (oldest evicted first)
+        """
+        self.max_cache_size = max_cache_size
+        # Keyed by tx hash + signature; dicts keep insertion order for FIFO eviction
+        self._verified: Dict[str, None] = {}
+        self.cache_hits = 0
+
+    @staticmethod
+    def _cache_key(tx: Transaction) -> str:
+        return tx.get_hash() + tx.signature
+
+    def _remember(self, tx: Transaction) -> None:
+        self._verified[self._cache_key(tx)] = None
+        if len(self._verified) > self.max_cache_size:
+            del self._verified[next(iter(self._verified))]
+
+    def is_verified(self, tx: Transaction) -> bool:
+        """
+        Check whether a transaction's signature was already verified.
+        """
+        return tx.signature is not None and self._cache_key(tx) in self._verified
+
+    def verify(self, tx: Transaction) -> bool:
+        """
+        Verify one transaction signature (free if cached).
+        """
+        if tx.signature is None:
+            return False
+        if self.is_verified(tx):
+            self.cache_hits += 1
+            return True
+        if not tx.verify_hash() or not tx.verify_signature():
+            return False
+
+        self._remember(tx)
+        return True
+
+    def verify_batch(self, txs: List[Transaction]) -> List[bool]:
+        """
+        Verify many transaction signatures.
+
+        Cached signatures are skipped, the rest are checked in one batch.
+        If the batch fails, they are checked one by one to find the bad ones.
+
+        Returns:
+            Validity of each transaction, in order
+        """
+        results = [False] * len(txs)
+        unchecked = []
+
+        for i, tx in enumerate(txs):
+            if tx.signature is None:
+                continue
+            if self.is_verified(tx):
+                self.cache_hits += 1
+                results[i] = True
+            elif tx.verify_hash():
+                unchecked.append(i)
+
+        if not unchecked:
+            return results
+
+        if ed25519.verify_batch([txs[i].signed_message() for i in unchecked]):
+            for i in unchecked:
+                results[i] = True
+                self._remember(txs[i])
+            return results
+
+        for i in unchecked:
+            if txs[i].verify_signature():
+                results[i] = True
+                self._remember(txs[i])
+        return results
+
+    def __len__(self) -> int:
+        return len(self._verified)
+
+    def __repr__(self) -> str:
+        return f"SignatureVerifier(cached={len(self._verified)}, hits={self.cache_hits})"
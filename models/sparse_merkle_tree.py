@@ -0,0 +1,240 @@
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from hash_utils import DEFAULT_HASH_BACKEND, get_hash_backend
+
+KEY_BITS = 256
+
+
+def _leaf_hash(hash_function: Callable[[str], str], path: int, balance: int) -> str:
+    """Hash of an account leaf (domain-separated from inner nodes)."""
+    return hash_function(f"leaf:{path:064x}:{balance}")
+
+
+class SparseMerkleTree:
+    """
+    Sparse Merkle tree committing to account balances.
+
+    Every account sits at the 256-bit path given by the hash of its key.
+    The tree is compact: a subtree that holds a single account is replaced
+    by that account's leaf, so leaves sit one level below the longest
+    prefix they share with another account (about log2(n) levels instead
+    of 256), and empty subtrees hash to EMPTY. The root depends only on
+    the (key, balance) pairs, not on the order of updates.
+
+    Node hashes live in one dict keyed by heap index (1 << depth | prefix),
+    so an update re-hashes only the touched leaves and their ancestors.
+    """
+
+    EMPTY = "0" * 64
+
+    def __init__(self, hash_backend: str = DEFAULT_HASH_BACKEND):
+        """
+        Args:
+            hash_backend: Name of the hash backend to use
+        """
+        self.hash_backend = hash_backend
+        self._hash = get_hash_backend(hash_backend)
+        # Sorted account paths; a leaf's depth depends on its neighbours
+        self._paths: List[int] = []
+        # path -> (leaf depth, balance)
+        self._leaves: Dict[int, Tuple[int, int]] = {}
+        self._nodes: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, key: str) -> bool:
+        return self.path_of(key) in self._leaves
+
+    def path_of(self, key: str) -> int:
+        """
+        Position of an account in the tree.
+        """
+        return int(self._hash(key), 16)
+
+    def get_root(self) -> str:
+        """
+        Get the state root.
+
+        Returns:
+            Root hash or EMPTY if the tree has no accounts
+        """
+        return self._nodes.get(1, self.EMPTY)
+
+    def get_balance(self, key: str) -> Optional[int]:
+        """
+        Balance committed for an account, or None if it is not in the tree.
+        """
+        leaf = self._leaves.get(self.path_of(key))
+        return leaf[1] if leaf else None
+
+    def _depth_at(self, i: int) -> int:
+        """Leaf depth of the account at position i of the sorted paths."""
+        paths = self._paths
+        path = paths[i]
+        depth = 0
+        if i > 0:
+            depth = KEY_BITS - (path ^ paths[i - 1]).bit_length() + 1
+        if i + 1 < len(paths):
+            depth = max(depth, KEY_BITS - (path ^ paths[i + 1]).bit_length() + 1)
+        return depth
+
+    def _rehash(self, leaves: Dict[int, Tuple[int, int]], out: Dict[int, str]) -> None:
+        """
+        Hash the given leaves and all of their ancestors into out.
+        Nodes missing from out are read from the stored tree.
+        """
+        nodes = self._nodes
+        hash_function = self._hash
+        empty = self.EMPTY
+
+        dirty = set()
+        for path, (depth, balance) in leaves.items():
+            node_id = (1 << depth) | (path >> (KEY_BITS - depth))
+            out[node_id] = _leaf_hash(hash_function, path, balance)
+            node_id >>= 1
+            while node_id and node_id not in dirty:
+                dirty.add(node_id)
+                node_id >>= 1
+
+        # Children have larger ids than their parents: deepest nodes first
+        for node_id in sorted(dirty, reverse=True):
+            left = node_id << 1
+            right = left | 1
+            out[node_id] = hash_function(
+                (out.get(left) or nodes.get(left, empty)) +
+                (out.get(right) or nodes.get(right, empty))
+            )
+
+    def update(self, balances: Mapping[str, int]) -> str:
+        """
+        Set the balances of the given accounts, adding new ones.
+        Only their paths are re-hashed.
+
+        Args:
+            balances: Account key -> new balance
+
+        Returns:
+            The new state root
+        """
+        leaves: Dict[int, Tuple[int, int]] = {}
+        new_paths: List[int] = []
+        for key, balance in balances.items():
+            path = self.path_of(key)
+            leaf = self._leaves.get(path)
+            if leaf is None:
+                new_paths.append(path)
+                leaves[path] = (0, balance)  # Depth set below
+            else:
+                leaves[path] = (leaf[0], balance)
+
+        if new_paths:
+            if len(new_paths) > 64:
+                self._paths = sorted(self._paths + new_paths)
+            else:
+                for path in new_paths:
+                    insort(self._paths, path)
+
+            # Only new accounts and their direct neighbours can change depth
+            paths = self._paths
+            for path in new_paths:
+                i = bisect_left(paths, path)
+                for j in range(max(i - 1, 0), min(i + 2, len(paths))):
+                    neighbour = paths[j]
+                    depth = self._depth_at(j)
+                    if neighbour in leaves:
+                        leaves[neighbour] = (depth, leaves[neighbour][1])
+                    elif depth != self._leaves[neighbour][0]:
+                        leaves[neighbour] = (depth, self._leaves[neighbour][1])
+
+        self._leaves.update(leaves)
+        self._rehash(leaves, self._nodes)
+        return self.get_root()
+
+    def root_with(self, balances: Mapping[str, int]) -> str:
+        """
+        State root the tree would have after update(balances), without
+        changing it. All accounts must already exist.
+
+        Raises:
+            ValueError: If an account is not in the tree
+        """
+        leaves: Dict[int, Tuple[int, int]] = {}
+        for key, balance in balances.items():
+            path = self.path_of(key)
+            leaf = self._leaves.get(path)
+            if leaf is None:
+                raise ValueError(f"Unknown account {key[:8]}...")
+            leaves[path] = (leaf[0], balance)
+
+        if not leaves:
+            return self.get_root()
+
+        overlay: Dict[int, str] = {}
+        self._rehash(leaves, overlay)
+        return overlay[1]
+
+    def get_proof(self, key: str) -> Optional[List[str]]:
+        """
+        Generate a balance inclusion proof.
+
+        Args:
+            key: Account key
+
+        Returns:
+            Sibling hashes from the leaf up to the root, or None if the
+            account is not in the tree
+        """
+        path = self.path_of(key)
+        leaf = self._leaves.get(path)
+        if leaf is None:
+            return None
+
+        depth = leaf[0]
+        node_id = (1 << depth) | (path >> (KEY_BITS - depth))
+        proof = []
+        while node_id > 1:
+            proof.append(self._nodes.get(node_id ^ 1, self.EMPTY))
+            node_id >>= 1
+        return proof
+
+    @staticmethod
+    def verify_proof(
+        key: str,
+        balance: int,
+        proof: List[str],
+        state_root: str,
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+    ) -> bool:
+        """
+        Verify that an account has a balance under a known state root.
+
+        Args:
+            key: Account key
+            balance: Claimed balance
+            proof: Sibling hashes as returned by get_proof
+            state_root: Expected state root (e.g. from a block header)
+            hash_backend: Name of the hash backend the tree was built with
+
+        Returns:
+            True if the proof leads to the root, False otherwise
+        """
+        if len(proof) > KEY_BITS:
+            return False
+
+        hash_function = get_hash_backend(hash_backend)
+        path = int(hash_function(key), 16)
+        current_hash = _leaf_hash(hash_function, path, balance)
+
+        depth = len(proof)
+        for sibling_hash in proof:
+            if (path >> (KEY_BITS - depth)) & 1:
+                current_hash = hash_function(sibling_hash + current_hash)
+            else:
+                current_hash = hash_function(current_hash + sibling_hash)
+            depth -= 1
+
+        return current_hash == state_root
+
+    def __repr__(self) -> str:
+        return f"SparseMerkleTree(accounts={len(self)}, root={self.get_root()[:16]}...)"
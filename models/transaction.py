@@ -1,39 +1,65 @@
 import time
 import uuid
-from hash_utils import my_hash
+from typing import List, Optional, Tuple
+import ed25519
+from hash_utils import DEFAULT_HASH_BACKEND, get_hash_backend
 
 
 class Transaction:
     """Represents a transaction between two users."""
     
-    def __init__(self, sender_key: str, receiver_key: str, amount: int):
+    def __init__(
+        self,
+        sender_key: str,
+        receiver_key: str,
+        amount: int,
+        fee: int = 0,
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+        tx_id: Optional[str] = None,
+        timestamp: Optional[int] = None,
+    ):
         """
             sender_key: Public key of sender
             receiver_key: Public key of receiver
             amount: Amount to transfer
+            fee: Fee paid to the block producer (default 0)
+            hash_backend: Hash backend of the chain the transaction is for
+            tx_id: Transaction ID (default: random UUID4)
+            timestamp: Creation time (default: current time)
         """
-        self.tx_id = str(uuid.uuid4())
+        self.hash_backend = hash_backend
+        self.tx_id = tx_id if tx_id is not None else str(uuid.uuid4())
         self.sender_key = sender_key
         self.receiver_key = receiver_key
         self.amount = amount
-        self.timestamp = int(time.time())
+        self.fee = fee
+        self.timestamp = timestamp if timestamp is not None else int(time.time())
         
         # Calculate transaction hash
         self._hash = self._calculate_hash()
+        
+        # Ed25519 signature over the hash (hex), set by sign()
+        self.signature: Optional[str] = None
     
-    def _calculate_hash(self) -> str:
+    def _serialize(self) -> str:
         """
-        Calculate the transaction hash.
-        Returns: 64-character hex hash string
+        Serialize the transaction fields that are covered by the hash.
         """
-        data = (
+        return (
             self.tx_id +
             self.sender_key +
             self.receiver_key +
             str(self.amount) +
+            str(self.fee) +
             str(self.timestamp)
         )
-        return my_hash(data)
+    
+    def _calculate_hash(self) -> str:
+        """
+        Calculate the transaction hash.
+        Returns: 64-character hex hash string
+        """
+        return get_hash_backend(self.hash_backend)(self._serialize())
     
     def get_hash(self) -> str:
         """
@@ -55,15 +81,54 @@ class Transaction:
         
         return is_valid
     
+    def sign(self, private_key: str) -> None:
+        """
+        Sign the transaction hash with the sender's private key.
+        """
+        self.signature = ed25519.sign(private_key, self._hash.encode("utf-8"))
+    
+    def signed_message(self) -> tuple:
+        """
+        (public key, message, signature) triple for signature verification.
+        """
+        return self.sender_key, self._hash.encode("utf-8"), self.signature
+    
+    def verify_signature(self) -> bool:
+        """
+        Verify that the sender signed this transaction.
+        """
+        if self.signature is None:
+            return False
+        return ed25519.verify(*self.signed_message())
+    
+    @property
+    def outputs(self) -> List[Tuple[str, int]]:
+        """
+        (receiver key, amount) pairs credited by this transaction.
+        """
+        return [(self.receiver_key, self.amount)]
+    
+    def get_cost(self) -> int:
+        """
+        Total amount debited from the sender (amount + fee).
+        """
+        return self.amount + self.fee
+    
+    def get_size(self) -> int:
+        """
+        Serialized size in bytes, used for block size limits.
+        """
+        return len(self._serialize().encode("utf-8"))
+    
     def verify_balance(self, sender_balance: int) -> bool:
         """
         Verify sender has sufficient balance.
         """
-        is_valid = sender_balance >= self.amount
+        is_valid = sender_balance >= self.get_cost()
         
         if not is_valid:
             print(f"[VERIFY] Transaction {self.tx_id[:8]} INSUFFICIENT BALANCE!")
-            print(f"         Sender has: {sender_balance}, needs: {self.amount}")
+            print(f"         Sender has: {sender_balance}, needs: {self.get_cost()}")
         
         return is_valid
     
@@ -72,5 +137,87 @@ class Transaction:
             f"Transaction(id={self.tx_id[:8]}..., "
             f"from={self.sender_key[:8]}..., "
             f"to={self.receiver_key[:8]}..., "
-            f"amount={self.amount})"
-        )
\ No newline at end of file
+            f"amount={self.amount}, "
+            f"fee={self.fee})"
+        )
+
+
+class BatchTransaction(Transaction):
+    """
+    Payment from one sender to many receivers (e.g. payroll).
+
+    The whole batch has one ID, one hash, one signature and one Merkle
+    leaf, and the sender is checked and debited once for the total.
+    `amount` is the total of the outputs and `receiver_key` is the first
+    receiver, so code that only needs the sender's cost works unchanged.
+    """
+    
+    def __init__(
+        self,
+        sender_key: str,
+        outputs: List[Tuple[str, int]],
+        fee: int = 0,
+        hash_backend: str = DEFAULT_HASH_BACKEND,
+        tx_id: Optional[str] = None,
+        timestamp: Optional[int] = None,
+    ):
+        """
+        Args:
+            sender_key: Public key of sender
+            outputs: (receiver key, amount) pairs, amounts positive
+            fee: Fee paid to the block producer (default 0)
+            hash_backend: Hash backend of the chain the transaction is for
+            tx_id: Transaction ID (default: random UUID4)
+            timestamp: Creation time (default: current time)
+        
+        Raises:
+            ValueError: If there are no outputs or an amount is not positive
+        """
+        outputs = [(receiver_key, amount) for receiver_key, amount in outputs]
+        if not outputs:
+            raise ValueError("Batch transaction needs at least one output")
+        if any(amount <= 0 for _, amount in outputs):
+            raise ValueError("Batch transaction amounts must be positive")
+        
+        # Set before the base class hashes the transaction
+        self._outputs = outputs
+        super().__init__(
+            sender_key,
+            outputs[0][0],
+            sum(amount for _, amount in outputs),
+            fee,
+            hash_backend,
+            tx_id=tx_id,
+            timestamp=timestamp,
+        )
+    
+    def _serialize(self) -> str:
+        """
+        Serialize the transaction fields that are covered by the hash,
+        every output included.
+        """
+        return (
+            "batch:" +
+            self.tx_id +
+            self.sender_key +
+            ";".join(f"{receiver_key}:{amount}" for receiver_key, amount in self._outputs) +
+            ";" +
+            str(self.fee) +
+            str(self.timestamp)
+        )
+    
+    @property
+    def outputs(self) -> List[Tuple[str, int]]:
+        """
+        (receiver key, amount) pairs credited by this transaction.
+        """
+        return self._outputs
+    
+    def __repr__(self) -> str:
+        return (
+            f"BatchTransaction(id={self.tx_id[:8]}..., "
+            f"from={self.sender_key[:8]}..., "
+            f"outputs={len(self._outputs)}, "
+            f"amount={self.amount}, "
+            f"fee={self.fee})"
+        )
@@ -0,0 +1,172 @@
+import sqlite3
+from typing import Iterable, Optional
+from models.bloom_filter import ScalableBloomFilter
+
+
+class ConfirmedTxIndex:
+    """
+    Set of confirmed transaction IDs with the block height of each.
+
+    Membership checks go through a scalable Bloom filter first; the exact
+    SQLite index is only queried when the filter says "maybe", so checks
+    for new transactions never touch the database. The database can live
+    on disk, so only the filter bits stay in memory as history grows.
+
+    Every filter stage adds work to a check, so once there are more than
+    max_stages the filter is rebuilt from the index as one stage sized
+    for twice the current history. The rebuild is incremental: each
+    following block copies a bounded batch of stored IDs (in key order)
+    into the new filter, which replaces the old one once the scan ends.
+    Block apply never waits for a full scan, and stages grow
+    geometrically, so the scan ends long before another rebuild is due.
+    Bloom filters cannot delete: IDs removed by a reorg stay in the filter
+    (answered by the exact index) until the next rebuild.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        initial_capacity: int = 1 << 16,
+        error_rate: float = 0.001,
+        max_stages: int = 4,
+        rebuild_batch: int = 1024,
+    ):
+        """
+        Args:
+            path: SQLite database file (default: in memory; use a file to
+                keep a long history out of RAM)
+            initial_capacity: Capacity of the first Bloom filter stage
+            error_rate: Bound on the Bloom filter false positive rate
+            max_stages: Filter stages allowed before a rebuild
+            rebuild_batch: Minimum stored IDs copied per block while
+                rebuilding (at least 4 per ID the block adds)
+        """
+        self.path = path
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.max_stages = max_stages
+        self.rebuild_batch = rebuild_batch
+        # Callers serialize access (ConcurrentBlockchain uses one writer
+        # at a time), so the connection may move between threads
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS confirmed ("
+            "tx_id TEXT PRIMARY KEY, height INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._count = self._db.execute("SELECT COUNT(*) FROM confirmed").fetchone()[0]
+
+        self.lookups = 0
+        self.false_positives = 0
+        self.rebuilds = 0
+        # Filter being rebuilt and the last stored ID copied into it
+        self._next_bloom: Optional[ScalableBloomFilter] = None
+        self._rebuild_cursor = ""
+        # Reopened database: the filter is built from the stored IDs at once
+        self._start_rebuild()
+        self._continue_rebuild()
+
+    def _start_rebuild(self) -> None:
+        """Start a single-stage filter sized for twice the current history."""
+        self._next_bloom = ScalableBloomFilter(max(self.initial_capacity, 2 * self._count), self.error_rate)
+        self._rebuild_cursor = ""
+
+    def _continue_rebuild(self, rows: Optional[int] = None) -> None:
+        """
+        Copy the next stored IDs into the filter being rebuilt, and swap it
+        in once all are copied.
+
+        Args:
+            rows: Maximum IDs to copy (default: all remaining)
+        """
+        query = "SELECT tx_id FROM confirmed WHERE tx_id > ? ORDER BY tx_id"
+        params: tuple = (self._rebuild_cursor,)
+        if rows is not None:
+            query += " LIMIT ?"
+            params += (rows,)
+
+        copied = 0
+        for (tx_id,) in self._db.execute(query, params):
+            self._next_bloom.add(tx_id)
+            self._rebuild_cursor = tx_id
+            copied += 1
+        if rows is not None and copied == rows:
+            return
+
+        self._bloom = self._next_bloom
+        self._next_bloom = None
+
+    def add_block(self, tx_ids: Iterable[str], height: int) -> None:
+        """
+        Record the transactions of a connected block.
+        """
+        tx_ids = list(tx_ids)
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO confirmed (tx_id, height) VALUES (?, ?)",
+                ((tx_id, height) for tx_id in tx_ids),
+            )
+        for tx_id in tx_ids:
+            self._bloom.add(tx_id)
+        self._count += len(tx_ids)
+
+        if self._next_bloom is None and len(self._bloom.filters) > self.max_stages:
+            self._start_rebuild()
+            self.rebuilds += 1
+        elif self._next_bloom is not None:
+            # IDs past the cursor are copied by the scan itself
+            for tx_id in tx_ids:
+                if tx_id <= self._rebuild_cursor:
+                    self._next_bloom.add(tx_id)
+        if self._next_bloom is not None:
+            self._continue_rebuild(max(self.rebuild_batch, 4 * len(tx_ids)))
+
+    def remove(self, tx_ids: Iterable[str]) -> None:
+        """
+        Forget the transactions of a disconnected block.
+        """
+        with self._db:
+            removed = self._db.executemany(
+                "DELETE FROM confirmed WHERE tx_id = ?",
+                ((tx_id,) for tx_id in tx_ids),
+            ).rowcount
+        self._count -= removed
+
+    def get_height(self, tx_id: str) -> Optional[int]:
+        """
+        Height of the block that confirmed a transaction.
+
+        Returns:
+            Block height or None if the transaction is not confirmed
+        """
+        if tx_id not in self._bloom:
+            return None
+
+        self.lookups += 1
+        row = self._db.execute("SELECT height FROM confirmed WHERE tx_id = ?", (tx_id,)).fetchone()
+        if row is None:
+            self.false_positives += 1
+            return None
+        return row[0]
+
+    def __contains__(self, tx_id: str) -> bool:
+        return self.get_height(tx_id) is not None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def filter_size_in_bytes(self) -> int:
+        """Memory used by the Bloom filter bits (both filters while rebuilding)."""
+        rebuilding = self._next_bloom.size_in_bytes if self._next_bloom is not None else 0
+        return self._bloom.size_in_bytes + rebuilding
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"ConfirmedTxIndex(txs={len(self)}, lookups={self.lookups}, "
+            f"false_positives={self.false_positives}, rebuilds={self.rebuilds})"
+        )
@@ -1,17 +1,22 @@
+from typing import Optional
+
+
 class User:
     """Represents a user in the blockchain system."""
     
-    def __init__(self, name: str, public_key: str, balance: int = 0):
+    def __init__(self, name: str, public_key: str, balance: int = 0, private_key: Optional[str] = None):
         """
         Initialize a new user.
         Args:
             name: User's display name
             public_key: Unique public key identifier
             balance: Initial balance (default 0)
+            private_key: Ed25519 private key (hex) for signing, if any
         """
         self.name = name
         self.public_key = public_key
         self.balance = balance
+        self.private_key = private_key
     
     def credit(self, amount: int) -> None:
         """
@@ -0,0 +1,265 @@
+"""
+Per-phase timing, memory growth and opt-in profiling for simulation runs.
+"""
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from typing import Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PHASES = ("genesis", "users", "transactions", "assembly", "mining", "apply")
+BLOCK_PHASES = ("assembly", "mining", "apply")
+
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for reports."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Peak resident set size of this process so far, in bytes.
+    Returns None where the platform does not report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss() -> Optional[int]:
+    """
+    Current resident set size of this process, in bytes.
+    Returns None where the platform does not report it (only Linux does).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class PhaseRecord:
+    """Measurements of one run of a phase."""
+
+    def __init__(
+        self,
+        name: str,
+        block: Optional[int],
+        elapsed: float,
+        peak_memory: Optional[int],
+        traced_peak: Optional[int] = None,
+        rss_change: Optional[int] = None,
+    ):
+        """
+        Args:
+            name: Phase name (one of PHASES)
+            block: Block height for per-block phases
+            elapsed: Wall time in seconds
+            peak_memory: Process peak RSS so far (cumulative, never drops)
+            traced_peak: Peak Python heap seen by tracemalloc, if traced
+            rss_change: Change of the current RSS over this run of the phase
+        """
+        self.name = name
+        self.block = block
+        self.elapsed = elapsed
+        self.peak_memory = peak_memory
+        self.traced_peak = traced_peak
+        self.rss_change = rss_change
+
+    def __repr__(self) -> str:
+        return f"PhaseRecord(name={self.name}, block={self.block}, elapsed={self.elapsed:.4f}s)"
+
+
+class PhaseProfiler:
+    """
+    Records wall time and memory of every simulation phase.
+
+    Memory is reported two ways: the change of the current RSS over each
+    run of a phase, and the process peak RSS (ru_maxrss), which is a
+    lifetime high-water mark and says nothing about a single phase. The
+    real peak of one phase needs tracemalloc (trace_phase).
+
+    One phase can additionally run under cProfile (statistics are
+    accumulated over all of its runs) and one under tracemalloc (the
+    snapshot of the run with the highest traced peak is kept). Both slow
+    the profiled phase down, so they are off unless requested.
+    """
+
+    def __init__(
+        self,
+        profile_phase: Optional[str] = None,
+        trace_phase: Optional[str] = None,
+        output_dir: str = "profiles",
+    ):
+        """
+        Args:
+            profile_phase: Phase to run under cProfile
+            trace_phase: Phase to run under tracemalloc
+            output_dir: Directory for the profile dumps
+
+        Raises:
+            ValueError: If a phase name is unknown
+        """
+        for phase in (profile_phase, trace_phase):
+            if phase is not None and phase not in PHASES:
+                raise ValueError(f"Unknown phase '{phase}'. Available: {', '.join(PHASES)}")
+
+        self.profile_phase = profile_phase
+        self.trace_phase = trace_phase
+        self.output_dir = output_dir
+        self.records: List[PhaseRecord] = []
+
+        self._profile = cProfile.Profile() if profile_phase else None
+        self._trace_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._trace_peak = -1
+        self._trace_block: Optional[int] = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str, block: Optional[int] = None) -> Iterator[None]:
+        """
+        Measure the enclosed code as one run of a phase.
+
+        Args:
+            name: Phase name (one of PHASES)
+            block: Block height for per-block phases
+        """
+        profile = self._profile if name == self.profile_phase else None
+        trace = name == self.trace_phase
+
+        if trace:
+            tracemalloc.start()
+        if profile:
+            profile.enable()
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profile:
+                profile.disable()
+
+            traced_peak = None
+            if trace:
+                traced_peak = tracemalloc.get_traced_memory()[1]
+                if traced_peak > self._trace_peak:
+                    self._trace_peak = traced_peak
+                    self._trace_snapshot = tracemalloc.take_snapshot()
+                    self._trace_block = block
+                tracemalloc.stop()
+
+            rss_after = current_rss()
+            rss_change = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            self.records.append(PhaseRecord(name, block, elapsed, peak_rss(), traced_peak, rss_change))
+
+    def write_dumps(self) -> List[str]:
+        """
+        Write the cProfile and tracemalloc dumps (binary and text).
+
+        Returns:
+            Paths of the written files
+        """
+        written = []
+        if self._profile is None and self._trace_snapshot is None:
+            return written
+
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if self._profile is not None:
+            path = os.path.join(self.output_dir, f"{self.profile_phase}.prof")
+            self._profile.dump_stats(path)
+            with open(path + ".txt", "w") as report:
+                stats = pstats.Stats(self._profile, stream=report)
+                stats.sort_stats("cumulative").print_stats(40)
+            written += [path, path + ".txt"]
+
+        if self._trace_snapshot is not None:
+            path = os.path.join(self.output_dir, f"{self.trace_phase}.tracemalloc")
+            self._trace_snapshot.dump(path)
+            with open(path + ".txt", "w") as report:
+                where = f" (block #{self._trace_block})" if self._trace_block is not None else ""
+                report.write(f"Peak traced memory{where}: {format_bytes(self._trace_peak)}\n")
+                report.write("Largest live allocations at the end of the phase:\n")
+                for stat in self._trace_snapshot.statistics("lineno")[:40]:
+                    report.write(f"{stat}\n")
+            written += [path, path + ".txt"]
+
+        return written
+
+    def report(self) -> str:
+        """
+        Format the per-phase summary and the per-block breakdown.
+        """
+        def memory(value: Optional[int]) -> str:
+            return format_bytes(value) if value is not None else "-"
+
+        def change(values: List[Optional[int]]) -> str:
+            known = [value for value in values if value is not None]
+            if not known:
+                return "-"
+            total = sum(known)
+            return ("+" if total >= 0 else "-") + format_bytes(abs(total))
+
+        lines = [
+            "=" * 84,
+            "PHASE REPORT",
+            "=" * 84,
+            f"{'phase':<14}{'runs':>6}{'total':>11}{'mean':>11}{'max':>11}{'RSS change':>14}{'process peak':>15}",
+        ]
+        for name in PHASES:
+            runs = [record for record in self.records if record.name == name]
+            if not runs:
+                continue
+            times = [record.elapsed for record in runs]
+            peaks = [record.peak_memory for record in runs if record.peak_memory is not None]
+            lines.append(
+                f"{name:<14}{len(runs):>6}{sum(times):>10.3f}s{sum(times) / len(runs):>10.4f}s"
+                f"{max(times):>10.4f}s{change([record.rss_change for record in runs]):>14}"
+                f"{memory(max(peaks) if peaks else None):>15}"
+            )
+
+        traced = [record for record in self.records if record.traced_peak is not None]
+        if traced:
+            peak = max(traced, key=lambda record: record.traced_peak)
+            lines.append(f"tracemalloc peak in '{self.trace_phase}': {format_bytes(peak.traced_peak)}")
+
+        blocks = {}
+        for record in self.records:
+            if record.name in BLOCK_PHASES and record.block is not None:
+                blocks.setdefault(record.block, {})[record.name] = record
+
+        if blocks:
+            lines += ["", f"{'block':>6}" + "".join(f"{name:>11}" for name in BLOCK_PHASES) + f"{'RSS change':>14}"]
+            for height in sorted(blocks):
+                phases = blocks[height]
+                times = "".join(
+                    f"{phases[name].elapsed:>10.4f}s" if name in phases else f"{'-':>11}"
+                    for name in BLOCK_PHASES
+                )
+                lines.append(f"{height:>6}{times}{change([record.rss_change for record in phases.values()]):>14}")
+
+        lines += [
+            "",
+            "RSS change: current RSS after minus before, summed over runs.",
+            "Process peak: lifetime high-water mark (ru_maxrss), not per phase;",
+            "use --trace-memory PHASE for the real peak of one phase.",
+            "=" * 84,
+        ]
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"PhaseProfiler(records={len(self.records)}, profile={self.profile_phase}, trace={self.trace_phase})"
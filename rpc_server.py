@@ -0,0 +1,660 @@
+"""
+JSON-RPC 2.0 over HTTP/1.1 for a live Blockchain (asyncio, standard library only).
+
+Connections are kept alive between requests, a request body may be a
+JSON-RPC batch (array of calls), and blocks are produced in the
+background: candidate assembly, the nonce search and block apply all
+run in a worker thread (the search possibly in the mining pool's
+processes), so the event loop keeps accepting and reading requests.
+
+A state lock serializes Blockchain access between request handling and
+the assembly and apply steps (the state root dry run touches live
+balances). The nonce search runs without it; it only touches the
+candidate blocks. A request that finds the lock taken waits for it in a
+helper thread instead of on the event loop.
+
+Methods:
+    get_status()
+    get_block(height=None, block_hash=None, full=False)
+    get_transaction(tx_id)
+    get_balance(key)
+    get_accounts(offset=0, limit=100)
+    get_merkle_proof(tx_id)
+    submit_transaction(tx)
+    submit_transactions(txs)
+
+Usage:
+    python rpc_server.py --users 1000 --difficulty 000 --port 8545
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import inspect
+import json
+import itertools
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from hash_utils import DEFAULT_HASH_BACKEND, HASH_BACKENDS
+from models.block import Block
+from models.blockchain import Blockchain
+from models.transaction import BatchTransaction, Transaction
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Application errors
+TX_REJECTED = -32000
+NOT_FOUND = -32001
+
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+class RpcError(Exception):
+    """Error returned to the caller as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def block_to_json(block: Block, full: bool = False) -> Dict[str, Any]:
+    """JSON view of a block (transaction IDs only unless full)."""
+    header = block.header
+    return {
+        "hash": block.get_hash(),
+        "height": header.index,
+        "version": header.version,
+        "prev_block_hash": header.prev_block_hash,
+        "merkle_root": header.merkle_root,
+        "state_root": header.state_root,
+        "timestamp": header.timestamp,
+        "difficulty_target": header.difficulty_target,
+        "nonce": header.nonce,
+        "transactions": [
+            transaction_to_json(tx) if full else tx.tx_id for tx in block.transactions
+        ],
+    }
+
+
+def transaction_to_json(tx: Transaction) -> Dict[str, Any]:
+    """JSON view of a transaction (the fields accepted by submit_transaction)."""
+    data = {
+        "tx_id": tx.tx_id,
+        "sender": tx.sender_key,
+        "receiver": tx.receiver_key,
+        "amount": tx.amount,
+        "fee": tx.fee,
+        "timestamp": tx.timestamp,
+        "signature": tx.signature,
+    }
+    if isinstance(tx, BatchTransaction):
+        # "amount" stays the total debited, without the fee
+        del data["receiver"]
+        data["outputs"] = [list(output) for output in tx.outputs]
+    return data
+
+
+class RpcServer:
+    """JSON-RPC front end and background block producer for one Blockchain."""
+
+    def __init__(
+        self,
+        blockchain: Blockchain,
+        block_tx_count: int = 100,
+        min_block_interval: float = 0.0,
+        idle_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            blockchain: Chain to serve (mutated only by this server)
+            block_tx_count: Transactions per mined block
+            min_block_interval: Seconds to wait before assembling each block,
+                so submissions can accumulate into fuller blocks
+            idle_timeout: Close keep-alive connections idle this long
+        """
+        self.blockchain = blockchain
+        self.block_tx_count = block_tx_count
+        self.min_block_interval = min_block_interval
+        self.idle_timeout = idle_timeout
+
+        self.methods = {
+            "get_status": self.get_status,
+            "get_block": self.get_block,
+            "get_transaction": self.get_transaction,
+            "get_balance": self.get_balance,
+            "get_accounts": self.get_accounts,
+            "get_merkle_proof": self.get_merkle_proof,
+            "submit_transaction": self.submit_transaction,
+            "submit_transactions": self.submit_transactions,
+        }
+        self._signatures = {name: inspect.signature(method) for name, method in self.methods.items()}
+
+        self.requests = 0
+        self.blocks_mined = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._work: Optional[asyncio.Event] = None
+        self._miner: Optional[asyncio.Task] = None
+        # Held while the chain is read or changed: by request handling and
+        # by block assembly and apply (not by the nonce search)
+        self._state_lock = threading.Lock()
+        # One thread: block production never runs twice at once
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="miner")
+        # Requests that found the state lock taken wait for it here
+        self._waiters = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="rpc-wait")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # ------------------------------------------------------------ methods
+
+    def get_status(self) -> Dict[str, Any]:
+        """Tip, mempool and counters."""
+        chain = self.blockchain
+        return {
+            "height": len(chain.chain) - 1,
+            "tip": chain.chain[-1].get_hash(),
+            "state_root": chain.state_root,
+            "pending": len(chain.pending_transactions),
+            "confirmed": len(chain.confirmed_txs),
+            "blocks_mined": self.blocks_mined,
+            "requests": self.requests,
+        }
+
+    def get_block(self, height: Optional[int] = None, block_hash: Optional[str] = None, full: bool = False):
+        """Active-chain block by height or hash (None if unknown)."""
+        chain = self.blockchain.chain
+        if block_hash is not None:
+            node = self.blockchain.block_tree.get(block_hash)
+            if node is None:
+                return None
+            height = node.block.index
+            # Side-branch blocks are not served
+            if height >= len(chain) or chain[height] is not node.block:
+                return None
+        elif height is None:
+            raise RpcError(INVALID_PARAMS, "Either height or block_hash is required")
+
+        if not isinstance(height, int) or not 0 <= height < len(chain):
+            return None
+        return block_to_json(chain[height], full)
+
+    def get_transaction(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """Confirmed or pending transaction with its status and block height."""
+        pending = self.blockchain.template_builder.get(tx_id)
+        if pending is not None:
+            return dict(transaction_to_json(pending), status="pending", height=None)
+
+        height = self.blockchain.confirmed_txs.get_height(tx_id)
+        if height is None:
+            return None
+        for tx in self.blockchain.chain[height].transactions:
+            if tx.tx_id == tx_id:
+                return dict(transaction_to_json(tx), status="confirmed", height=height)
+        return None
+
+    def get_balance(self, key: str) -> Dict[str, Any]:
+        """Current balance of an account."""
+        user = self.blockchain.users.get(key)
+        if user is None:
+            raise RpcError(NOT_FOUND, f"Unknown account {key[:16]}")
+        return {"key": key, "balance": user.balance, "height": len(self.blockchain.chain) - 1}
+
+    def get_accounts(self, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """A page of accounts in registration order (at most 10000)."""
+        if type(offset) is not int or type(limit) is not int or offset < 0 or limit <= 0:
+            raise RpcError(INVALID_PARAMS, "offset must be a non-negative and limit a positive integer")
+        users = itertools.islice(self.blockchain.users.values(), offset, offset + min(limit, 10_000))
+        return [{"key": user.public_key, "name": user.name, "balance": user.balance} for user in users]
+
+    def get_merkle_proof(self, tx_id: str) -> Optional[Dict[str, Any]]:
+        """Merkle proof of a confirmed transaction against its block's root."""
+        found = self.blockchain.get_merkle_proof(tx_id)
+        if found is None:
+            return None
+        height, proof = found
+        return {
+            "height": height,
+            "merkle_root": self.blockchain.chain[height].header.merkle_root,
+            "proof": [list(step) for step in proof],
+        }
+
+    def submit_transaction(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a transaction and add it to the mempool."""
+        transaction = self._parse_transaction(tx)
+        if not self._admit(transaction):
+            raise RpcError(TX_REJECTED, f"Transaction {transaction.tx_id[:8]} rejected")
+        return {"tx_id": transaction.tx_id, "accepted": True}
+
+    def submit_transactions(self, txs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Submit a batch. Signatures are verified together, and each
+        transaction is accepted or rejected on its own.
+        """
+        if not isinstance(txs, list):
+            raise RpcError(INVALID_PARAMS, "txs must be an array")
+        transactions = [self._parse_transaction(tx) for tx in txs]
+
+        signed = [tx for tx in transactions if tx.signature is not None]
+        if signed:
+            # Fills the verifier's cache, so validate_transaction does not re-check
+            self.blockchain.signature_verifier.verify_batch(signed)
+        return [{"tx_id": tx.tx_id, "accepted": self._admit(tx)} for tx in transactions]
+
+    def _parse_transaction(self, data: Any) -> Transaction:
+        """
+        Build a Transaction from its JSON fields (tx_id/timestamp assigned
+        if missing). An "outputs" list of [receiver, amount] pairs in place
+        of receiver and amount makes a batch transaction.
+        """
+        if not isinstance(data, dict):
+            raise RpcError(INVALID_PARAMS, "Transaction must be an object")
+        try:
+            sender, fee = data["sender"], data.get("fee", 0)
+            if "outputs" in data:
+                outputs = [(receiver, amount) for receiver, amount in data["outputs"]]
+            else:
+                outputs = [(data["receiver"], data["amount"])]
+        except KeyError as error:
+            raise RpcError(INVALID_PARAMS, f"Missing transaction field {error}") from None
+        except (TypeError, ValueError):
+            raise RpcError(INVALID_PARAMS, "outputs must be [receiver, amount] pairs") from None
+        if not outputs or not all(isinstance(key, str) for key in [sender] + [r for r, _ in outputs]):
+            raise RpcError(INVALID_PARAMS, "sender and receivers must be strings")
+        amounts = [amount for _, amount in outputs]
+        if not all(type(value) is int for value in amounts + [fee]) or min(amounts) <= 0 or fee < 0:
+            raise RpcError(INVALID_PARAMS, "amounts must be positive and fee a non-negative integer")
+        tx_id, timestamp = data.get("tx_id"), data.get("timestamp")
+        if tx_id is not None and not isinstance(tx_id, str) or timestamp is not None and type(timestamp) is not int:
+            raise RpcError(INVALID_PARAMS, "tx_id must be a string and timestamp an integer")
+
+        chain = self.blockchain
+        tx_id = tx_id if tx_id is not None else chain.id_source.next_tx_id()
+        timestamp = timestamp if timestamp is not None else int(chain.clock.time())
+        if "outputs" in data:
+            tx = BatchTransaction(sender, outputs, fee, chain.hash_backend, tx_id=tx_id, timestamp=timestamp)
+        else:
+            (receiver, amount), = outputs
+            tx = Transaction(sender, receiver, amount, fee, chain.hash_backend, tx_id=tx_id, timestamp=timestamp)
+        tx.signature = data.get("signature")
+        return tx
+
+    def _admit(self, tx: Transaction) -> bool:
+        if not self.blockchain.validate_transaction(tx):
+            return False
+        self.blockchain.add_pending_transaction(tx)
+        # Also called from a waiter thread
+        self._loop.call_soon_threadsafe(self._work.set)
+        return True
+
+    # ---------------------------------------------------------- JSON-RPC
+
+    def _call(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Run one JSON-RPC call; None for notifications (no id)."""
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            return _error_response(None, INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get("id")
+        name = request["method"]
+        params = request.get("params", [])
+        self.requests += 1
+        try:
+            method = self.methods.get(name)
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Method '{name}' not found")
+            if isinstance(params, dict):
+                args, kwargs = [], params
+            elif isinstance(params, list):
+                args, kwargs = params, {}
+            else:
+                raise RpcError(INVALID_PARAMS, "params must be an array or an object")
+            # Only a failed bind is the caller's fault; a TypeError raised
+            # inside the method is an internal error
+            try:
+                self._signatures[name].bind(*args, **kwargs)
+            except TypeError as error:
+                raise RpcError(INVALID_PARAMS, str(error)) from None
+            result = method(*args, **kwargs)
+        except RpcError as error:
+            response = _error_response(request_id, error.code, error.message)
+        except Exception as error:  # Keep serving after a bug in one call
+            response = _error_response(request_id, INTERNAL_ERROR, f"{type(error).__name__}: {error}")
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+        return response if "id" in request else None
+
+    def handle_body(self, body: bytes) -> Optional[bytes]:
+        """
+        Answer a JSON-RPC request body (single call or batch).
+
+        Returns:
+            Response body, or None if it contained only notifications
+        """
+        try:
+            payload = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return json.dumps(_error_response(None, PARSE_ERROR, "Parse error")).encode()
+
+        if isinstance(payload, list):
+            if not payload:
+                return json.dumps(_error_response(None, INVALID_REQUEST, "Empty batch")).encode()
+            responses = [response for response in map(self._call, payload) if response is not None]
+            return json.dumps(responses).encode() if responses else None
+
+        response = self._call(payload)
+        return json.dumps(response).encode() if response is not None else None
+
+    def _handle_body_locked(self, body: bytes) -> Optional[bytes]:
+        with self._state_lock:
+            return self.handle_body(body)
+
+    async def _answer(self, body: bytes) -> Optional[bytes]:
+        """Answer a body under the state lock without blocking the event loop."""
+        if self._state_lock.acquire(blocking=False):
+            try:
+                return self.handle_body(body)
+            finally:
+                self._state_lock.release()
+        return await self._loop.run_in_executor(self._waiters, self._handle_body_locked, body)
+
+    # -------------------------------------------------------------- HTTP
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP requests on one connection until it closes."""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                method, keep_alive, body, error = request
+
+                if error is not None:
+                    _write_response(writer, error, b"", keep_alive=False)
+                    await writer.drain()
+                    break
+                if method != "POST":
+                    _write_response(writer, "405 Method Not Allowed", b"", keep_alive)
+                else:
+                    response = await self._answer(body)
+                    if response is None:
+                        _write_response(writer, "204 No Content", b"", keep_alive)
+                    else:
+                        _write_response(writer, "200 OK", response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # ------------------------------------------------------------ mining
+
+    def _assemble(self):
+        """Build the next candidates (miner thread, under the state lock)."""
+        chain = self.blockchain
+        with self._state_lock:
+            height = len(chain.chain)
+            with chain.phase("assembly", height):
+                return height, chain.assemble_candidates(self.block_tx_count)
+
+    def _apply(self, height: int, block: Block) -> bool:
+        """
+        Connect a mined block (miner thread, under the state lock).
+
+        Returns:
+            True if transactions are still pending
+        """
+        chain = self.blockchain
+        with self._state_lock:
+            with chain.phase("apply", height):
+                if chain.submit_block(block):
+                    self.blocks_mined += 1
+            return bool(chain.pending_transactions)
+
+    async def _produce_blocks(self) -> None:
+        """Mine pending transactions whenever there are any."""
+        loop = asyncio.get_running_loop()
+        chain = self.blockchain
+        while True:
+            await self._work.wait()
+            # Cleared before assembly, so a submission made meanwhile wakes us again
+            self._work.clear()
+            if self.min_block_interval:
+                await asyncio.sleep(self.min_block_interval)
+
+            height, candidates = await loop.run_in_executor(self._executor, self._assemble)
+            if not candidates:
+                continue
+
+            # The phase profiler is only touched by the miner thread meanwhile
+            with chain.phase("mining", height):
+                block = await loop.run_in_executor(self._executor, chain.mine_candidates, candidates)
+            if block is None:
+                print("[ERROR] Kasimas nepavyko!")
+                self._work.set()
+                continue
+
+            if await loop.run_in_executor(self._executor, self._apply, height, block):
+                self._work.set()
+
+    # ---------------------------------------------------------- lifecycle
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8545) -> Tuple[str, int]:
+        """
+        Start listening and producing blocks.
+
+        Returns:
+            Bound (host, port); pass port=0 to pick a free port
+        """
+        self._loop = asyncio.get_running_loop()
+        self._work = asyncio.Event()
+        if self.blockchain.pending_transactions:
+            self._work.set()
+        self._miner = asyncio.create_task(self._produce_blocks())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self) -> None:
+        """Stop accepting connections and cancel block production."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._miner is not None:
+            self._miner.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._miner
+        # A nonce search in progress runs to the end of its round
+        self._executor.shutdown(wait=True)
+        self._waiters.shutdown(wait=True)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8545) -> None:
+        """Run until cancelled."""
+        host, port = await self.start(host, port)
+        print(f"[RPC] Listening on http://{host}:{port}", file=sys.stderr)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def _error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """
+    Read one HTTP request.
+
+    Returns:
+        (method, keep_alive, body, error status or None), or None at EOF
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        return None, False, b"", "400 Bad Request"
+    method, _, http_version = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    if http_version == "HTTP/1.0":
+        keep_alive = connection == "keep-alive"
+    else:
+        keep_alive = connection != "close"
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        return method, False, b"", "400 Bad Request"
+    if length < 0 or length > MAX_BODY_SIZE:
+        return method, False, b"", "413 Payload Too Large"
+    body = await reader.readexactly(length) if length else b""
+    return method, keep_alive, body, None
+
+
+def _write_response(writer: asyncio.StreamWriter, status: str, body: bytes, keep_alive: bool) -> None:
+    writer.write(
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+    )
+
+
+class RpcClient:
+    """Minimal keep-alive JSON-RPC client (one connection, one request at a time)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8545):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._next_id = 0
+
+    async def _post(self, payload: Any) -> Any:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        body = json.dumps(payload).encode()
+        self._writer.write(
+            f"POST / HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        await self._writer.drain()
+
+        status = await self._reader.readline()
+        if not status:
+            raise ConnectionError("Server closed the connection")
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await self._reader.readexactly(length) if length else b""
+        return json.loads(data) if data else None
+
+    def _request(self, method: str, params: Any) -> Dict[str, Any]:
+        self._next_id += 1
+        return {"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params}
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Call one method.
+
+        Raises:
+            RpcError: If the server returned an error object
+        """
+        response = await self._post(self._request(method, kwargs or list(args)))
+        if "error" in response:
+            raise RpcError(response["error"]["code"], response["error"]["message"])
+        return response["result"]
+
+    async def batch(self, calls: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send several (method, params) calls in one request.
+
+        Returns:
+            Raw response objects in call order
+        """
+        requests = [self._request(method, params) for method, params in calls]
+        responses = {response["id"]: response for response in await self._post(requests)}
+        return [responses[request["id"]] for request in requests]
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            with contextlib.suppress(ConnectionError):
+                await self._writer.wait_closed()
+            self._writer = None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line options of the server.
+    """
+    parser = argparse.ArgumentParser(description="JSON-RPC serveris blokų grandinei")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8545, help="port to listen on (default: 8545)")
+    parser.add_argument("--users", type=int, default=1000, help="number of users (default: 1000)")
+    parser.add_argument("--difficulty", default="000", help="required hash prefix (default: 000)")
+    parser.add_argument("--candidates", type=int, default=5, help="candidate blocks per height (default: 5)")
+    parser.add_argument("--tx-per-block", type=int, default=100, help="transactions per block (default: 100)")
+    parser.add_argument("--block-interval", type=float, default=0.0,
+                        help="seconds to collect transactions before each block (default: 0)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes searching nonces in parallel (default: 1)")
+    parser.add_argument("--hash-backend", choices=sorted(HASH_BACKENDS), default=DEFAULT_HASH_BACKEND,
+                        help=f"hash function (default: {DEFAULT_HASH_BACKEND})")
+    parser.add_argument("--signatures", action="store_true", help="require signed transactions")
+    parser.add_argument("--seed", type=int, help="seed for reproducible users and IDs")
+    parser.add_argument("--quiet", action="store_true", help="hide the blockchain log")
+    return parser.parse_args(argv)
+
+
+def cli(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point: build a chain with users and serve it."""
+    args = parse_args(argv)
+
+    with contextlib.ExitStack() as stack:
+        if args.quiet:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+
+        blockchain = Blockchain(
+            difficulty_target=args.difficulty,
+            require_signatures=args.signatures,
+            hash_backend=args.hash_backend,
+            num_candidates=args.candidates,
+            mining_workers=args.workers,
+            seed=args.seed,
+        )
+        blockchain.generate_users(args.users)
+        server = RpcServer(blockchain, args.tx_per_block, args.block_interval)
+
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(server.serve_forever(args.host, args.port))
+
+
+if __name__ == "__main__":
+    cli()